@@ -0,0 +1,308 @@
+"""
+utilities 데이터 계층 벤치마크
+
+규모별로 합성 데이터를 만들어 스냅샷으로 저장하고 내장 SQLite 파일에 적재한 뒤,
+규모마다 새 프로세스에서 조회 함수의 콜드(캐시 비움)/웜(캐시 적중) 지연 시간을 잰다.
+결과는 백분위(p50/p95/p99)와 콜드 1회 호출의 최대 메모리(tracemalloc)로 보고하고,
+기준선(baseline)으로 저장해 두었다가 다음 실행에서 느려진 항목을 찾는다.
+
+    python -m benchmarks.data_layer                      # small, medium 실행 후 기준선과 비교
+    python -m benchmarks.data_layer --scale large -n 20
+    python -m benchmarks.data_layer --save-baseline      # 현재 결과를 기준선으로 저장
+"""
+import argparse
+import gc
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# 연도 x 지역 x 모델, FAQ 건수
+SCALES = {
+    'small': {'years': 5, 'regions': 17, 'models': 50, 'faq': 500},
+    'medium': {'years': 10, 'regions': 17, 'models': 500, 'faq': 5000},
+    'large': {'years': 20, 'regions': 50, 'models': 5000, 'faq': 50000},
+}
+DEFAULT_SCALES = ('small', 'medium')
+DEFAULT_REPEAT = 10
+LAST_YEAR = 2024
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+REGRESSION_TOLERANCE = 0.25   # p50 이 기준선보다 25% 넘게 느려지면 회귀
+REGRESSION_FLOOR_MS = 0.5     # 이보다 작은 차이는 측정 오차로 본다
+
+REGIONS = ["서울", "부산", "대구", "인천", "광주", "대전", "울산", "세종", "경기", "강원",
+           "충북", "충남", "전북", "전남", "경북", "경남", "제주"]
+FAQ_CATEGORIES = ["차량 구매", "차량 정비", "기아멤버스", "홈페이지", "PBV", "기타", "TOP 10"]
+FAQ_WORDS = ["보조금", "충전", "배터리", "정비", "예약", "할부", "보증", "전기차", "수소차", "출고",
+             "신청", "서류", "계약", "취소", "변경", "멤버십", "포인트", "홈페이지", "로그인", "견적"]
+SEARCH_TERMS = ["보조금 신청", "충전", "배터리 보증", "출고 일정", "멤버십 포인트", "견적"]
+
+
+def region_names(count):
+    """실제 17개 시도 + 부족하면 '지역NN' 으로 채운다"""
+    return REGIONS[:count] + [f"지역{i:02d}" for i in range(len(REGIONS), count)]
+
+
+def generate_tables(years, regions, models, faq, seed=0):
+    """규모에 맞는 합성 테이블들을 {테이블: DataFrame} 으로 생성 (스키마는 database/schema.py 와 같음)"""
+    rng = np.random.default_rng(seed)
+    year_list = list(range(LAST_YEAR - years + 1, LAST_YEAR + 1))
+    names = region_names(regions)
+    tables = {}
+
+    rows = []
+    for i, year in enumerate(year_list):
+        electric, hydrogen, hybrid = 100000 * (i + 1), 5000 * (i + 1), 300000 * (i + 1)
+        rows += [
+            (year, '전체 차량 등록', 23000000 + 500000 * i),
+            (year, '친환경 전체', electric + hydrogen + hybrid),
+            (year, '전기차', electric),
+            (year, '수소차', hydrogen),
+            (year, '하이브리드', hybrid),
+            (year, '휘발유', 12000000),
+            (year, '경유', 9000000),
+        ]
+    tables['environmental_vehicles'] = pd.DataFrame(rows, columns=['연도', '구분', '합계'])
+
+    # 시군구 단위 10행씩 -> 지역별 합계는 롤업이 만든다
+    grid = pd.MultiIndex.from_product([year_list, names, range(10)]).to_frame(index=False)
+    tables['greenhouse_gases'] = pd.DataFrame({
+        '년도': grid[0], '지역': grid[1],
+        '승용': rng.integers(100, 1000, len(grid)), '승합': rng.integers(10, 100, len(grid)),
+        '화물': rng.integers(50, 500, len(grid)), '특수': rng.integers(1, 10, len(grid)),
+    })
+
+    for table in ('electronic_car', 'hydrogen_car'):
+        grid = pd.MultiIndex.from_product([year_list, names, ['승용', '초소형', '화물', '승합', '기타']]).to_frame(index=False)
+        announced = rng.integers(100, 5000, len(grid))
+        received = (announced * rng.uniform(0.5, 1.0, len(grid))).astype(int)
+        released = (received * rng.uniform(0.5, 1.0, len(grid))).astype(int)
+        tables[table] = pd.DataFrame({
+            '년도': grid[0], '지역': grid[1], '차종': grid[2],
+            '민간공고대수': announced, '접수대수': received, '접수잔여대수': announced - received,
+            '출고대수': released, '출고잔여대수': announced - released,
+        })
+
+    for table in ('money_electronic_car', 'money_hydrogen_car'):
+        grid = pd.MultiIndex.from_product([range(len(names)), range(models)]).to_frame(index=False)
+        national = rng.integers(100, 700, len(grid))
+        local = rng.integers(100, 1500, len(grid))
+        money = pd.DataFrame({
+            '지역id': grid[0] + 1,
+            '시도': [names[i] for i in grid[0]],
+            '제조사': [f"제조사{m % 20:02d}" for m in grid[1]],
+            '모델명': [f"모델{m:05d}" for m in grid[1]],
+            '국비(만원)': [f"{v:,}" for v in national],
+            '지방비(만원)': [f"{v:,}" for v in local],
+            '보조금(만원)': [f"{v:,}" for v in national + local],
+        })
+        # 원본처럼 지역마다 합계 행이 섞여 있다
+        totals = pd.DataFrame({
+            '지역id': range(1, len(names) + 1), '시도': names, '제조사': '합계', '모델명': '합계',
+            '국비(만원)': '0', '지방비(만원)': '0', '보조금(만원)': '0',
+        })
+        tables[table] = pd.concat([money, totals], ignore_index=True)
+
+    words = np.array(FAQ_WORDS)
+    tables['faq'] = pd.DataFrame({
+        'id': range(1, faq + 1),
+        'category': rng.choice(FAQ_CATEGORIES, faq),
+        'question': [" ".join(words[rng.integers(0, len(words), 6)]) + "?" for _ in range(faq)],
+        'answer': [" ".join(words[rng.integers(0, len(words), 30)]) + "." for _ in range(faq)],
+    })
+    return tables
+
+
+def build_database(scale, workdir):
+    """합성 데이터를 스냅샷으로 저장하고 SQLite 파일로 적재, (DB 경로, {테이블: 행 수}) 반환"""
+    from database import snapshot
+    from database.backends import SQLiteBackend, seed_database
+
+    snapshot_dir = os.path.join(workdir, f"snapshot_{scale}")
+    manifest = {'created_at': time.time(), 'tables': {}}
+    for name, df in generate_tables(**SCALES[scale]).items():
+        manifest['tables'][name] = snapshot.write_table(df, name, snapshot_dir)
+    with open(os.path.join(snapshot_dir, snapshot.MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+
+    db_path = os.path.join(workdir, f"car_{scale}.sqlite")
+    backend = SQLiteBackend(db_path)
+    con = backend.connect()
+    loaded = seed_database(con, source='snapshot', tables=list(manifest['tables']), source_path=snapshot_dir)
+    con.close()
+    return db_path, loaded
+
+
+def _summary(samples):
+    ms = np.asarray(samples) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99, 'mean_ms': ms.mean(), 'min_ms': ms.min(), 'max_ms': ms.max()}
+
+
+def run_cases(scale, repeat):
+    """
+    (자식 프로세스) 현재 환경의 DB 로 각 조회 함수의 콜드/웜 지연 시간과 최대 메모리를 측정
+    콜드: 매 회 공유 캐시를 비운 뒤 호출 (TOP-K/검색 색인도 새 DataFrame 으로 다시 만들어짐)
+    웜: 한 번 호출해 캐시를 채운 뒤 반복 호출
+    """
+    from database.migrations import ensure_migrations
+    from database.rollup import ensure_rollups
+    from utilities.cache_utility import clear_cache
+    from utilities.app_utility import get_vehicle_registration_data, get_environmental_impact_data
+    from utilities.money_utility import get_announcement_data, get_subsidy_data, get_top5_models
+    from utilities.faq_utility import get_faq_data, search_faq
+
+    params = SCALES[scale]
+    first_year = LAST_YEAR - params['years'] + 1
+    regions = itertools.cycle(region_names(params['regions']))
+    terms = itertools.cycle(SEARCH_TERMS)
+
+    started = time.perf_counter()
+    ensure_migrations()
+    ensure_rollups()
+    setup_seconds = time.perf_counter() - started
+
+    cases = {
+        'get_vehicle_registration_data': lambda: get_vehicle_registration_data(first_year, LAST_YEAR),
+        'get_environmental_impact_data': lambda: get_environmental_impact_data(first_year, LAST_YEAR),
+        'get_announcement_data': lambda: get_announcement_data("electric"),
+        'get_subsidy_data': lambda: get_subsidy_data("electric"),
+        'get_top5_models': lambda: get_top5_models(next(regions), "electric"),
+        'get_faq_data': get_faq_data,
+        'search_faq': lambda: search_faq(get_faq_data(), next(terms)),
+    }
+
+    results = {}
+    for name, call in cases.items():
+        cold = []
+        for _ in range(repeat):
+            clear_cache()
+            started = time.perf_counter()
+            call()
+            cold.append(time.perf_counter() - started)
+
+        warm = []
+        call()
+        for _ in range(repeat):
+            started = time.perf_counter()
+            call()
+            warm.append(time.perf_counter() - started)
+
+        # tracemalloc 은 느리므로 시간 측정과 따로 한 번만 잰다
+        clear_cache()
+        gc.collect()
+        tracemalloc.start()
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results[name] = {'cold': _summary(cold), 'warm': _summary(warm), 'peak_kb': peak / 1024}
+
+    report = {'scale': scale, 'params': params, 'repeat': repeat, 'setup_seconds': setup_seconds, 'functions': results}
+    try:
+        import resource
+        report['max_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:
+        pass
+    return report
+
+
+def run_scale(scale, repeat, workdir):
+    """DB 를 만들고 새 프로세스에서 측정 (모듈 전역 캐시/색인이 비어 있는 상태에서 시작)"""
+    started = time.perf_counter()
+    db_path, loaded = build_database(scale, workdir)
+    build_seconds = time.perf_counter() - started
+
+    env = dict(os.environ, CAR_DB_BACKEND='sqlite', CAR_SQLITE_PATH=db_path, CAR_WARMUP='0')
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.data_layer", "--child", scale, "-n", str(repeat)],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    report = json.loads(output.strip().splitlines()[-1])
+    report['rows'] = loaded
+    report['build_seconds'] = build_seconds
+    return report
+
+
+def baseline_path(scale, directory=BASELINE_DIR):
+    return os.path.join(directory, f"{scale}.json")
+
+
+def save_baseline(report, directory=BASELINE_DIR):
+    os.makedirs(directory, exist_ok=True)
+    with open(baseline_path(report['scale'], directory), "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def compare(report, baseline, tolerance=REGRESSION_TOLERANCE):
+    """기준선 대비 p50 이 tolerance 넘게 느려진 (함수, 콜드/웜) 목록"""
+    regressions = []
+    for name, result in report['functions'].items():
+        before = baseline['functions'].get(name)
+        if before is None:
+            continue
+        for phase in ('cold', 'warm'):
+            now, then = result[phase]['p50_ms'], before[phase]['p50_ms']
+            if now > then * (1 + tolerance) and now - then > REGRESSION_FLOOR_MS:
+                regressions.append((name, phase, then, now))
+    return regressions
+
+
+def print_report(report):
+    params = report['params']
+    print(f"\n[{report['scale']}] 연도 {params['years']} x 지역 {params['regions']} x 모델 {params['models']}, "
+          f"FAQ {params['faq']}건 - 적재 {report['build_seconds']:.2f}초, "
+          f"마이그레이션/롤업 {report['setup_seconds']:.2f}초, 반복 {report['repeat']}회")
+    print(f"{'함수':<32}{'콜드 p50':>10}{'p95':>10}{'p99':>10}{'웜 p50':>10}{'p95':>10}{'최대 메모리':>14}")
+    for name, result in report['functions'].items():
+        cold, warm = result['cold'], result['warm']
+        print(f"{name:<32}{cold['p50_ms']:>9.2f}ms{cold['p95_ms']:>8.2f}ms{cold['p99_ms']:>8.2f}ms"
+              f"{warm['p50_ms']:>8.3f}ms{warm['p95_ms']:>8.3f}ms{result['peak_kb']:>12.0f}KB")
+    if 'max_rss_kb' in report:
+        print(f"프로세스 최대 RSS: {report['max_rss_kb'] / 1024:.1f}MB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="utilities 데이터 계층 벤치마크")
+    parser.add_argument("--scale", action="append", choices=list(SCALES), help="실행할 규모 (여러 번 지정 가능)")
+    parser.add_argument("-n", "--repeat", type=int, default=DEFAULT_REPEAT, help="콜드/웜 각각 반복 횟수")
+    parser.add_argument("--save-baseline", action="store_true", help="결과를 기준선으로 저장")
+    parser.add_argument("--baseline-dir", default=BASELINE_DIR)
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    parser.add_argument("--child", choices=list(SCALES), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_cases(args.child, args.repeat), ensure_ascii=False))
+        return 0
+
+    failed = False
+    with tempfile.TemporaryDirectory(prefix="car_bench_") as workdir:
+        for scale in args.scale or DEFAULT_SCALES:
+            report = run_scale(scale, args.repeat, workdir)
+            print_report(report)
+
+            path = baseline_path(scale, args.baseline_dir)
+            if args.save_baseline:
+                save_baseline(report, args.baseline_dir)
+                print(f"기준선 저장: {path}")
+            elif os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    regressions = compare(report, json.load(f), args.tolerance)
+                for name, phase, then, now in regressions:
+                    print(f"  회귀: {name} ({phase}) p50 {then:.2f}ms -> {now:.2f}ms")
+                if not regressions:
+                    print("  기준선 대비 회귀 없음")
+                failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+FAQ 검색 색인 벤치마크
+
+합성 FAQ 로 색인을 만들고 (utilities/search_utility.py) 검색어마다
+콜드(결과 캐시 비움) / 페이지 넘김(같은 검색어의 다음 페이지) / 카테고리 필터 지연 시간을 잰다.
+FAQ 화면은 같은 검색어로 페이지만 바꾸므로 페이지 넘김 p95 가 목표(TARGET_MS) 안인지 확인하고,
+새 검색어(콜드) p95 도 목표(COLD_TARGET_MS) 안인지 확인한다. 콜드 검색은 결과가 수천 건이면
+후보마다 원문 부분 문자열 확인을 하므로 페이지 넘김보다 목표가 크다.
+
+    python -m benchmarks.search_index                    # large (FAQ 50,000건)
+    python -m benchmarks.search_index --scale medium -n 50
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.data_layer import FAQ_CATEGORIES, SCALES, SEARCH_TERMS, generate_tables
+
+DEFAULT_SCALE = 'large'
+DEFAULT_REPEAT = 20
+PER_PAGE = 5
+TARGET_MS = 1.0
+COLD_TARGET_MS = 8.0
+# 검색어에 없는 한 글자/단어 경계 검색어도 같이 잰다
+QUERIES = SEARCH_TERMS + ["차", "금 안"]
+
+
+def _percentiles(samples):
+    ms = np.asarray(samples) * 1000
+    return {'p50_ms': float(np.percentile(ms, 50)), 'p95_ms': float(np.percentile(ms, 95))}
+
+
+def run(scale, repeat):
+    from utilities.search_utility import build_index
+
+    df = generate_tables(**SCALES[scale])['faq']
+    started = time.perf_counter()
+    index = build_index(df, group_col='category')
+    build_seconds = time.perf_counter() - started
+
+    results = {}
+    for query in QUERIES:
+        cold, paged, grouped = [], [], []
+        for i in range(repeat):
+            index._results.clear()
+            started = time.perf_counter()
+            _, total = index.search_page(query, 0, PER_PAGE)
+            cold.append(time.perf_counter() - started)
+
+            offset = (i % 20 + 1) * PER_PAGE
+            started = time.perf_counter()
+            index.search_page(query, offset, PER_PAGE)
+            paged.append(time.perf_counter() - started)
+
+            index._results.clear()
+            started = time.perf_counter()
+            index.search_page(query, 0, PER_PAGE, FAQ_CATEGORIES[i % len(FAQ_CATEGORIES)])
+            grouped.append(time.perf_counter() - started)
+        results[query] = {'total': total, 'cold': _percentiles(cold),
+                          'page': _percentiles(paged), 'category': _percentiles(grouped)}
+    return {'scale': scale, 'docs': len(df), 'repeat': repeat, 'build_seconds': build_seconds, 'queries': results}
+
+
+def print_report(report):
+    print(f"[{report['scale']}] FAQ {report['docs']}건 - 색인 생성 {report['build_seconds']:.2f}초, 반복 {report['repeat']}회")
+    print(f"{'검색어':<16}{'결과':>8}{'콜드 p50':>10}{'p95':>9}{'페이지 p50':>11}{'p95':>9}{'카테고리 p50':>12}{'p95':>9}")
+    for query, result in report['queries'].items():
+        cold, page, category = result['cold'], result['page'], result['category']
+        print(f"{query:<16}{result['total']:>8}{cold['p50_ms']:>8.2f}ms{cold['p95_ms']:>7.2f}ms"
+              f"{page['p50_ms']:>9.3f}ms{page['p95_ms']:>7.3f}ms{category['p50_ms']:>10.2f}ms{category['p95_ms']:>7.2f}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FAQ 검색 색인 벤치마크")
+    parser.add_argument("--scale", choices=list(SCALES), default=DEFAULT_SCALE)
+    parser.add_argument("-n", "--repeat", type=int, default=DEFAULT_REPEAT)
+    args = parser.parse_args(argv)
+
+    report = run(args.scale, args.repeat)
+    print_report(report)
+    slow = []
+    for query, result in report['queries'].items():
+        for name, label, target in (('page', "페이지 넘김", TARGET_MS), ('cold', "콜드", COLD_TARGET_MS)):
+            if result[name]['p95_ms'] > target:
+                slow.append(query)
+                print(f"  목표 초과: '{query}' {label} p95 {result[name]['p95_ms']:.3f}ms > {target}ms")
+    return 1 if slow else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,394 @@
+"""
+저장소 백엔드
+
+connect_db() 가 어떤 DB 를 쓸지 CAR_DB_BACKEND 환경 변수로 고른다.
+
+    mysql     MySQL 서버 (기본값, 연결 풀 사용)
+    sqlite    로컬 SQLite 파일 (CAR_SQLITE_PATH, 기본 data/car.sqlite)
+    snapshot  로컬 스냅샷(database/snapshot.py)을 적재한 in-memory SQLite
+
+유틸리티의 쿼리는 pymysql 스타일(%s)로 작성하고, SQLite 백엔드가 ? 로 바꿔 실행한다.
+SQLite 파일은 같은 스키마(database/schema.py)로 MySQL 이나 스냅샷에서 채울 수 있다.
+
+    python -m database.backends seed data/car.sqlite --from mysql
+    python -m database.backends seed data/car.sqlite --from snapshot
+"""
+import itertools
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+from database.schema import SCHEMA, create_table_sql, quote
+
+SQLITE_PATH = os.environ.get("CAR_SQLITE_PATH", os.path.join("data", "car.sqlite"))
+SEED_BATCH_SIZE = 1000
+
+
+class MySQLBackend:
+    """연결 풀을 쓰는 MySQL 백엔드"""
+
+    name = 'mysql'
+
+    def connect(self):
+        from database.database import get_pool
+        return get_pool().acquire()
+
+    def table_exists(self, table):
+        con = self.connect()
+        try:
+            cursor = con.cursor()
+            cursor.execute(
+                "SELECT COUNT(*) FROM information_schema.tables "
+                "WHERE table_schema = DATABASE() AND table_name = %s",
+                (table,)
+            )
+            exists = cursor.fetchone()[0] > 0
+            cursor.close()
+        finally:
+            con.close()
+        return exists
+
+    def index_exists(self, cursor, table, index):
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s",
+            (table, index)
+        )
+        return cursor.fetchone()[0] > 0
+
+    def trigger_exists(self, cursor, trigger):
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.triggers WHERE trigger_schema = DATABASE() AND trigger_name = %s",
+            (trigger,)
+        )
+        return cursor.fetchone()[0] > 0
+
+    def stream_cursor(self, con):
+        """결과를 서버에 둔 채로 fetchmany 할 때마다 받아오는 커서 (SSCursor)"""
+        import pymysql.cursors
+        return con.cursor(pymysql.cursors.SSCursor)
+
+    def change_log_ddl(self):
+        return """
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+            table_name VARCHAR(64) NOT NULL,
+            row_key BIGINT,
+            op CHAR(1) NOT NULL
+        )
+        """
+
+    def change_trigger_ddl(self, table, key_column):
+        """table 의 INSERT/UPDATE/DELETE 마다 change_log 에 (테이블, 키, 종류) 를 남기는 트리거"""
+        key = quote(key_column)
+        log = f"INSERT INTO change_log (table_name, row_key, op) VALUES ('{table}'"
+        return [
+            f"CREATE TRIGGER {quote('trg_' + table + '_insert')} AFTER INSERT ON {quote(table)} "
+            f"FOR EACH ROW {log}, NEW.{key}, 'I')",
+            f"CREATE TRIGGER {quote('trg_' + table + '_update')} AFTER UPDATE ON {quote(table)} "
+            f"FOR EACH ROW BEGIN {log}, NEW.{key}, 'U'); "
+            f"IF NOT (OLD.{key} <=> NEW.{key}) THEN {log}, OLD.{key}, 'U'); END IF; END",
+            f"CREATE TRIGGER {quote('trg_' + table + '_delete')} AFTER DELETE ON {quote(table)} "
+            f"FOR EACH ROW {log}, OLD.{key}, 'D')",
+        ]
+
+    def derived_column_trigger_ddl(self, table, name, expressions):
+        """
+        INSERT/UPDATE 되는 행의 컬럼을 그 행의 다른 값으로 정하는 트리거 {트리거 이름: 문장}
+        expressions 는 {컬럼: NEW. 기준 SQL 식}
+        """
+        assignments = ', '.join(f"NEW.{quote(column)} = {expression}" for column, expression in expressions.items())
+        return {
+            f"trg_{table}_{name}_{event.lower()}":
+                f"CREATE TRIGGER {quote('trg_' + table + '_' + name + '_' + event.lower())} "
+                f"BEFORE {event} ON {quote(table)} FOR EACH ROW SET {assignments}"
+            for event in ('INSERT', 'UPDATE')
+        }
+
+    def amount_sql(self, text):
+        """'1,234' 같은 금액 문자열 식 -> 정수 식 (숫자가 아니면 0, migrations.parse_amount 와 같은 규칙)"""
+        cleaned = f"REPLACE(TRIM({text}), ',', '')"
+        # 숫자가 아닌 문자열을 CAST 하면 strict 모드에서 INSERT 가 실패하므로 먼저 거른다
+        return f"(CASE WHEN {cleaned} REGEXP '^-?[0-9]+([.][0-9]*)?$' THEN CAST(TRUNCATE({cleaned}, 0) AS SIGNED) ELSE 0 END)"
+
+    def stats(self):
+        from database.database import get_pool
+        return get_pool().stats()
+
+
+# ------------------------- SQLite -------------------------
+
+_PARAM_RE = re.compile(r"%(s|%)")
+
+
+def _translate(query, params):
+    """pymysql 스타일(%s) 쿼리를 sqlite3 스타일(?) 로 변환"""
+    if params is None:
+        return query, ()
+    return _PARAM_RE.sub(lambda m: "?" if m.group(1) == "s" else "%", query), tuple(params)
+
+
+class SQLiteCursor:
+    """pymysql 커서처럼 %s 파라미터를 받는 sqlite3 커서 래퍼"""
+
+    def __init__(self, raw):
+        self._cursor = raw.cursor()
+
+    def execute(self, query, params=None):
+        query, params = _translate(query, params)
+        self._cursor.execute(query, params)
+        return self._cursor.rowcount
+
+    def executemany(self, query, seq_of_params):
+        query, _ = _translate(query, ())
+        self._cursor.executemany(query, [tuple(p) for p in seq_of_params])
+        return self._cursor.rowcount
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """connect_db() 가 돌려주는 연결과 같은 방식으로 쓸 수 있는 sqlite3 연결 래퍼"""
+
+    def __init__(self, raw):
+        self._raw = raw
+
+    def cursor(self):
+        return SQLiteCursor(self._raw)
+
+    def begin(self):
+        self._raw.execute("BEGIN")
+
+    def commit(self):
+        self._raw.commit()
+
+    def rollback(self):
+        self._raw.rollback()
+
+    def ping(self, reconnect=False):
+        return True
+
+    def close(self):
+        # 스레드별 연결을 재사용하므로 실제로 닫지 않는다
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class SQLiteBackend:
+    """
+    내장 SQLite 백엔드
+    스레드마다 연결을 하나씩 열어 재사용한다. path 가 ':memory:' 이면 프로세스 안에서
+    공유되는 in-memory DB 를 쓰고, seed 함수가 주어지면 처음 열 때 데이터를 채운다.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path=SQLITE_PATH, seed=None):
+        if path == ":memory:":
+            self._uri = f"file:car_{id(self)}?mode=memory&cache=shared"
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._uri = f"file:{os.path.abspath(path)}"
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._created = 0
+        # in-memory DB 는 연결이 하나라도 열려 있어야 유지된다
+        self._keeper = self._open()
+        if seed is not None:
+            seed(SQLiteConnection(self._keeper))
+
+    def _open(self):
+        raw = sqlite3.connect(self._uri, uri=True, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._created += 1
+        return raw
+
+    def connect(self):
+        raw = getattr(self._local, 'raw', None)
+        if raw is None:
+            raw = self._local.raw = self._open()
+        return SQLiteConnection(raw)
+
+    def table_exists(self, table):
+        cursor = self.connect().cursor()
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = %s", (table,))
+        exists = cursor.fetchone()[0] > 0
+        cursor.close()
+        return exists
+
+    def index_exists(self, cursor, table, index):
+        # SQLite 의 인덱스 이름은 DB 전체에서 하나이므로 이름으로만 찾는다
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'index' AND name = %s", (index,))
+        return cursor.fetchone()[0] > 0
+
+    def trigger_exists(self, cursor, trigger):
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name = %s", (trigger,))
+        return cursor.fetchone()[0] > 0
+
+    def stream_cursor(self, con):
+        # sqlite3 커서는 fetchmany 할 때마다 다음 행을 읽으므로 일반 커서로 충분하다
+        return con.cursor()
+
+    def change_log_ddl(self):
+        return """
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name VARCHAR(64) NOT NULL,
+            row_key BIGINT,
+            op CHAR(1) NOT NULL
+        )
+        """
+
+    def change_trigger_ddl(self, table, key_column):
+        """table 의 INSERT/UPDATE/DELETE 마다 change_log 에 (테이블, 키, 종류) 를 남기는 트리거"""
+        key = quote(key_column)
+        log = f"INSERT INTO change_log (table_name, row_key, op)"
+        return [
+            f"CREATE TRIGGER IF NOT EXISTS {quote('trg_' + table + '_insert')} AFTER INSERT ON {quote(table)} "
+            f"BEGIN {log} VALUES ('{table}', NEW.{key}, 'I'); END",
+            f"CREATE TRIGGER IF NOT EXISTS {quote('trg_' + table + '_update')} AFTER UPDATE ON {quote(table)} "
+            f"BEGIN {log} VALUES ('{table}', NEW.{key}, 'U'); "
+            f"{log} SELECT '{table}', OLD.{key}, 'U' WHERE OLD.{key} IS NOT NEW.{key}; END",
+            f"CREATE TRIGGER IF NOT EXISTS {quote('trg_' + table + '_delete')} AFTER DELETE ON {quote(table)} "
+            f"BEGIN {log} VALUES ('{table}', OLD.{key}, 'D'); END",
+        ]
+
+    def derived_column_trigger_ddl(self, table, name, expressions):
+        """
+        INSERT/UPDATE 된 행의 컬럼을 그 행의 다른 값으로 맞추는 트리거 {트리거 이름: 문장}
+        expressions 는 {컬럼: NEW. 기준 SQL 식}
+        SQLite 트리거는 NEW 를 바꿀 수 없어서 AFTER 트리거가 같은 행을 다시 UPDATE 한다 (값이 다를 때만).
+        """
+        assignments = ', '.join(f"{quote(column)} = {expression}" for column, expression in expressions.items())
+        differs = ' OR '.join(f"{quote(column)} IS NOT {expression}" for column, expression in expressions.items())
+        fix = f"UPDATE {quote(table)} SET {assignments} WHERE rowid = NEW.rowid AND ({differs})"
+        return {
+            f"trg_{table}_{name}_{event.lower()}":
+                f"CREATE TRIGGER IF NOT EXISTS {quote('trg_' + table + '_' + name + '_' + event.lower())} "
+                f"AFTER {event} ON {quote(table)} BEGIN {fix}; END"
+            for event in ('INSERT', 'UPDATE')
+        }
+
+    def amount_sql(self, text):
+        """'1,234' 같은 금액 문자열 식 -> 정수 식 (숫자가 아니면 0, migrations.parse_amount 와 같은 규칙)"""
+        return f"COALESCE(CAST(REPLACE(TRIM({text}), ',', '') AS INTEGER), 0)"
+
+    def stats(self):
+        return {'backend': self.name, 'created': self._created}
+
+
+# ------------------------- 내장 DB 적재 -------------------------
+
+def _iter_mysql_tables(tables):
+    """MySQL 에서 (테이블, 컬럼 목록, 종류, 행 iterator) 를 차례로 돌려준다"""
+    from database.database import get_pool
+
+    con = get_pool().acquire()
+    try:
+        for table in tables:
+            cursor = con.cursor()
+            cursor.execute(f"SELECT * FROM {quote(table)}")
+            columns = [desc[0] for desc in cursor.description]
+            yield table, columns, {}, iter(cursor.fetchall())
+            cursor.close()
+    finally:
+        con.close()
+
+
+def _iter_snapshot_tables(tables, path=None):
+    from database import snapshot
+
+    path = path or snapshot.SNAPSHOT_DIR
+    manifest = snapshot.read_manifest(path)
+    for table in tables:
+        if table not in manifest['tables']:
+            continue
+        meta = manifest['tables'][table]
+        kinds = {column['name']: column['kind'] for column in meta['columns']}
+        df = snapshot.load_table(table, path, manifest)
+        df = df.astype(object).where(df.notna(), None)
+        yield table, list(df.columns), kinds, df.itertuples(index=False, name=None)
+
+
+def seed_database(con, source='snapshot', tables=None, source_path=None):
+    """
+    con(SQLiteConnection 등)에 같은 스키마로 테이블을 만들고 source 의 데이터를 채운다
+    테이블을 새로 만들면 마이그레이션이 더한 컬럼/인덱스/트리거가 없어지므로 적용 기록(schema_migrations)도 지운다.
+    적재 뒤에 run_migrations() 를 실행하면 모든 단계를 다시 적용한다.
+    반환값: {테이블: 적재한 행 수}
+    """
+    tables = tables or list(SCHEMA)
+    if source == 'mysql':
+        sources = _iter_mysql_tables(tables)
+    else:
+        sources = _iter_snapshot_tables(tables, source_path)
+
+    loaded = {}
+    cursor = con.cursor()
+    for table, columns, kinds, rows in sources:
+        cursor.execute(f"DROP TABLE IF EXISTS {quote(table)}")
+        cursor.execute(create_table_sql(table, columns, kinds))
+        insert = (
+            f"INSERT INTO {quote(table)} ({', '.join(quote(c) for c in columns)}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))})"
+        )
+        count = 0
+        con.begin()
+        while True:
+            batch = list(itertools.islice(rows, SEED_BATCH_SIZE))
+            if not batch:
+                break
+            cursor.executemany(insert, batch)
+            count += len(batch)
+        con.commit()
+        loaded[table] = count
+    if loaded:
+        cursor.execute("DROP TABLE IF EXISTS schema_migrations")
+    # 원본에 없던 테이블도 비어 있는 채로 만들어 두어야 마이그레이션이 모든 테이블에 적용된다
+    for table in SCHEMA:
+        cursor.execute(create_table_sql(table))
+    cursor.close()
+    return loaded
+
+
+def create_backend(name):
+    if name == 'mysql':
+        return MySQLBackend()
+    if name == 'sqlite':
+        return SQLiteBackend(SQLITE_PATH)
+    if name == 'snapshot':
+        # 프로세스 안에서 만드는 DB 라 배포 단계가 없으므로 적재 직후 마이그레이션까지 적용해 둔다
+        from database.migrations import run_migrations
+        backend = SQLiteBackend(":memory:", seed=lambda con: seed_database(con, source='snapshot'))
+        run_migrations(backend.connect(), backend)
+        return backend
+    raise ValueError(f"알 수 없는 DB 백엔드: {name}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if len(args) >= 2 and args[0] == "seed":
+        target = args[1]
+        source = args[args.index("--from") + 1] if "--from" in args else "mysql"
+        started = time.perf_counter()
+        from database.migrations import run_migrations
+        backend = SQLiteBackend(target)
+        result = seed_database(backend.connect(), source=source)
+        run_migrations(backend.connect(), backend)
+        for table, count in result.items():
+            print(f"{table}: {count}행")
+        print(f"{target} 적재 완료 ({source}, {time.perf_counter() - started:.2f}초)")
+    else:
+        print("사용법: python -m database.backends seed <sqlite 경로> [--from mysql|snapshot]")
@@ -0,0 +1,92 @@
+"""
+변경 데이터 추적
+
+추적 대상 테이블에 트리거를 걸어(마이그레이션 3) INSERT/UPDATE/DELETE 마다
+change_log 에 (순번, 테이블, 행 키, 종류) 를 남긴다. 행 키는 바뀐 행을 다시 찾는 데 쓰는 컬럼 값으로,
+공고 현황/온실가스/친환경 자동차 테이블은 연도(요약 테이블을 연도 단위로 다시 집계), 보조금 테이블은 지역id, FAQ 는 id 이다.
+
+읽는 쪽은 마지막으로 읽은 순번 이후의 기록만 가져오므로(read_changes) 전체 테이블을 다시 조회하지 않고
+바뀐 키만 알 수 있다. 캐시/요약 테이블/검색 색인에 반영하는 일은 utilities/change_utility.py 가 한다.
+"""
+from collections import defaultdict
+
+from database.database import get_connection, get_backend
+from database.instrumentation import record_error
+from database.rollup import ROLLUP_SOURCES
+
+# 추적 테이블 -> 행 키 컬럼
+TRACKED_TABLES = {
+    'electronic_car': '년도',
+    'hydrogen_car': '년도',
+    'greenhouse_gases': '년도',
+    'environmental_vehicles': '연도',
+    'money_electronic_car': '지역id',
+    'money_hydrogen_car': '지역id',
+    'faq': 'id',
+}
+READ_LIMIT = 10000   # 한 번에 읽는 change_log 행 수
+
+
+def is_tracked(table):
+    """
+    table 의 변경이 change_log 로 알려지는지 (요약 테이블은 원본 테이블이 모두 추적될 때)
+    추적되지 않는 테이블은 데이터 버전이 올라가지 않으므로 버전이 같다고 최신이라고 볼 수 없다.
+    """
+    return all(source in TRACKED_TABLES for source in ROLLUP_SOURCES.get(table, (table,)))
+
+
+def install_change_tracking(cursor, backend=None):
+    """
+    change_log 테이블과 추적 테이블별 트리거 생성 (이미 있는 트리거는 건너뛴다)
+    트리거를 만들 권한이 없으면(MySQL TRIGGER 권한) 알리고 넘어간다. 그 경우 캐시는 TTL 로만 갱신된다.
+    """
+    backend = backend or get_backend()
+    cursor.execute(backend.change_log_ddl())
+    for table, key_column in TRACKED_TABLES.items():
+        for operation, statement in zip(('insert', 'update', 'delete'), backend.change_trigger_ddl(table, key_column)):
+            if backend.trigger_exists(cursor, f"trg_{table}_{operation}"):
+                continue
+            try:
+                cursor.execute(statement)
+            except Exception as e:
+                record_error(f"install_change_tracking:{table}", e)
+
+
+def latest_seq():
+    """지금까지 기록된 마지막 순번 (기록이 없으면 0)"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT MAX(seq) FROM change_log")
+        seq = cursor.fetchone()[0]
+        cursor.close()
+    return seq or 0
+
+
+def read_changes(after_seq, limit=READ_LIMIT):
+    """
+    after_seq 이후의 변경 기록을 읽어 (마지막 순번, {테이블: 바뀐 행 키 집합}) 으로 반환
+    기록이 limit 보다 많으면 limit 개까지만 읽으므로 마지막 순번부터 다시 호출하면 된다.
+    """
+    changes = defaultdict(set)
+    last_seq = after_seq
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT seq, table_name, row_key FROM change_log WHERE seq > %s ORDER BY seq LIMIT %s",
+            (after_seq, limit)
+        )
+        for seq, table, row_key in cursor.fetchall():
+            changes[table].add(row_key)
+            last_seq = seq
+        cursor.close()
+    return last_seq, dict(changes)
+
+
+def prune_change_log(upto_seq):
+    """upto_seq 까지의 기록 삭제 (모든 앱 프로세스가 읽은 뒤에 실행)"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM change_log WHERE seq <= %s", (upto_seq,))
+        removed = cursor.rowcount
+        cursor.close()
+    return removed
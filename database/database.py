@@ -1,6 +1,255 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
 import pymysql
 
+from database.instrumentation import instrument_connection, register_collector
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': 'root1234',
+    'db': 'car',
+    'charset': 'utf8',
+    # 풀에 오래 머무는 연결이 오래된 스냅샷을 보지 않도록 자동 커밋
+    'autocommit': True,
+}
+
+# mysql / sqlite / snapshot 중 선택 (database/backends.py 참고)
+DB_BACKEND = os.environ.get('CAR_DB_BACKEND', os.environ.get('CAR_DATA_SOURCE', 'mysql'))
+
+POOL_MAX_SIZE = 10          # 동시에 열어 둘 수 있는 최대 연결 수
+POOL_RECYCLE_SECONDS = 1800  # 이 시간보다 오래된 연결은 새로 연결
+POOL_ACQUIRE_TIMEOUT = 10   # 빈 연결을 기다리는 최대 시간(초)
+
+
+class PooledConnection:
+    """
+    풀에서 빌려온 연결 래퍼
+    close() 를 호출하면 실제로 끊지 않고 풀에 반납한다.
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def close(self):
+        if not self._released:
+            self._released = True
+            self._pool.release(self._raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __del__(self):
+        # close() 없이 버려진 연결도 풀로 돌려보낸다
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """
+    pymysql 연결 풀
+    최대 연결 수 제한, 반납/대여 시 상태 점검, 오래된 연결 재생성을 담당한다.
+    """
+
+    def __init__(self, max_size=POOL_MAX_SIZE, recycle=POOL_RECYCLE_SECONDS,
+                 timeout=POOL_ACQUIRE_TIMEOUT, **config):
+        self.max_size = max_size
+        self.recycle = recycle
+        self.timeout = timeout
+        self.config = config or dict(DB_CONFIG)
+
+        self._idle = []            # (raw 연결, 생성 시각)
+        self._created_at = {}      # id(raw) -> 생성 시각
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self._metrics = {
+            'created': 0,
+            'acquired': 0,
+            'released': 0,
+            'recycled': 0,
+            'health_check_failures': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'acquire_wait_seconds': 0.0,
+        }
+
+    def _total(self):
+        return self._in_use + len(self._idle)
+
+    def _open(self):
+        raw = pymysql.connect(**self.config)
+        self._created_at[id(raw)] = time.monotonic()
+        self._metrics['created'] += 1
+        return raw
+
+    def _discard(self, raw):
+        self._created_at.pop(id(raw), None)
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, raw, created_at):
+        if self.recycle and time.monotonic() - created_at > self.recycle:
+            self._metrics['recycled'] += 1
+            return False
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except Exception:
+            self._metrics['health_check_failures'] += 1
+            return False
+
+    def acquire(self):
+        """연결 하나를 빌려온다 (없으면 새로 만들고, 가득 차면 대기)"""
+        started = time.monotonic()
+        with self._cond:
+            waited = False
+            while not self._idle and self._total() >= self.max_size:
+                if not waited:
+                    self._metrics['waits'] += 1
+                    waited = True
+                remaining = self.timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self._metrics['timeouts'] += 1
+                    raise TimeoutError(f"DB 연결 풀이 가득 찼습니다 (max_size={self.max_size})")
+                self._cond.wait(remaining)
+
+            raw = None
+            if self._idle:
+                raw, created_at = self._idle.pop()
+            # 사용 중 카운트를 먼저 올려 두어 다른 스레드가 한도를 넘지 않게 한다
+            self._in_use += 1
+
+        try:
+            if raw is not None and not self._is_healthy(raw, created_at):
+                self._discard(raw)
+                raw = None
+            if raw is None:
+                raw = self._open()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._metrics['acquired'] += 1
+            self._metrics['acquire_wait_seconds'] += time.monotonic() - started
+        return PooledConnection(self, raw)
+
+    def release(self, raw):
+        """빌려간 연결을 풀에 반납"""
+        with self._cond:
+            self._in_use -= 1
+            self._metrics['released'] += 1
+            created_at = self._created_at.get(id(raw))
+            if created_at is None or getattr(raw, 'open', True) is False:
+                self._discard(raw)
+            else:
+                self._idle.append((raw, created_at))
+            self._cond.notify()
+
+    def close_all(self):
+        """유휴 연결을 모두 닫는다"""
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for raw, _ in idle:
+            self._discard(raw)
+
+    def stats(self):
+        """풀 상태와 누적 지표를 딕셔너리로 반환"""
+        with self._cond:
+            stats = dict(self._metrics)
+            stats.update({
+                'max_size': self.max_size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'total': self._total(),
+            })
+        return stats
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """프로세스 전역 연결 풀을 반환 (최초 호출 시 생성)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(**DB_CONFIG)
+    return _pool
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """DB_BACKEND 설정에 맞는 저장소 백엔드를 반환 (최초 호출 시 생성)"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                from database.backends import create_backend
+                _backend = create_backend(DB_BACKEND)
+    return _backend
+
+
 def connect_db():
-    con = pymysql.connect(host='localhost', user='root', password='root1234',
-                        db='car', charset='utf8') 
-    return con 
+    started = time.perf_counter()
+    con = get_backend().connect()
+    # 쿼리별 시간/행 수/바이트와 연결 대여 시간 기록 (database/instrumentation.py)
+    return instrument_connection(con, time.perf_counter() - started)
+
+
+@contextmanager
+def get_connection():
+    """with 문으로 연결을 빌려 쓰고 자동으로 반납"""
+    con = connect_db()
+    try:
+        yield con
+    finally:
+        con.close()
+
+
+def stream_cursor(con):
+    """큰 결과를 메모리에 한 번에 올리지 않고 fetchmany 로 나눠 읽는 커서"""
+    return get_backend().stream_cursor(con)
+
+
+def table_exists(table):
+    """현재 백엔드에 테이블이 있는지 확인"""
+    return get_backend().table_exists(table)
+
+
+def get_pool_stats():
+    """연결 풀 지표 (대시보드/모니터링 노출용)"""
+    return get_backend().stats()
+
+
+def _collect_pool_metrics():
+    stats = get_pool_stats()
+    return [
+        (f"car_pool_{key}", "gauge", f"연결 풀 {key}", [({}, value)])
+        for key, value in stats.items() if isinstance(value, (int, float))
+    ]
+
+
+register_collector(_collect_pool_metrics)
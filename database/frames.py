@@ -0,0 +1,74 @@
+"""
+조회 결과 -> 타입이 정해진 DataFrame
+
+커서 결과를 fetchmany 로 나눠 받아 바로 컬럼별 목록으로 옮기고(행 튜플 목록을 통째로 들고 있지 않음),
+컬럼 종류(database/schema.py 의 COLUMN_KINDS)에 맞는 dtype 으로 만든다.
+
+    year      연도. 모든 결과에서 int16 으로 통일해 병합/비교할 때 dtype 이 어긋나지 않게 한다
+    int       id/행 단위 금액. Decimal/문자열도 숫자로 바꾸고 int32 이상에서 값 범위에 맞는 정수형으로 줄인다
+              (NULL 이 있으면 float64)
+    measure   더하거나 집계하는 개수/배출량. int64 로 둔다 (int32 컬럼끼리 더하면 넘쳐서 음수가 될 수 있다)
+    category  지역/차종/모델명/FAQ 카테고리처럼 같은 값이 반복되는 문자열 → pandas Categorical
+    그 외      pandas 기본 추론 (질문/답변 같은 긴 문자열)
+"""
+import numpy as np
+import pandas as pd
+
+from database.schema import COLUMN_KINDS
+
+FETCH_CHUNK_SIZE = 5000
+YEAR_DTYPE = np.int16
+MIN_INT_DTYPE = np.int32
+
+
+def downcast_int(series):
+    """정수 Series 를 int32 이상에서 값이 들어가는 가장 작은 정수형으로"""
+    if len(series) and series.min() >= np.iinfo(MIN_INT_DTYPE).min and series.max() <= np.iinfo(MIN_INT_DTYPE).max:
+        return series.astype(MIN_INT_DTYPE)
+    return series.astype(np.int64)
+
+
+def _convert(values, kind):
+    if kind == 'category':
+        return pd.Categorical(values)
+    if kind in ('int', 'measure', 'year'):
+        numeric = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce')
+        if numeric.isna().any() or not (numeric % 1 == 0).all():
+            return numeric.astype(np.float64)
+        if kind == 'year':
+            return numeric.astype(YEAR_DTYPE)
+        if kind == 'measure':
+            return numeric.astype(np.int64)
+        return downcast_int(numeric.astype(np.int64))
+    if kind == 'float':
+        return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').astype(np.float64)
+    return pd.Series(values)
+
+
+def frame_from_columns(columns, values, kinds=None):
+    """컬럼 이름 목록과 컬럼별 값 목록으로 DataFrame 생성 (kinds 로 COLUMN_KINDS 덮어쓰기)"""
+    kinds = {**COLUMN_KINDS, **(kinds or {})}
+    data = {
+        column: _convert(column_values, kinds.get(column))
+        for column, column_values in zip(columns, values)
+    }
+    return pd.DataFrame(data, columns=columns)
+
+
+def frame_from_rows(rows, columns, kinds=None):
+    """행 튜플 목록(fetchmany 한 덩어리 등) -> 타입이 정해진 DataFrame"""
+    values = list(zip(*rows)) if rows else [() for _ in columns]
+    return frame_from_columns(columns, values, kinds)
+
+
+def read_frame(cursor, kinds=None, chunk_size=FETCH_CHUNK_SIZE):
+    """실행된 커서의 결과 전체를 타입이 정해진 DataFrame 으로 읽는다"""
+    columns = [desc[0] for desc in cursor.description]
+    values = [[] for _ in columns]
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        for column_values, chunk in zip(values, zip(*rows)):
+            column_values.extend(chunk)
+    return frame_from_columns(columns, values, kinds)
@@ -0,0 +1,434 @@
+"""
+공공데이터 CSV/XLSX 일괄 적재
+
+원본 파일을 한 번에 메모리에 올리지 않고 행 단위로 읽어서(CSV 는 csv 모듈, XLSX 는 openpyxl read_only)
+car 스키마에 맞게 정리한 뒤 묶음(INGEST_BATCH_SIZE 행)마다 executemany 로 넣는다.
+
+    열 이름   공백/줄바꿈을 지우고 스키마 컬럼으로 맞춤 ('연도'/'기준년도' -> 년도, '시도명' -> 지역 등)
+    지역명    '서울특별시' -> '서울', '충청북도' -> '충북' (지도의 KOR_TO_ENG 와 같은 표기, geo_utility.short_region_name)
+    숫자      '1,234' / '-' / 빈 칸 -> 정수 / 0 / NULL, 보조금 테이블은 쉼표 문자열 컬럼과 정수 컬럼을 함께 채움
+    합계 행   공고 현황/온실가스는 요약 테이블에서 지역을 더하므로 건너뛰고,
+              보조금 테이블은 지금 DB 처럼 '합계' 로 표기를 맞춰 is_total = 1 로 남긴다 (--skip-totals 로 건너뛰기)
+              전국 합계 행은 지역id 를 0 으로 채운다
+
+파일마다 내용 해시로 이름을 붙인 임시 테이블(ingest_staging_*)에 먼저 쌓고, 묶음을 넣을 때마다
+읽은 행 수(건너뛴 합계/빈 키 행 수 포함)를 ingest_state 에 같은 트랜잭션으로 기록한다. 중간에 멈추면 같은 명령으로 그 다음 행부터 이어서 읽는다.
+다 읽으면 한 트랜잭션 안에서 대상 테이블의 같은 키(INGEST_KEYS) 행을 지우고 임시 테이블 행으로 채우므로
+같은 파일을 다시 적재해도 행이 늘지 않는다. 이미 적재를 마친 파일(같은 해시)은 건너뛴다 (--force 로 다시 적재).
+
+    python -m database.ingest electronic_car data/raw/전기차_2024.csv
+    python -m database.ingest money_hydrogen_car data/raw/수소차_보조금.xlsx --sheet 2024 --skip-rows 2
+"""
+import csv
+import hashlib
+import itertools
+import os
+import re
+import sys
+import time
+
+from database.database import get_connection
+from database.migrations import AMOUNT_COLUMNS, MONEY_TABLES, column_exists, ensure_migrations, parse_amount
+from database.rollup import ANNOUNCEMENT_SOURCES, GREENHOUSE_SOURCE, refresh_rollups
+from database.schema import SCHEMA, create_table_sql, quote
+from utilities.cache_utility import invalidate_table
+from utilities.geo_utility import KOR_TO_ENG, short_region_name
+
+INGEST_BATCH_SIZE = 1000
+HASH_CHUNK_SIZE = 1 << 20
+CSV_ENCODINGS = ('utf-8-sig', 'cp949')
+
+# 대상 테이블별 행을 구분하는 키 (다시 적재할 때 이 키가 같은 행을 바꿔 넣는다)
+INGEST_KEYS = {
+    'environmental_vehicles': ('연도', '구분'),
+    'greenhouse_gases': ('년도', '지역'),
+    'electronic_car': ('년도', '지역', '차종'),
+    'hydrogen_car': ('년도', '지역', '차종'),
+    'money_electronic_car': ('지역id', '시도', '제조사', '모델명'),
+    'money_hydrogen_car': ('지역id', '시도', '제조사', '모델명'),
+    'faq': ('id',),
+}
+
+# 원본 열 이름(공백 제거) -> 스키마 컬럼. 연도/지역 열은 테이블마다 이름이 달라 따로 맞춘다
+YEAR_HEADERS = {'연도', '년도', '기준연도', '기준년도', 'year'}
+REGION_HEADERS = {'지역', '시도', '시도명', '지역명', '지자체', 'region'}
+HEADER_ALIASES = {
+    '차량구분': '차종', '차량종류': '차종',
+    '제조사명': '제조사', '제작사': '제조사',
+    '차량모델': '모델명', '모델': '모델명', '차종명': '모델명',
+    '카테고리': 'category', '분류': 'category',
+    '질문': 'question', '답변': 'answer',
+}
+TOTAL_NAMES = {'합계', '총계', '소계', '계', '전국'}
+REGION_COLUMNS = ('지역', '시도')
+# 보조금 테이블의 지역id 는 KOR_TO_ENG 순서(서울 1 ~ 제주 17)라서 원본에 없으면 시도로 채운다
+REGION_IDS = {name: i for i, name in enumerate(KOR_TO_ENG, start=1)}
+# 전국 합계 행('합계')은 지역이 없어서 0 으로 둔다 (지역id 도 키라서 비워 두면 빈 키 행으로 버려진다)
+TOTAL_REGION_ID = 0
+
+STATE_DDL = """
+CREATE TABLE IF NOT EXISTS ingest_state (
+    table_name VARCHAR(64) NOT NULL,
+    file_hash CHAR(64) NOT NULL,
+    source_path VARCHAR(255) NOT NULL,
+    rows_read INT NOT NULL,
+    rows_loaded INT NOT NULL,
+    rows_incomplete INT NOT NULL DEFAULT 0,
+    rows_totals INT NOT NULL DEFAULT 0,
+    status VARCHAR(10) NOT NULL,
+    updated_at DOUBLE NOT NULL,
+    PRIMARY KEY (table_name, file_hash)
+)
+"""
+# 이전 버전의 ingest_state 에 없던 컬럼 (건너뛴 행 수, 이어서 적재해도 결과에 합산되게 기록)
+STATE_COUNT_COLUMNS = ('rows_incomplete', 'rows_totals')
+
+
+def file_hash(path):
+    """파일 내용 SHA-256 (같은 파일인지, 이어서 적재해도 되는지 판단)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _detect_encoding(path):
+    # 공공데이터 CSV 는 UTF-8(BOM) 과 CP949 가 섞여 있다. 앞부분만 읽어서 판단
+    with open(path, 'rb') as f:
+        head = f.read(HASH_CHUNK_SIZE)
+    for encoding in CSV_ENCODINGS:
+        try:
+            head.decode(encoding)
+            return encoding
+        except UnicodeDecodeError as e:
+            # 잘라 읽은 끝에서 멀티바이트 문자가 끊긴 경우는 통과
+            if e.start >= len(head) - 3:
+                return encoding
+    return CSV_ENCODINGS[-1]
+
+
+def iter_source_rows(path, sheet=None):
+    """CSV/XLSX 파일의 행을 하나씩 (값 목록) 으로 읽는다"""
+    if path.lower().endswith(('.xlsx', '.xlsm')):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise RuntimeError("XLSX 파일을 읽으려면 openpyxl 이 필요합니다 (pip install openpyxl)")
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            worksheet = workbook[sheet] if sheet else workbook.worksheets[0]
+            for row in worksheet.iter_rows(values_only=True):
+                yield list(row)
+        finally:
+            workbook.close()
+    else:
+        with open(path, newline='', encoding=_detect_encoding(path)) as f:
+            yield from csv.reader(f)
+
+
+def _clean_header(name):
+    return re.sub(r'\s+', '', str(name)) if name is not None else ''
+
+
+def map_header(table, header):
+    """원본 머리글 -> [스키마 컬럼 또는 None] (None 인 열은 버린다)"""
+    columns = [name for name, _ in SCHEMA[table]]
+    year_column = next((c for c in columns if c in YEAR_HEADERS), None)
+    region_column = next((c for c in columns if c in REGION_COLUMNS), None)
+    mapped = []
+    for name in map(_clean_header, header):
+        if name in columns:
+            target = name
+        elif name in YEAR_HEADERS:
+            target = year_column
+        elif name in REGION_HEADERS:
+            target = region_column
+        else:
+            target = HEADER_ALIASES.get(name)
+            target = target if target in columns else None
+        # 같은 컬럼으로 맞춰지는 열이 둘이면 앞의 것만 쓴다
+        mapped.append(target if target not in mapped else None)
+    return mapped
+
+
+def parse_number(value):
+    """'1,234' -> 1234, '-' -> 0, 빈 칸 -> None (숫자가 아닌 값도 None)"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return None if value != value else int(value)
+    text = str(value).replace(',', '').strip()
+    if not text:
+        return None
+    if text in ('-', '–'):
+        return 0
+    try:
+        return int(float(text))
+    except ValueError:
+        return None
+
+
+def normalize_region(name):
+    """지역명을 DB 표기로 ('서울특별시' -> '서울', 합계류 -> '합계', 모르는 이름은 공백만 제거)"""
+    if name is None:
+        return None
+    text = re.sub(r'\s+', '', str(name))
+    if not text:
+        return None
+    if text in TOTAL_NAMES:
+        return '합계'
+    short = short_region_name(text)
+    return short if short in KOR_TO_ENG else text
+
+
+def _clean_text(value):
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = str(value).strip()
+    return text or None
+
+
+def _is_total(text):
+    return text is not None and (text in TOTAL_NAMES or '합계' in text)
+
+
+def normalize_rows(table, rows, keep_totals, counts):
+    """
+    원본 행(머리글 다음부터) -> 스키마 컬럼 순서의 튜플
+    키 컬럼이 빈 행(빈 줄, 주석)과 건너뛸 합계 행은 버리고 counts 에 센다.
+    """
+    columns = [name for name, _ in SCHEMA[table]]
+    numeric = {name for name, sql_type in SCHEMA[table] if sql_type.startswith(('INT', 'BIGINT', 'BOOLEAN'))}
+    keys = INGEST_KEYS[table]
+    header = None
+    for values in rows:
+        if header is None:
+            header = map_header(table, values)
+            missing = [key for key in keys if key not in header and key != '지역id']
+            if missing:
+                raise ValueError(f"{table} 에 필요한 열이 없습니다: {', '.join(missing)} (머리글: {values})")
+            continue
+
+        record = dict.fromkeys(columns)
+        for column, value in zip(header, values):
+            if column is not None:
+                record[column] = value
+
+        for column in columns:
+            if column in REGION_COLUMNS:
+                record[column] = normalize_region(record[column])
+            elif column in numeric:
+                record[column] = parse_number(record[column])
+            else:
+                record[column] = _clean_text(record[column])
+
+        if table in MONEY_TABLES:
+            for text_column, int_column in AMOUNT_COLUMNS.items():
+                if record[int_column] is None and record[text_column] is not None:
+                    record[int_column] = parse_amount(record[text_column])
+                if record[text_column] is None and record[int_column] is not None:
+                    record[text_column] = f"{record[int_column]:,}"
+            # 합계 행은 지금 DB 처럼 제조사/모델명을 모두 '합계' 로 (원본은 한쪽을 비워 두는 경우가 많다)
+            if any(_is_total(record[column]) for column in ('시도', '제조사', '모델명')):
+                for column in ('제조사', '모델명'):
+                    if record[column] is None or _is_total(record[column]):
+                        record[column] = '합계'
+            if record['지역id'] is None:
+                record['지역id'] = TOTAL_REGION_ID if record['시도'] == '합계' else REGION_IDS.get(record['시도'])
+
+        counts['read'] += 1
+        total = any(_is_total(record.get(column)) for column in REGION_COLUMNS + ('모델명',))
+        if total and not keep_totals:
+            counts['totals'] += 1
+            continue
+        if 'is_total' in record:
+            record['is_total'] = int(total)
+        if any(record[key] is None for key in keys):
+            counts['incomplete'] += 1
+            continue
+        yield tuple(record[column] for column in columns)
+
+
+def _staging_table(table, digest):
+    return f"ingest_staging_{table}_{digest[:12]}"
+
+
+def _prepare(cursor):
+    """
+    적재 상태 테이블과 car 스키마 테이블(없으면 생성) 준비
+    마이그레이션이 모든 원본 테이블을 건드리므로 빈 DB 에서는 대상 테이블만이 아니라 전부 만든다.
+    """
+    cursor.execute(STATE_DDL)
+    for column in STATE_COUNT_COLUMNS:
+        if not column_exists(cursor, 'ingest_state', column):
+            cursor.execute(f"ALTER TABLE ingest_state ADD COLUMN {column} INT NOT NULL DEFAULT 0")
+    for table in SCHEMA:
+        cursor.execute(create_table_sql(table))
+
+
+def _load_state(cursor, table, digest):
+    cursor.execute(
+        "SELECT rows_read, rows_loaded, status, rows_incomplete, rows_totals "
+        "FROM ingest_state WHERE table_name = %s AND file_hash = %s",
+        (table, digest)
+    )
+    return cursor.fetchone()
+
+
+def _save_state(cursor, table, digest, path, counts, rows_loaded, status):
+    cursor.execute("DELETE FROM ingest_state WHERE table_name = %s AND file_hash = %s", (table, digest))
+    cursor.execute(
+        "INSERT INTO ingest_state (table_name, file_hash, source_path, rows_read, rows_loaded, "
+        "rows_incomplete, rows_totals, status, updated_at) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)",
+        (table, digest, path, counts['read'], rows_loaded, counts['incomplete'], counts['totals'],
+         status, time.time())
+    )
+
+
+def _swap_in(conn, cursor, table, staging):
+    """임시 테이블의 키와 같은 대상 행을 지우고 임시 테이블 행을 넣는다 (한 트랜잭션)"""
+    columns = ', '.join(quote(name) for name, _ in SCHEMA[table])
+    match = ' AND '.join(f"s.{quote(key)} = {quote(table)}.{quote(key)}" for key in INGEST_KEYS[table])
+    conn.begin()
+    try:
+        cursor.execute(
+            f"DELETE FROM {quote(table)} WHERE EXISTS (SELECT 1 FROM {quote(staging)} s WHERE {match})"
+        )
+        replaced = cursor.rowcount
+        cursor.execute(f"INSERT INTO {quote(table)} ({columns}) SELECT {columns} FROM {quote(staging)}")
+        inserted = cursor.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return replaced, inserted
+
+
+def ingest_file(table, path, batch_size=INGEST_BATCH_SIZE, keep_totals=None, force=False,
+                sheet=None, skip_rows=0):
+    """
+    원본 파일 하나를 table 에 적재하고 결과 dict 를 반환
+    keep_totals 가 None 이면 보조금 테이블만 합계 행을 남긴다.
+    """
+    if table not in INGEST_KEYS:
+        raise ValueError(f"적재할 수 없는 테이블: {table}")
+    if keep_totals is None:
+        keep_totals = table in MONEY_TABLES
+    path = os.path.abspath(path)
+    digest = file_hash(path)
+    staging = _staging_table(table, digest)
+    columns = [name for name, _ in SCHEMA[table]]
+    insert = (
+        f"INSERT INTO {quote(staging)} ({', '.join(quote(c) for c in columns)}) "
+        f"VALUES ({', '.join(['%s'] * len(columns))})"
+    )
+    result = {'table': table, 'path': path, 'status': 'done', 'read': 0, 'loaded': 0,
+              'incomplete': 0, 'totals': 0, 'resumed_from': 0, 'replaced': 0, 'seconds': 0.0}
+    started = time.perf_counter()
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        _prepare(cursor)
+        ensure_migrations()
+
+        state = _load_state(cursor, table, digest)
+        if state and state[2] == 'done' and not force:
+            result.update(status='skipped', read=state[0], loaded=state[1], incomplete=state[3], totals=state[4])
+            cursor.close()
+            return result
+
+        counts = {'read': 0, 'incomplete': 0, 'totals': 0}
+        if state and state[2] == 'staging' and not force:
+            counts.update(read=state[0], incomplete=state[3], totals=state[4])
+            result['resumed_from'], rows_loaded = state[0], state[1]
+            cursor.execute(create_table_sql(staging, columns, like=table))
+        else:
+            rows_loaded = 0
+            keys = ', '.join(quote(key) for key in INGEST_KEYS[table])
+            cursor.execute(f"DROP TABLE IF EXISTS {quote(staging)}")
+            cursor.execute(create_table_sql(staging, columns, like=table))
+            cursor.execute(f"CREATE INDEX {quote('idx_' + staging)} ON {quote(staging)} ({keys})")
+            _save_state(cursor, table, digest, path, counts, 0, 'staging')
+
+        # 머리글 다음의 이미 읽은 원본 행(rows_read)은 정리하지 않고 건너뛴다
+        # 건너뛴 행 수(incomplete/totals)는 ingest_state 에서 이어받았으므로 다시 셀 필요가 없다
+        source = itertools.islice(iter_source_rows(path, sheet), skip_rows, None)
+        header = next(source, None)
+        source = itertools.chain([header] if header is not None else [],
+                                 itertools.islice(source, result['resumed_from'], None))
+        rows = normalize_rows(table, source, keep_totals, counts)
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                break
+            conn.begin()
+            try:
+                cursor.executemany(insert, batch)
+                rows_loaded += len(batch)
+                _save_state(cursor, table, digest, path, counts, rows_loaded, 'staging')
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        replaced, _ = _swap_in(conn, cursor, table, staging)
+        cursor.execute(f"DROP TABLE IF EXISTS {quote(staging)}")
+        _save_state(cursor, table, digest, path, counts, rows_loaded, 'done')
+        cursor.close()
+
+    result.update(read=counts['read'], loaded=rows_loaded, incomplete=counts['incomplete'],
+                  totals=counts['totals'], replaced=replaced, seconds=time.perf_counter() - started)
+    invalidate_table(table)
+    if table in ANNOUNCEMENT_SOURCES or table == GREENHOUSE_SOURCE:
+        refresh_rollups()
+    return result
+
+
+def _report(result):
+    if result['status'] == 'skipped':
+        print(f"{result['table']} <- {result['path']}: 이미 적재됨 ({result['loaded']}행), 건너뜀 (--force 로 다시 적재)")
+        return
+    seconds = result['seconds']
+    rate = (result['read'] - result['resumed_from']) / seconds if seconds > 0 else 0.0
+    resumed = f", {result['resumed_from']}행부터 이어서" if result['resumed_from'] else ""
+    print(
+        f"{result['table']} <- {result['path']}: {result['loaded']}행 적재 "
+        f"(기존 {result['replaced']}행 교체, 합계 {result['totals']}행/빈 키 {result['incomplete']}행 건너뜀{resumed}) "
+        f"{seconds:.2f}초, {rate:,.0f}행/초"
+    )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {'--batch', '--sheet', '--skip-rows'}
+    values = {option: args[args.index(option) + 1] for option in options if option in args}
+    positional = [
+        arg for i, arg in enumerate(args)
+        if not arg.startswith('--') and (i == 0 or args[i - 1] not in options)
+    ]
+    if len(positional) < 2:
+        print("사용법: python -m database.ingest <테이블> <파일.csv|xlsx> [<파일> ...] "
+              "[--batch N] [--sheet 시트] [--skip-rows N] [--keep-totals|--skip-totals] [--force]")
+        sys.exit(1)
+
+    keep = True if "--keep-totals" in args else False if "--skip-totals" in args else None
+    target, files = positional[0], positional[1:]
+    total_rows, total_seconds = 0, 0.0
+    for source_path in files:
+        outcome = ingest_file(
+            target, source_path,
+            batch_size=int(values.get('--batch', INGEST_BATCH_SIZE)),
+            keep_totals=keep,
+            force="--force" in args,
+            sheet=values.get('--sheet'),
+            skip_rows=int(values.get('--skip-rows', 0)),
+        )
+        _report(outcome)
+        if outcome['status'] == 'done':
+            total_rows += outcome['read'] - outcome['resumed_from']
+            total_seconds += outcome['seconds']
+    if len(files) > 1 and total_seconds > 0:
+        print(f"전체 {total_rows}행, {total_seconds:.2f}초, {total_rows / total_seconds:,.0f}행/초")
@@ -0,0 +1,481 @@
+"""
+조회 계측
+
+connect_db() 가 돌려주는 연결을 감싸서 쿼리마다 실행 시간, 가져온 행 수/바이트(추정), 오류를 기록하고
+연결을 빌려오는 데 걸린 시간도 함께 잰다. 유틸리티 함수는 @instrumented 로 감싸서
+전체 시간 중 DB 시간과 나머지(pandas 가공) 시간을 나눠 기록한다.
+
+기록은 세 곳으로 나간다.
+- 구조화 로그: 'car.metrics' 로거에 JSON 한 줄씩 (느린 쿼리/오류는 WARNING/ERROR)
+  조회 함수가 except 에서 삼키는 오류도 record_error() 로 같은 로거와 오류 지표에 남긴다
+- Prometheus 텍스트: render_prometheus(), CAR_METRICS_PORT 를 주면 /metrics HTTP 엔드포인트
+- 실행(trace) 단위 기록: start_trace() 이후 같은 컨텍스트의 호출/쿼리 목록 (페이지 디버그 패널용)
+
+CAR_INSTRUMENTATION=0 이면 연결을 감싸지 않는다.
+"""
+import contextvars
+import json
+import logging
+import os
+import re
+import threading
+import time
+import weakref
+from collections import defaultdict
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+INSTRUMENTATION_ENABLED = os.environ.get("CAR_INSTRUMENTATION", "1") != "0"
+SLOW_QUERY_SECONDS = float(os.environ.get("CAR_SLOW_QUERY_SECONDS", "0.5"))
+METRICS_PORT = int(os.environ.get("CAR_METRICS_PORT", "0"))   # 0 이면 HTTP 엔드포인트를 열지 않는다
+BYTES_SAMPLE_ROWS = 1000    # 이보다 많은 행은 앞부분 크기로 전체 바이트를 추정
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+logger = logging.getLogger("car.metrics")
+if os.environ.get("CAR_METRICS_LOG_LEVEL"):
+    logger.setLevel(os.environ["CAR_METRICS_LOG_LEVEL"].upper())
+    logger.addHandler(logging.StreamHandler())
+
+_trace = contextvars.ContextVar("car_trace", default=None)
+_calls = contextvars.ContextVar("car_calls", default=())
+
+_STATEMENT_TARGET = re.compile(
+    r"\b(?:FROM|INTO|UPDATE|TABLE|ON)\s+(?:IF\s+(?:NOT\s+)?EXISTS\s+)?`?([\w가-힣]+)", re.IGNORECASE
+)
+
+
+def statement_label(statement):
+    """'select:faq' 처럼 동사 + 첫 대상 테이블 (메트릭 라벨 수가 늘어나지 않게 값은 버린다)"""
+    text = " ".join(str(statement).split())
+    verb = text.split(" ", 1)[0].lower() if text else "unknown"
+    match = _STATEMENT_TARGET.search(text)
+    return f"{verb}:{match.group(1)}" if match else verb
+
+
+def _value_bytes(value):
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    return 8
+
+
+def estimate_bytes(rows):
+    """가져온 행들의 대략적인 바이트 수 (행이 많으면 앞 BYTES_SAMPLE_ROWS 행으로 추정)"""
+    if not rows:
+        return 0
+    sample = rows[:BYTES_SAMPLE_ROWS]
+    total = sum(_value_bytes(value) for row in sample for value in (row if isinstance(row, (tuple, list)) else (row,)))
+    return int(total * len(rows) / len(sample))
+
+
+class Metrics:
+    """프로세스 전역 누적 지표"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.queries = defaultdict(lambda: {
+                'count': 0, 'seconds': 0.0, 'rows': 0, 'bytes': 0, 'errors': 0,
+                'buckets': [0] * len(LATENCY_BUCKETS),
+            })
+            self.functions = defaultdict(lambda: {
+                'count': 0, 'seconds': 0.0, 'db_seconds': 0.0, 'acquire_seconds': 0.0, 'pandas_seconds': 0.0,
+                'errors': 0,
+            })
+            self.acquire = {'count': 0, 'seconds': 0.0}
+            self.handled_errors = defaultdict(int)   # 위치 -> 처리하고 넘어간 오류 수
+
+    def add_query(self, record):
+        with self._lock:
+            entry = self.queries[record['label']]
+            entry['count'] += 1
+            entry['seconds'] += record['seconds']
+            entry['rows'] += record['rows']
+            entry['bytes'] += record['bytes']
+            entry['errors'] += 1 if record['error'] else 0
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if record['seconds'] <= bound:
+                    entry['buckets'][i] += 1
+
+    def add_call(self, record):
+        with self._lock:
+            entry = self.functions[record['function']]
+            entry['count'] += 1
+            entry['seconds'] += record['seconds']
+            entry['db_seconds'] += record['db_seconds']
+            entry['acquire_seconds'] += record['acquire_seconds']
+            entry['pandas_seconds'] += record['pandas_seconds']
+            entry['errors'] += record['errors']
+
+    def add_handled_error(self, where):
+        with self._lock:
+            self.handled_errors[where] += 1
+
+    def add_acquire(self, seconds):
+        with self._lock:
+            self.acquire['count'] += 1
+            self.acquire['seconds'] += seconds
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'queries': {label: dict(entry, buckets=list(entry['buckets'])) for label, entry in self.queries.items()},
+                'functions': {name: dict(entry) for name, entry in self.functions.items()},
+                'acquire': dict(self.acquire),
+                'handled_errors': dict(self.handled_errors),
+            }
+
+
+metrics = Metrics()
+_collectors = []
+
+
+def register_collector(collect):
+    """
+    Prometheus 출력에 지표를 추가하는 함수 등록 (예: 연결 풀, 결과 캐시)
+    collect() 는 [(이름, 타입, 설명, [(라벨 dict, 값), ...]), ...] 를 반환한다.
+    """
+    _collectors.append(collect)
+
+
+def _log(level, event, record):
+    if logger.isEnabledFor(level):
+        logger.log(level, json.dumps(dict(record, event=event), ensure_ascii=False, default=str))
+
+
+# ------------------------- 실행(trace) 단위 기록 ---------------------------------------------------
+
+def start_trace():
+    """
+    현재 컨텍스트(페이지 한 번 실행)의 기록을 새로 시작하고 기록 목록을 반환
+    async_utility 로 스레드 풀에서 실행된 조회도 컨텍스트를 복사해 가므로 같은 목록에 쌓인다.
+    """
+    records = []
+    _trace.set(records)
+    return records
+
+
+def _add_to_trace(record):
+    records = _trace.get()
+    if records is not None:
+        records.append(record)
+
+
+# ------------------------- 쿼리 계측 ---------------------------------------------------
+
+def record_query(record):
+    """쿼리 한 건의 기록을 누적 지표/로그/trace/진행 중인 함수 호출에 반영"""
+    metrics.add_query(record)
+    for frame in _calls.get():
+        frame['db_seconds'] += record['seconds']
+        frame['queries'] += 1
+        frame['rows'] += record['rows']
+        frame['errors'] += 1 if record['error'] else 0
+    _add_to_trace(dict(record, kind='query'))
+
+    if record['error']:
+        _log(logging.ERROR, 'query_error', record)
+    elif record['seconds'] >= SLOW_QUERY_SECONDS:
+        _log(logging.WARNING, 'slow_query', record)
+    else:
+        _log(logging.DEBUG, 'query', record)
+
+
+class InstrumentedCursor:
+    """execute 부터 다음 execute/close 까지를 쿼리 한 건으로 기록하는 커서 래퍼"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._pending = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def _start(self, statement, call, *args, **kwargs):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            result = call(statement, *args, **kwargs)
+        except Exception as e:
+            record_query({
+                'label': statement_label(statement), 'seconds': time.perf_counter() - started,
+                'rows': 0, 'bytes': 0, 'error': f"{type(e).__name__}: {e}",
+            })
+            raise
+        self._pending = {
+            'label': statement_label(statement), 'seconds': time.perf_counter() - started,
+            'rows': 0, 'bytes': 0, 'error': None,
+        }
+        return result
+
+    def execute(self, statement, *args, **kwargs):
+        return self._start(statement, self._cursor.execute, *args, **kwargs)
+
+    def executemany(self, statement, *args, **kwargs):
+        result = self._start(statement, self._cursor.executemany, *args, **kwargs)
+        rowcount = getattr(self._cursor, 'rowcount', -1)
+        self._pending['rows'] = rowcount if rowcount and rowcount > 0 else 0
+        return result
+
+    def _fetched(self, started, rows):
+        if self._pending is not None:
+            self._pending['seconds'] += time.perf_counter() - started
+            self._pending['rows'] += len(rows)
+            self._pending['bytes'] += estimate_bytes(rows)
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._fetched(started, rows)
+        return rows
+
+    def fetchmany(self, *args, **kwargs):
+        started = time.perf_counter()
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._fetched(started, rows)
+        return rows
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._fetched(started, [row] if row is not None else [])
+        return row
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def _finish(self):
+        if self._pending is not None:
+            record, self._pending = self._pending, None
+            record_query(record)
+
+    def close(self):
+        self._finish()
+        return self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class InstrumentedConnection:
+    """connect_db() 연결 래퍼: 커서를 계측하고 닫힐 때 아직 끝나지 않은 쿼리 기록을 마무리"""
+
+    def __init__(self, con):
+        self._con = con
+        self._cursors = weakref.WeakSet()
+
+    def __getattr__(self, name):
+        return getattr(self._con, name)
+
+    def cursor(self, *args, **kwargs):
+        cursor = InstrumentedCursor(self._con.cursor(*args, **kwargs))
+        self._cursors.add(cursor)
+        return cursor
+
+    def close(self):
+        for cursor in list(self._cursors):
+            cursor._finish()
+        return self._con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def instrument_connection(con, acquire_seconds):
+    """연결 대여 시간을 기록하고 계측 래퍼를 씌운 연결을 반환"""
+    if not INSTRUMENTATION_ENABLED:
+        return con
+    metrics.add_acquire(acquire_seconds)
+    for frame in _calls.get():
+        frame['acquire_seconds'] += acquire_seconds
+    _add_to_trace({'kind': 'acquire', 'seconds': acquire_seconds})
+    return InstrumentedConnection(con)
+
+
+def record_error(where, error):
+    """
+    except 에서 처리하고 넘어간 오류 기록 (None/기본값을 반환하는 조회 함수, 백그라운드 스레드)
+    ERROR 로그와 car_handled_errors_total 지표에 남기고, 진행 중인 @instrumented 호출도 오류로 센다.
+    """
+    record = {'where': where, 'error': f"{type(error).__name__}: {error}"}
+    metrics.add_handled_error(where)
+    for frame in _calls.get():
+        frame['errors'] += 1
+    _add_to_trace(dict(record, kind='error'))
+    _log(logging.ERROR, 'handled_error', record)
+
+
+def log_event(event, **fields):
+    """백그라운드 작업 결과 같은 운영 이벤트를 INFO 로그로 남긴다"""
+    _log(logging.INFO, event, fields)
+
+
+# ------------------------- 함수 계측 ---------------------------------------------------
+
+def _describe(value):
+    # DataFrame 등 큰 객체를 repr 하면 호출보다 기록이 더 오래 걸리므로 모양만 남긴다
+    shape = getattr(value, 'shape', None)
+    if shape is not None:
+        return f"{type(value).__name__}{tuple(shape)}"
+    return repr(value)[:50]
+
+
+def describe_args(args, kwargs):
+    parts = [_describe(arg) for arg in args] + [f"{key}={_describe(val)}" for key, val in kwargs.items()]
+    return ", ".join(parts)[:200]
+
+
+def instrumented(func):
+    """
+    유틸리티 함수 호출을 기록하는 데코레이터
+    pandas_seconds 는 전체 시간에서 호출 안의 쿼리 시간과 연결 대여 시간을 뺀 값이다.
+    @cached 위에 두면 캐시 적중도 (queries=0 인) 빠른 호출로 기록된다.
+    """
+    name = func.__name__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        frame = {'db_seconds': 0.0, 'acquire_seconds': 0.0, 'queries': 0, 'rows': 0, 'errors': 0}
+        token = _calls.set(_calls.get() + (frame,))
+        started = time.perf_counter()
+        error = None
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            _calls.reset(token)
+            record = {
+                'function': name,
+                'args': describe_args(args, kwargs),
+                'seconds': seconds,
+                'db_seconds': frame['db_seconds'],
+                'acquire_seconds': frame['acquire_seconds'],
+                'pandas_seconds': max(seconds - frame['db_seconds'] - frame['acquire_seconds'], 0.0),
+                'queries': frame['queries'],
+                'rows': frame['rows'],
+                'errors': frame['errors'] + (1 if error else 0),
+                'error': error,
+            }
+            metrics.add_call(record)
+            _add_to_trace(dict(record, kind='call'))
+            _log(logging.ERROR if record['errors'] else logging.INFO, 'call', record)
+
+    return wrapper
+
+
+# ------------------------- Prometheus ---------------------------------------------------
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _sample(name, labels, value):
+    if labels:
+        label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+        return f"{name}{{{label_text}}} {value}"
+    return f"{name} {value}"
+
+
+def render_prometheus():
+    """누적 지표를 Prometheus 텍스트 형식으로 반환"""
+    data = metrics.snapshot()
+    lines = []
+
+    def family(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(_sample(sample_name, labels, value) for sample_name, labels, value in samples)
+
+    queries = data['queries']
+    histogram = []
+    for label, entry in queries.items():
+        for bound, count in zip(LATENCY_BUCKETS, entry['buckets']):
+            histogram.append(("car_query_seconds_bucket", {'query': label, 'le': bound}, count))
+        histogram.append(("car_query_seconds_bucket", {'query': label, 'le': '+Inf'}, entry['count']))
+        histogram.append(("car_query_seconds_sum", {'query': label}, entry['seconds']))
+        histogram.append(("car_query_seconds_count", {'query': label}, entry['count']))
+    family("car_query_seconds", "histogram", "쿼리 실행 + 가져오기 시간", histogram)
+    family("car_query_rows_total", "counter", "쿼리로 가져온 행 수",
+           [("car_query_rows_total", {'query': label}, entry['rows']) for label, entry in queries.items()])
+    family("car_query_bytes_total", "counter", "쿼리로 가져온 바이트 수 (추정)",
+           [("car_query_bytes_total", {'query': label}, entry['bytes']) for label, entry in queries.items()])
+    family("car_query_errors_total", "counter", "실패한 쿼리 수",
+           [("car_query_errors_total", {'query': label}, entry['errors']) for label, entry in queries.items()])
+
+    family("car_connection_acquire_seconds", "summary", "connect_db() 연결 대여 시간", [
+        ("car_connection_acquire_seconds_sum", {}, data['acquire']['seconds']),
+        ("car_connection_acquire_seconds_count", {}, data['acquire']['count']),
+    ])
+
+    functions = data['functions']
+    family("car_function_seconds", "summary", "유틸리티 함수 호출 시간", [
+        sample for name, entry in functions.items() for sample in (
+            ("car_function_seconds_sum", {'function': name}, entry['seconds']),
+            ("car_function_seconds_count", {'function': name}, entry['count']),
+        )
+    ])
+    family("car_function_db_seconds_total", "counter", "함수 호출 중 쿼리 시간",
+           [("car_function_db_seconds_total", {'function': name}, entry['db_seconds']) for name, entry in functions.items()])
+    family("car_function_acquire_seconds_total", "counter", "함수 호출 중 연결 대여 시간",
+           [("car_function_acquire_seconds_total", {'function': name}, entry['acquire_seconds']) for name, entry in functions.items()])
+    family("car_function_pandas_seconds_total", "counter", "함수 호출 중 쿼리/연결 대여 외(pandas 가공) 시간",
+           [("car_function_pandas_seconds_total", {'function': name}, entry['pandas_seconds']) for name, entry in functions.items()])
+    family("car_function_errors_total", "counter", "오류가 난 함수 호출 수",
+           [("car_function_errors_total", {'function': name}, entry['errors']) for name, entry in functions.items()])
+    family("car_handled_errors_total", "counter", "처리하고 넘어간 오류 수",
+           [("car_handled_errors_total", {'where': where}, count) for where, count in data['handled_errors'].items()])
+
+    for collect in _collectors:
+        try:
+            for name, kind, help_text, samples in collect():
+                family(name, kind, help_text, [(name, labels, value) for labels, value in samples])
+        except Exception as e:
+            logger.warning(json.dumps({'event': 'collector_error', 'error': str(e)}, ensure_ascii=False))
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=METRICS_PORT):
+    """/metrics HTTP 엔드포인트를 백그라운드 스레드로 시작 (프로세스당 한 번, port 가 0 이면 시작하지 않음)"""
+    global _server
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="car-metrics", daemon=True).start()
+    return _server
@@ -0,0 +1,285 @@
+"""
+스키마 마이그레이션
+
+적용한 버전을 schema_migrations 테이블에 기록해 두고 아직 적용하지 않은 것만 순서대로 실행한다.
+MySQL 과 내장 SQLite 에서 모두 동작하도록 두 DB 가 공통으로 지원하는 DDL 만 사용하고,
+트리거처럼 문법이 다른 것은 백엔드(database/backends.py)가 문장을 만든다.
+각 단계는 컬럼/인덱스/트리거가 이미 있는지 먼저 확인하므로 중간에 실패한 뒤 다시 실행해도 된다.
+
+조회 함수는 마이그레이션을 실행하지 않는다. 배포할 때(또는 DB 를 바꾼 뒤) 아래 명령으로 적용하고,
+내장 SQLite 는 적재(python -m database.backends seed, 스냅샷 백엔드) 직후에 적용된다.
+
+    python -m database.migrations
+"""
+import threading
+import time
+
+from database.changes import install_change_tracking
+from database.database import get_backend, get_connection
+from database.instrumentation import record_error
+from database.schema import quote
+
+MONEY_TABLES = ('money_electronic_car', 'money_hydrogen_car')
+# (년도, 지역) 으로 읽는 원본 테이블 (요약 테이블 재집계, 적재 시 키 비교)
+YEAR_REGION_TABLES = ('electronic_car', 'hydrogen_car', 'greenhouse_gases')
+TOTAL_PATTERN = '%합계%'
+
+# 쉼표가 들어간 문자열 금액 컬럼 -> 정수 컬럼
+AMOUNT_COLUMNS = {
+    '보조금(만원)': '보조금',
+    '국비(만원)': '국비',
+    '지방비(만원)': '지방비',
+}
+
+_ensure_lock = threading.Lock()
+_ensured = False
+
+
+def parse_amount(value):
+    """'1,234' 같은 금액 문자열을 정수로 변환 (숫자가 아니면 0)"""
+    if value is None:
+        return 0
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value).replace(',', '').strip()
+    try:
+        return int(float(text))
+    except ValueError:
+        return 0
+
+
+def column_exists(cursor, table, column):
+    # 없는 컬럼을 직접 조회해서 오류를 내는 대신 결과 컬럼 목록으로 확인 (쿼리 오류 지표에 잡히지 않게)
+    cursor.execute(f"SELECT * FROM {quote(table)} WHERE 1 = 0")
+    cursor.fetchall()
+    return column in [desc[0] for desc in cursor.description]
+
+
+def _index_column(column):
+    """'컬럼' 또는 '컬럼 DESC' (내림차순 인덱스 컬럼)"""
+    if column.endswith(' DESC'):
+        return f"{quote(column[:-len(' DESC')])} DESC"
+    return quote(column)
+
+
+def create_index(cursor, backend, table, name, columns):
+    """인덱스가 없을 때만 생성 (MySQL 은 CREATE INDEX IF NOT EXISTS 를 지원하지 않는다)"""
+    if backend.index_exists(cursor, table, name):
+        return False
+    cursor.execute(f"CREATE INDEX {quote(name)} ON {quote(table)} ({', '.join(_index_column(c) for c in columns)})")
+    return True
+
+
+def normalize_amounts(cursor, table):
+    """
+    정수 금액 컬럼을 문자열 금액 컬럼에 맞춘다 (비어 있거나 문자열과 다른 행만, 문자열이 없으면 정수 값을 그대로 둠)
+    서로 다른 금액 문자열 수만큼만 UPDATE 하므로 행 수와 무관하게 빠르다.
+    """
+    updated = 0
+    for text_column, int_column in AMOUNT_COLUMNS.items():
+        cursor.execute(f"SELECT DISTINCT {quote(text_column)} FROM {quote(table)}")
+        for (text,) in cursor.fetchall():
+            if text is None:
+                cursor.execute(
+                    f"UPDATE {quote(table)} SET {quote(int_column)} = 0 "
+                    f"WHERE {quote(text_column)} IS NULL AND {quote(int_column)} IS NULL"
+                )
+            else:
+                amount = parse_amount(text)
+                cursor.execute(
+                    f"UPDATE {quote(table)} SET {quote(int_column)} = %s WHERE {quote(text_column)} = %s "
+                    f"AND ({quote(int_column)} IS NULL OR {quote(int_column)} <> %s)",
+                    (amount, text, amount)
+                )
+            updated += cursor.rowcount
+    return updated
+
+
+def amount_expressions(backend, prefix=''):
+    """{정수 금액 컬럼: 문자열 금액 컬럼에서 계산하는 SQL 식} (문자열이 없으면 정수 값을 그대로, 그것도 없으면 0)"""
+    return {
+        int_column: (
+            f"(CASE WHEN {prefix}{quote(text_column)} IS NULL THEN COALESCE({prefix}{quote(int_column)}, 0) "
+            f"ELSE {backend.amount_sql(prefix + quote(text_column))} END)"
+        )
+        for text_column, int_column in AMOUNT_COLUMNS.items()
+    }
+
+
+def total_expression(prefix=''):
+    """행이 합계 행인지(1/0) 계산하는 SQL 식 (시도/모델명에 '합계' 포함), 트리거에서는 prefix='NEW.'"""
+    return (
+        f"(COALESCE({prefix}시도, '') LIKE '{TOTAL_PATTERN}' "
+        f"OR COALESCE({prefix}모델명, '') LIKE '{TOTAL_PATTERN}')"
+    )
+
+
+def flag_total_rows(cursor, table):
+    """
+    is_total 을 시도/모델명 값에 맞게 다시 계산 (값이 다른 행만, 합계가 아니게 된 행은 0 으로)
+    이후에 들어오거나 바뀌는 행은 마이그레이션 5 의 트리거가 맞춘다.
+    """
+    expression = total_expression()
+    cursor.execute(f"UPDATE {quote(table)} SET is_total = {expression} WHERE is_total <> {expression}")
+    return cursor.rowcount
+
+
+def _add_subsidy_columns(cursor, backend):
+    """money_* 테이블에 보조금/국비/지방비 정수 컬럼과 (시도, 보조금) 인덱스 추가"""
+    for table in MONEY_TABLES:
+        for int_column in AMOUNT_COLUMNS.values():
+            if not column_exists(cursor, table, int_column):
+                cursor.execute(f"ALTER TABLE {quote(table)} ADD COLUMN {quote(int_column)} INT")
+        normalize_amounts(cursor, table)
+        create_index(cursor, backend, table, f"idx_{table}_sido_subsidy", ('시도', '보조금'))
+
+
+def _add_subsidy_order_index(cursor, backend):
+    """전체 데이터 보기(보조금 내림차순 + LIMIT)가 정렬 없이 인덱스 순서로 읽도록 (보조금) 인덱스 추가"""
+    for table in MONEY_TABLES:
+        create_index(cursor, backend, table, f"idx_{table}_subsidy", ('보조금',))
+
+
+def _add_change_tracking(cursor, backend):
+    """change_log 테이블과 공고 현황/보조금/FAQ 테이블 변경 추적 트리거 (database/changes.py)"""
+    install_change_tracking(cursor, backend)
+
+
+def _add_total_flag_and_indexes(cursor, backend):
+    """
+    합계 행 표시 컬럼(is_total)과 조회 경로에 맞춘 인덱스
+    보조금 조회는 NOT LIKE '%합계%' 대신 is_total = 0 으로 거르고 (is_total, 보조금) 인덱스 순서로 읽는다.
+    (시도) 단독 조회는 마이그레이션 1 의 (시도, 보조금) 인덱스 앞부분으로 충분해서 따로 만들지 않는다.
+    """
+    for table in MONEY_TABLES:
+        if not column_exists(cursor, table, 'is_total'):
+            cursor.execute(f"ALTER TABLE {quote(table)} ADD COLUMN is_total BOOLEAN NOT NULL DEFAULT 0")
+        flag_total_rows(cursor, table)
+        create_index(cursor, backend, table, f"idx_{table}_total_subsidy", ('is_total', '보조금'))
+    for table in YEAR_REGION_TABLES:
+        create_index(cursor, backend, table, f"idx_{table}_year_region", ('년도', '지역'))
+    create_index(cursor, backend, 'faq', 'idx_faq_category', ('category',))
+
+
+def install_derived_triggers(cursor, backend, table, name, expressions):
+    """
+    행의 다른 값에서 컬럼을 정하는 INSERT/UPDATE 트리거 설치 (이미 있는 트리거는 건너뛴다)
+    트리거를 만들 권한이 없으면 알리고 넘어간다 (그 경우 다시 실행할 때까지 기존 행 재계산만 적용).
+    """
+    for trigger, statement in backend.derived_column_trigger_ddl(table, name, expressions).items():
+        if backend.trigger_exists(cursor, trigger):
+            continue
+        try:
+            cursor.execute(statement)
+        except Exception as e:
+            record_error(f"derived_trigger:{trigger}", e)
+
+
+def _add_total_flag_triggers(cursor, backend):
+    """
+    is_total 을 행의 시도/모델명에서 정하는 INSERT/UPDATE 트리거
+    적재 CLI, 관리 도구, 직접 UPDATE 등 어느 경로로 바뀌어도 합계 여부가 행과 어긋나지 않는다.
+    """
+    for table in MONEY_TABLES:
+        install_derived_triggers(cursor, backend, table, 'total', {'is_total': total_expression('NEW.')})
+        flag_total_rows(cursor, table)
+
+
+def _add_amount_triggers(cursor, backend):
+    """
+    보조금/국비/지방비 정수 컬럼을 문자열 금액 컬럼에서 정하는 INSERT/UPDATE 트리거
+    직접 넣은 행도 보조금 정렬/TOP-K/행 수에 바로 잡힌다. 그동안 들어온 행은 normalize_amounts 로 맞춘다.
+    """
+    for table in MONEY_TABLES:
+        install_derived_triggers(cursor, backend, table, 'amount', amount_expressions(backend, 'NEW.'))
+        normalize_amounts(cursor, table)
+
+
+def _add_faq_page_indexes(cursor, backend):
+    """FAQ 페이지(ORDER BY id LIMIT/OFFSET, 카테고리 필터)가 정렬 없이 인덱스 순서로 화면 행만 읽도록"""
+    create_index(cursor, backend, 'faq', 'idx_faq_id', ('id',))
+    create_index(cursor, backend, 'faq', 'idx_faq_category_id', ('category', 'id'))
+
+
+def _add_source_change_tracking(cursor, backend):
+    """온실가스/친환경 자동차 테이블 변경 추적 트리거 (마이그레이션 3 이후 TRACKED_TABLES 에 더한 테이블)"""
+    install_change_tracking(cursor, backend)
+
+
+def _add_subsidy_page_index(cursor, backend):
+    """
+    전체 데이터 보기/TOP-K 스트림(ORDER BY 보조금 DESC, 지역id, 모델명)이 정렬 없이 인덱스 순서로 읽도록
+    (is_total, 보조금 DESC, 지역id, 모델명) 인덱스 추가
+    정렬 방향이 섞여 있어 (is_total, 보조금) 인덱스만으로는 동점 구간을 따로 정렬해야 한다 (MySQL 8 이상에서 내림차순 인덱스).
+    """
+    for table in MONEY_TABLES:
+        create_index(cursor, backend, table, f"idx_{table}_total_subsidy_page", ('is_total', '보조금 DESC', '지역id', '모델명'))
+
+
+MIGRATIONS = [
+    (1, "money_* 보조금/국비/지방비 정수 컬럼과 (시도, 보조금) 인덱스", _add_subsidy_columns),
+    (2, "money_* (보조금) 정렬 인덱스", _add_subsidy_order_index),
+    (3, "change_log 테이블과 변경 추적 트리거", _add_change_tracking),
+    (4, "money_* 합계 행 표시(is_total)와 (is_total, 보조금)/(년도, 지역)/faq (category) 인덱스", _add_total_flag_and_indexes),
+    (5, "money_* is_total 을 행 값으로 맞추는 트리거", _add_total_flag_triggers),
+    (6, "money_* 보조금/국비/지방비 정수 컬럼을 문자열 금액에서 맞추는 트리거", _add_amount_triggers),
+    (7, "faq (id)/(category, id) 페이지 인덱스", _add_faq_page_indexes),
+    (8, "greenhouse_gases/environmental_vehicles 변경 추적 트리거", _add_source_change_tracking),
+    (9, "money_* (is_total, 보조금 DESC, 지역id, 모델명) 페이지 인덱스", _add_subsidy_page_index),
+]
+
+
+def run_migrations(conn=None, backend=None):
+    """
+    아직 적용하지 않은 마이그레이션을 실행하고 적용한 버전 목록을 반환
+    conn/backend 를 주면 그 연결로 적용한다 (백엔드를 만드는 중이라 get_connection() 을 쓸 수 없을 때).
+    """
+    if conn is None:
+        with get_connection() as conn:
+            return run_migrations(conn, backend)
+
+    backend = backend or get_backend()
+    applied_now = []
+    cursor = conn.cursor()
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INT NOT NULL PRIMARY KEY,
+        description VARCHAR(255) NOT NULL,
+        applied_at DOUBLE NOT NULL
+    )
+    """)
+    cursor.execute("SELECT version FROM schema_migrations")
+    applied = {row[0] for row in cursor.fetchall()}
+
+    for version, description, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        migrate(cursor, backend)
+        cursor.execute(
+            "INSERT INTO schema_migrations (version, description, applied_at) VALUES (%s, %s, %s)",
+            (version, description, time.time())
+        )
+        applied_now.append(version)
+    cursor.close()
+    return applied_now
+
+
+def ensure_migrations():
+    """프로세스에서 처음 호출될 때 한 번 마이그레이션을 적용 (적재 CLI, 벤치마크 준비용)"""
+    global _ensured
+    if _ensured:
+        return
+    with _ensure_lock:
+        if not _ensured:
+            run_migrations()
+            _ensured = True
+
+
+if __name__ == "__main__":
+    versions = run_migrations()
+    if versions:
+        for version, description, _ in MIGRATIONS:
+            if version in versions:
+                print(f"[{version}] {description}")
+    else:
+        print("적용할 마이그레이션이 없습니다.")
@@ -0,0 +1,129 @@
+"""
+이름 붙인 쿼리 모음
+
+테이블 이름은 허용 목록(TABLES)에서만 고르고, 값은 항상 %s 바인딩으로 넘긴다.
+같은 (쿼리, 테이블) 조합은 항상 같은 문장 문자열을 쓰므로 지역/연도가 바뀌어도
+DB 가 보는 문장은 달라지지 않는다 (SQLite 백엔드에서는 sqlite3 문장 캐시를 그대로 재사용).
+보조금 테이블의 합계 행은 is_total 컬럼(마이그레이션 4)으로 거른다 (is_total 로 시작하는 인덱스를 탄다).
+"""
+from functools import lru_cache
+
+from database.database import get_connection, stream_cursor
+from database.frames import read_frame
+
+# 차종별로 허용되는 테이블
+TABLES = {
+    'announcement': {
+        'electric': 'electronic_car',
+        'hydrogen': 'hydrogen_car',
+    },
+    'subsidy': {
+        'electric': 'money_electronic_car',
+        'hydrogen': 'money_hydrogen_car',
+    },
+}
+
+STREAM_CHUNK_SIZE = 5000
+
+# (테이블 종류, 문장 템플릿)
+QUERIES = {
+    'subsidy_ranked': ('subsidy', """
+        SELECT
+            시도 as region,
+            모델명 as vehicle_type,
+            보조금 as total_subsidy
+        FROM {table}
+        WHERE is_total = 0
+        ORDER BY 보조금 DESC
+    """),
+    'subsidy_count': ('subsidy', """
+        SELECT COUNT(*) FROM {table}
+        WHERE is_total = 0
+    """),
+    # 전체 데이터 보기: 정렬은 DB 가 (is_total, 보조금 DESC, 지역id, 모델명) 인덱스(마이그레이션 9)로 하고 화면에 보일 구간만 가져온다
+    'subsidy_page': ('subsidy', """
+        SELECT 지역id, 시도, 제조사, 모델명, 보조금
+        FROM {table}
+        WHERE is_total = 0
+        ORDER BY 보조금 DESC, 지역id, 모델명
+        LIMIT %s OFFSET %s
+    """),
+    'subsidy_stream': ('subsidy', """
+        SELECT 지역id, 시도, 제조사, 모델명, 보조금
+        FROM {table}
+        WHERE is_total = 0
+        ORDER BY 보조금 DESC, 지역id, 모델명
+    """),
+    # 공고 현황 큐브: 차종 하나의 연도 x 지역 합계를 한 번에 가져온다
+    'announcement_cube': (None, """
+        SELECT
+            year,
+            region,
+            announced_count,
+            released_count,
+            remaining_count
+        FROM rollup_announcement_region
+        WHERE vehicle_type = %s
+        ORDER BY year, region
+    """),
+}
+
+
+def table_for(kind, vehicle_type):
+    """허용 목록에서 테이블 이름을 고른다 (없으면 ValueError)"""
+    try:
+        return TABLES[kind][vehicle_type]
+    except KeyError:
+        raise ValueError(f"허용되지 않은 테이블 선택: {kind}/{vehicle_type}")
+
+
+@lru_cache(maxsize=None)
+def get_statement(name, vehicle_type=None):
+    """이름과 차종으로 실행할 문장을 만든다 (조합마다 한 번만 만들어 재사용)"""
+    kind, template = QUERIES[name]
+    if kind is None:
+        return template
+    return template.format(table=table_for(kind, vehicle_type))
+
+
+def run_query(name, params=(), vehicle_type=None):
+    """등록된 쿼리를 바인딩 파라미터로 실행하고 (행 목록, 컬럼 목록) 을 반환"""
+    statement = get_statement(name, vehicle_type)
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(statement, tuple(params))
+        rows = cursor.fetchall()
+        columns = [desc[0] for desc in cursor.description]
+        cursor.close()
+    return rows, columns
+
+
+def query_frame(name, params=(), vehicle_type=None, kinds=None):
+    """등록된 쿼리를 실행하고 결과를 타입이 정해진 DataFrame 으로 반환 (database/frames.py)"""
+    statement = get_statement(name, vehicle_type)
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(statement, tuple(params))
+        df = read_frame(cursor, kinds)
+        cursor.close()
+    return df
+
+
+def stream_query(name, params=(), vehicle_type=None, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    등록된 쿼리를 서버 측 커서로 실행하고 (행 chunk, 컬럼 목록) 을 차례로 돌려준다
+    한 번에 chunk_size 행만 메모리에 올리므로 결과가 커도 최대 메모리가 일정하다.
+    """
+    statement = get_statement(name, vehicle_type)
+    with get_connection() as conn:
+        cursor = stream_cursor(conn)
+        try:
+            cursor.execute(statement, tuple(params))
+            columns = [desc[0] for desc in cursor.description]
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows, columns
+        finally:
+            cursor.close()
@@ -0,0 +1,267 @@
+"""
+대시보드용 요약(rollup) 테이블 생성/갱신
+
+페이지마다 원본 행을 매번 집계하지 않도록 연도/지역/차종별 합계를 미리 계산해 둔다.
+원본 테이블의 연도별 지문(요약에 쓰이는 행 내용의 해시)을 rollup_state 에 저장해 두고,
+지문이 달라진 연도만 다시 집계한다. 지문 계산은 원본 행을 한 번 읽지만 집계/쓰기는 바뀐 연도에만 한다.
+변경 추적(database/changes.py)이 알려 준 연도는 지문을 비교하지 않고 그대로 다시 집계한다 (refresh_rollup_years).
+
+    python -m database.rollup          # 바뀐 연도만 갱신
+    python -m database.rollup --full   # 전체 재생성
+"""
+import hashlib
+import sys
+import threading
+import time
+
+from database.database import get_connection
+from utilities.cache_utility import invalidate_table
+
+# 공고 현황 원본 테이블 -> 요약 테이블의 vehicle_type 값
+ANNOUNCEMENT_SOURCES = {
+    'electronic_car': 'electric',
+    'hydrogen_car': 'hydrogen',
+}
+GREENHOUSE_SOURCE = 'greenhouse_gases'
+
+# 원본 테이블 -> 요약에 더해지는 컬럼
+MEASURES = {
+    'electronic_car': ('민간공고대수', '출고대수', '출고잔여대수'),
+    'hydrogen_car': ('민간공고대수', '출고대수', '출고잔여대수'),
+    GREENHOUSE_SOURCE: ('승용', '승합', '화물', '특수'),
+}
+FINGERPRINT_CHUNK_SIZE = 5000
+
+ROLLUP_TABLES = (
+    'rollup_announcement_yearly',
+    'rollup_announcement_region',
+    'rollup_greenhouse_region',
+)
+
+# 요약 테이블 -> 원본 테이블 (원본이 바뀌어야 요약 테이블과 그 데이터 버전이 바뀐다)
+ROLLUP_SOURCES = {
+    'rollup_announcement_yearly': tuple(ANNOUNCEMENT_SOURCES),
+    'rollup_announcement_region': tuple(ANNOUNCEMENT_SOURCES),
+    'rollup_greenhouse_region': (GREENHOUSE_SOURCE,),
+}
+
+DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS rollup_state (
+        source_table VARCHAR(64) NOT NULL,
+        year INT NOT NULL,
+        fingerprint VARCHAR(255) NOT NULL,
+        refreshed_at DOUBLE NOT NULL,
+        PRIMARY KEY (source_table, year)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS rollup_announcement_yearly (
+        vehicle_type VARCHAR(16) NOT NULL,
+        year INT NOT NULL,
+        announced_count BIGINT NOT NULL,
+        released_count BIGINT NOT NULL,
+        remaining_count BIGINT NOT NULL,
+        PRIMARY KEY (vehicle_type, year)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS rollup_announcement_region (
+        vehicle_type VARCHAR(16) NOT NULL,
+        year INT NOT NULL,
+        region VARCHAR(32) NOT NULL,
+        announced_count BIGINT NOT NULL,
+        released_count BIGINT NOT NULL,
+        remaining_count BIGINT NOT NULL,
+        PRIMARY KEY (vehicle_type, year, region)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS rollup_greenhouse_region (
+        year INT NOT NULL,
+        region VARCHAR(32) NOT NULL,
+        passenger BIGINT NOT NULL,
+        bus BIGINT NOT NULL,
+        cargo BIGINT NOT NULL,
+        special BIGINT NOT NULL,
+        total_gas BIGINT NOT NULL,
+        PRIMARY KEY (year, region)
+    )
+    """,
+]
+
+_ensure_lock = threading.Lock()
+_ensured = False
+
+
+def _fingerprints(cursor, source_table, years=None):
+    """
+    원본 테이블의 연도별 지문 {year: 해시}
+    요약에 쓰이는 컬럼(지역과 합산 컬럼)의 행을 정렬해서 연도마다 SHA-1 로 해시하므로
+    행 수/합계가 그대로인 지역 간 이동이나 값 맞바꿈도 다른 지문이 된다.
+    """
+    columns = ('지역',) + MEASURES[source_table]
+    where = ""
+    params = ()
+    if years is not None:
+        where = f"WHERE 년도 IN ({', '.join(['%s'] * len(years))})"
+        params = tuple(years)
+    order = ', '.join(('년도',) + columns)
+    cursor.execute(f"SELECT 년도, {', '.join(columns)} FROM {source_table} {where} ORDER BY {order}", params)
+    digests = {}
+    while True:
+        rows = cursor.fetchmany(FINGERPRINT_CHUNK_SIZE)
+        if not rows:
+            break
+        for row in rows:
+            year = int(row[0])
+            digest = digests.get(year)
+            if digest is None:
+                digest = digests[year] = hashlib.sha1()
+            digest.update(('\x1f'.join(str(v) for v in row[1:]) + '\x1e').encode('utf-8'))
+    return {year: digest.hexdigest() for year, digest in digests.items()}
+
+
+def _rebuild_announcement_year(cursor, source_table, year):
+    vehicle_type = ANNOUNCEMENT_SOURCES[source_table]
+    cursor.execute("DELETE FROM rollup_announcement_region WHERE vehicle_type = %s AND year = %s",
+                   (vehicle_type, year))
+    cursor.execute("DELETE FROM rollup_announcement_yearly WHERE vehicle_type = %s AND year = %s",
+                   (vehicle_type, year))
+    cursor.execute(f"""
+        INSERT INTO rollup_announcement_region
+            (vehicle_type, year, region, announced_count, released_count, remaining_count)
+        SELECT %s, 년도, 지역,
+               COALESCE(SUM(민간공고대수), 0), COALESCE(SUM(출고대수), 0), COALESCE(SUM(출고잔여대수), 0)
+        FROM {source_table}
+        WHERE 년도 = %s
+        GROUP BY 년도, 지역
+    """, (vehicle_type, year))
+    cursor.execute("""
+        INSERT INTO rollup_announcement_yearly
+            (vehicle_type, year, announced_count, released_count, remaining_count)
+        SELECT vehicle_type, year, SUM(announced_count), SUM(released_count), SUM(remaining_count)
+        FROM rollup_announcement_region
+        WHERE vehicle_type = %s AND year = %s
+        GROUP BY vehicle_type, year
+    """, (vehicle_type, year))
+
+
+def _rebuild_greenhouse_year(cursor, year):
+    cursor.execute("DELETE FROM rollup_greenhouse_region WHERE year = %s", (year,))
+    cursor.execute(f"""
+        INSERT INTO rollup_greenhouse_region
+            (year, region, passenger, bus, cargo, special, total_gas)
+        SELECT 년도, 지역,
+               COALESCE(SUM(승용), 0), COALESCE(SUM(승합), 0), COALESCE(SUM(화물), 0), COALESCE(SUM(특수), 0),
+               COALESCE(SUM(승용), 0) + COALESCE(SUM(승합), 0) + COALESCE(SUM(화물), 0) + COALESCE(SUM(특수), 0)
+        FROM {GREENHOUSE_SOURCE}
+        WHERE 년도 = %s
+        GROUP BY 년도, 지역
+    """, (year,))
+
+
+def _refresh_source(conn, source_table, full=False, years=None):
+    """
+    원본 테이블 하나에 대해 바뀐 연도만 다시 집계하고 갱신된 연도 목록을 반환
+    years 가 주어지면 그 연도들만 확인하고, full 이면 지문과 상관없이 다시 집계한다
+    (full 과 years 를 함께 주면 years 의 연도 전부, 원본 행이 모두 지워진 연도 포함).
+    """
+    cursor = conn.cursor()
+    current = _fingerprints(cursor, source_table, years)
+    cursor.execute("SELECT year, fingerprint FROM rollup_state WHERE source_table = %s", (source_table,))
+    stored = {int(year): fingerprint for year, fingerprint in cursor.fetchall()}
+    if years is not None:
+        stored = {year: fingerprint for year, fingerprint in stored.items() if year in years}
+
+    if full and years is not None:
+        changed = sorted(years)
+    elif full:
+        changed = sorted(set(current) | set(stored))
+    else:
+        changed = sorted(
+            year for year in set(current) | set(stored)
+            if current.get(year) != stored.get(year)
+        )
+
+    if changed:
+        conn.begin()
+        try:
+            for year in changed:
+                if source_table == GREENHOUSE_SOURCE:
+                    _rebuild_greenhouse_year(cursor, year)
+                else:
+                    _rebuild_announcement_year(cursor, source_table, year)
+                cursor.execute("DELETE FROM rollup_state WHERE source_table = %s AND year = %s",
+                               (source_table, year))
+                if year in current:
+                    cursor.execute(
+                        "INSERT INTO rollup_state (source_table, year, fingerprint, refreshed_at) "
+                        "VALUES (%s, %s, %s, %s)",
+                        (source_table, year, current[year], time.time())
+                    )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    cursor.close()
+    return changed
+
+
+def refresh_rollups(full=False):
+    """
+    요약 테이블을 생성(없으면)하고 원본이 바뀐 연도만 다시 집계
+    반환값: {원본 테이블: 갱신된 연도 목록}
+    """
+    refreshed = {}
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        for ddl in DDL:
+            cursor.execute(ddl)
+        cursor.close()
+        for source_table in list(ANNOUNCEMENT_SOURCES) + [GREENHOUSE_SOURCE]:
+            refreshed[source_table] = _refresh_source(conn, source_table, full=full)
+
+    # 갱신된 요약 테이블을 읽는 캐시 결과는 버린다
+    if any(refreshed.values()):
+        for table in ROLLUP_TABLES:
+            invalidate_table(table)
+    return refreshed
+
+
+def refresh_rollup_years(changed_years):
+    """
+    변경 추적으로 알아낸 {원본 테이블: 바뀐 연도 집합} 의 연도만 다시 집계
+    변경 기록이 있는 연도는 지문이 같아도 다시 집계한다 (지문 비교는 변경 추적이 없을 때의 대안이다).
+    반환값: {원본 테이블: 갱신된 연도 목록}
+    """
+    refreshed = {}
+    with get_connection() as conn:
+        for source_table, years in changed_years.items():
+            years = {int(year) for year in years if year is not None}
+            if years:
+                refreshed[source_table] = _refresh_source(conn, source_table, full=True, years=years)
+
+    if any(refreshed.values()):
+        for table in ROLLUP_TABLES:
+            invalidate_table(table)
+    return refreshed
+
+
+def ensure_rollups():
+    """프로세스에서 처음 호출될 때 한 번 요약 테이블을 준비"""
+    global _ensured
+    if _ensured:
+        return
+    with _ensure_lock:
+        if not _ensured:
+            refresh_rollups()
+            _ensured = True
+
+
+if __name__ == "__main__":
+    started = time.perf_counter()
+    result = refresh_rollups(full="--full" in sys.argv[1:])
+    for source_table, years in result.items():
+        print(f"{source_table}: {len(years)}개 연도 갱신 {years}")
+    print(f"완료 ({time.perf_counter() - started:.2f}초)")
@@ -0,0 +1,118 @@
+"""
+car 데이터베이스 테이블 스키마
+
+MySQL 과 내장 SQLite 가 같은 스키마를 쓰도록 컬럼 정의를 한 곳에 모아 둔다.
+타입은 두 DB 가 모두 이해하는 이름만 사용한다.
+"""
+
+SCHEMA = {
+    'environmental_vehicles': [
+        ('연도', 'INT'),
+        ('구분', 'VARCHAR(50)'),
+        ('합계', 'BIGINT'),
+    ],
+    'greenhouse_gases': [
+        ('년도', 'INT'),
+        ('지역', 'VARCHAR(50)'),
+        ('승용', 'BIGINT'),
+        ('승합', 'BIGINT'),
+        ('화물', 'BIGINT'),
+        ('특수', 'BIGINT'),
+    ],
+    'electronic_car': [
+        ('년도', 'INT'),
+        ('지역', 'VARCHAR(50)'),
+        ('차종', 'VARCHAR(50)'),
+        ('민간공고대수', 'INT'),
+        ('접수대수', 'INT'),
+        ('접수잔여대수', 'INT'),
+        ('출고대수', 'INT'),
+        ('출고잔여대수', 'INT'),
+    ],
+    'hydrogen_car': [
+        ('년도', 'INT'),
+        ('지역', 'VARCHAR(50)'),
+        ('차종', 'VARCHAR(50)'),
+        ('민간공고대수', 'INT'),
+        ('접수대수', 'INT'),
+        ('접수잔여대수', 'INT'),
+        ('출고대수', 'INT'),
+        ('출고잔여대수', 'INT'),
+    ],
+    'money_electronic_car': [
+        ('지역id', 'INT'),
+        ('시도', 'VARCHAR(50)'),
+        ('제조사', 'VARCHAR(50)'),
+        ('모델명', 'VARCHAR(100)'),
+        ('국비(만원)', 'VARCHAR(20)'),
+        ('지방비(만원)', 'VARCHAR(20)'),
+        ('보조금(만원)', 'VARCHAR(20)'),
+        ('국비', 'INT'),
+        ('지방비', 'INT'),
+        ('보조금', 'INT'),
+        ('is_total', 'BOOLEAN NOT NULL DEFAULT 0'),
+    ],
+    'money_hydrogen_car': [
+        ('지역id', 'INT'),
+        ('시도', 'VARCHAR(50)'),
+        ('제조사', 'VARCHAR(50)'),
+        ('모델명', 'VARCHAR(100)'),
+        ('국비(만원)', 'VARCHAR(20)'),
+        ('지방비(만원)', 'VARCHAR(20)'),
+        ('보조금(만원)', 'VARCHAR(20)'),
+        ('국비', 'INT'),
+        ('지방비', 'INT'),
+        ('보조금', 'INT'),
+        ('is_total', 'BOOLEAN NOT NULL DEFAULT 0'),
+    ],
+    'faq': [
+        ('id', 'INT'),
+        ('category', 'VARCHAR(50)'),
+        ('question', 'TEXT'),
+        ('answer', 'TEXT'),
+    ],
+}
+
+# 조회 결과 DataFrame 의 컬럼 종류 (database/frames.py 가 dtype 을 정할 때 사용)
+# 원본 테이블 컬럼과 쿼리에서 붙이는 별칭을 모두 적어 둔다
+COLUMN_KINDS = {
+    **{name: 'year' for name in ('연도', '년도', 'year')},
+    **{name: 'category' for name in (
+        '구분', '지역', '시도', '차종', '제조사', '모델명',
+        'category', 'region', 'vehicle_type',
+    )},
+    # 행을 구분하는 값과 행 단위로만 쓰는 금액 (정렬/표시만 하므로 작은 정수형으로 줄인다)
+    **{name: 'int' for name in ('id', '지역id', '국비', '지방비', '보조금')},
+    # 더하거나 집계하는 개수/배출량 (int32 끼리 더하면 넘칠 수 있으므로 int64 유지)
+    **{name: 'measure' for name in (
+        '합계', '승용', '승합', '화물', '특수',
+        '민간공고대수', '접수대수', '접수잔여대수', '출고대수', '출고잔여대수',
+        'total', 'total_count', 'eco_count', 'passenger', 'bus', 'cargo', 'special', 'total_gas',
+        'announced_count', 'released_count', 'remaining_count', 'total_subsidy',
+    )},
+}
+
+# 스키마에 없는 컬럼은 값 종류로 타입을 정한다 (스냅샷 매니페스트의 kind 기준)
+KIND_TYPES = {'int': 'BIGINT', 'float': 'DOUBLE', 'category': 'TEXT'}
+
+
+def quote(identifier):
+    """괄호 등이 들어간 한글 컬럼명을 식별자로 쓰기 위해 백틱으로 감싼다 (MySQL/SQLite 공통)"""
+    return "`" + identifier.replace("`", "``") + "`"
+
+
+def create_table_sql(table, columns=None, kinds=None, like=None):
+    """
+    CREATE TABLE IF NOT EXISTS 문 생성
+    columns 를 주면 그 컬럼 순서대로 만들고, 스키마에 없는 컬럼은 kinds 로 타입을 정한다.
+    like 를 주면 그 테이블의 스키마 타입을 쓴다 (적재용 임시 테이블).
+    """
+    known = dict(SCHEMA.get(like or table, []))
+    if columns is None:
+        columns = [name for name, _ in SCHEMA[like or table]]
+    kinds = kinds or {}
+    definitions = ", ".join(
+        f"{quote(column)} {known.get(column) or KIND_TYPES.get(kinds.get(column), 'TEXT')}"
+        for column in columns
+    )
+    return f"CREATE TABLE IF NOT EXISTS {quote(table)} ({definitions})"
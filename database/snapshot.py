@@ -0,0 +1,143 @@
+"""
+car 데이터베이스의 로컬 컬럼형 스냅샷
+
+테이블마다 컬럼을 하나의 .npy 파일로 저장한다. 숫자 컬럼은 그대로, 문자열 컬럼은
+사전(categories) + 정수 코드로 저장해서 용량을 줄이고, 읽을 때는 메모리 맵으로 연다.
+내보낼 때마다 새 버전 디렉터리(v<시각>)에 컬럼 파일을 모두 쓴 뒤 매니페스트만 바꿔 써서
+새 버전을 가리키게 하므로, 읽는 쪽은 항상 한 버전의 온전한 파일들만 본다.
+CAR_DB_BACKEND=snapshot 으로 실행하면 connect_db() 가 MySQL 대신 스냅샷을 적재한
+내장 SQLite 를 사용하므로 MySQL 서버 없이 앱을 띄울 수 있다 (database/backends.py).
+
+    python -m database.snapshot export [경로]   # MySQL -> 스냅샷
+    python -m database.snapshot info [경로]     # 스냅샷 내용 확인
+"""
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_DIR = os.environ.get("CAR_SNAPSHOT_DIR", os.path.join("data", "snapshot"))
+SNAPSHOT_TABLES = (
+    'environmental_vehicles',
+    'greenhouse_gases',
+    'electronic_car',
+    'hydrogen_car',
+    'money_electronic_car',
+    'money_hydrogen_car',
+    'faq',
+)
+MANIFEST_FILE = "manifest.json"
+VERSION_PREFIX = "v"
+KEEP_VERSIONS = 2   # 이전 매니페스트로 메모리 맵을 연 프로세스가 있을 수 있으므로 직전 버전은 남긴다
+
+
+def _encode_column(series):
+    """컬럼을 (종류, numpy 배열, 사전) 으로 변환"""
+    values = series.astype(object).where(series.notna(), None)
+    non_null = values.dropna()
+    numeric = pd.to_numeric(non_null, errors='coerce')
+    is_numeric = len(non_null) > 0 and numeric.notna().all() and not non_null.map(lambda v: isinstance(v, str)).any()
+
+    if is_numeric:
+        converted = pd.to_numeric(values, errors='coerce')
+        if converted.notna().all() and (converted % 1 == 0).all():
+            return 'int', converted.astype(np.int64).to_numpy(), None
+        return 'float', converted.astype(np.float64).to_numpy(), None
+
+    categorical = pd.Categorical(values.map(lambda v: None if v is None else str(v)))
+    return 'category', categorical.codes.astype(np.int32), [str(c) for c in categorical.categories]
+
+
+def write_table(df, name, path=SNAPSHOT_DIR):
+    """DataFrame 하나를 스냅샷 형식으로 저장하고 매니페스트 항목을 반환"""
+    os.makedirs(path, exist_ok=True)
+    columns = []
+    for i, column in enumerate(df.columns):
+        kind, array, categories = _encode_column(df[column])
+        file_name = f"{name}.{i}.npy"
+        np.save(os.path.join(path, file_name), array, allow_pickle=False)
+        columns.append({'name': column, 'kind': kind, 'file': file_name, 'categories': categories})
+    return {'rows': len(df), 'columns': columns}
+
+
+def read_manifest(path=SNAPSHOT_DIR):
+    with open(os.path.join(path, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_table(name, path=SNAPSHOT_DIR, manifest=None):
+    """스냅샷에서 테이블 하나를 DataFrame 으로 읽는다 (숫자 컬럼은 메모리 맵)"""
+    manifest = manifest or read_manifest(path)
+    meta = manifest['tables'][name]
+    data = {}
+    for column in meta['columns']:
+        array = np.load(os.path.join(path, column['file']), mmap_mode='r', allow_pickle=False)
+        if column['kind'] == 'category':
+            data[column['name']] = pd.Categorical.from_codes(np.asarray(array), categories=column['categories'])
+        else:
+            data[column['name']] = array
+    return pd.DataFrame(data, columns=[column['name'] for column in meta['columns']])
+
+
+def _prune_versions(path, current, keep=KEEP_VERSIONS):
+    """현재 버전을 포함해 최근 keep 개만 남기고 이전 버전 디렉터리 삭제"""
+    versions = sorted(
+        name for name in os.listdir(path)
+        if name.startswith(VERSION_PREFIX) and os.path.isdir(os.path.join(path, name)) and name != current
+    )
+    for name in versions[:max(len(versions) - (keep - 1), 0)]:
+        shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+
+
+def export_snapshot(path=SNAPSHOT_DIR, tables=SNAPSHOT_TABLES):
+    """MySQL 의 테이블들을 새 버전 디렉터리에 저장하고 매니페스트를 새 버전으로 바꾼다"""
+    from database.database import get_pool
+
+    version = f"{VERSION_PREFIX}{time.time_ns()}"
+    version_path = os.path.join(path, version)
+    manifest = {'created_at': time.time(), 'version': version, 'tables': {}}
+    try:
+        con = get_pool().acquire()
+        try:
+            cursor = con.cursor()
+            for name in tables:
+                cursor.execute(f"SELECT * FROM {name}")
+                data = cursor.fetchall()
+                columns = [desc[0] for desc in cursor.description]
+                meta = write_table(pd.DataFrame(list(data), columns=columns), name, version_path)
+                for column in meta['columns']:
+                    column['file'] = f"{version}/{column['file']}"
+                manifest['tables'][name] = meta
+            cursor.close()
+        finally:
+            con.close()
+    except Exception:
+        shutil.rmtree(version_path, ignore_errors=True)
+        raise
+
+    # 매니페스트는 마지막에 바꿔 써서 내보내기 도중에 읽는 쪽이 깨진 스냅샷을 보지 않게 한다
+    tmp_path = os.path.join(path, MANIFEST_FILE + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, os.path.join(path, MANIFEST_FILE))
+    _prune_versions(path, version)
+    return manifest
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "info"
+    target = sys.argv[2] if len(sys.argv) > 2 else SNAPSHOT_DIR
+    if command == "export":
+        started = time.perf_counter()
+        result = export_snapshot(target)
+        for name, meta in result['tables'].items():
+            print(f"{name}: {meta['rows']}행")
+        print(f"스냅샷 저장 완료: {target} ({time.perf_counter() - started:.2f}초)")
+    else:
+        for name, meta in read_manifest(target)['tables'].items():
+            kinds = ", ".join(f"{c['name']}({c['kind']})" for c in meta['columns'])
+            print(f"{name}: {meta['rows']}행 - {kinds}")
@@ -1,7 +1,23 @@
 import streamlit as st
-from utilities.faq_utility import get_faq_data, get_categories, filter_faq_by_category, search_faq
+from utilities.faq_utility import get_categories, get_faq_page
+from utilities.cache_utility import enable_copy_on_write
+from utilities.warmup_utility import start_warmup
+from utilities.change_utility import start_change_polling
+from utilities.debug_utility import start_page_trace, render_debug_panel
 import math
 
+# 공유 캐시 DataFrame 을 복사 없이 읽기 전용으로 나눠 쓰도록 pandas Copy-on-Write 켜기 (프로세스 전역 옵션)
+enable_copy_on_write()
+
+# 변경 추적 시작 (프로세스당 한 번, 이후 바뀐 행만 주기적으로 반영)
+start_change_polling()
+
+# 공유 캐시 워밍업 (프로세스당 한 번 시작, 이후 주기적으로 갱신)
+start_warmup()
+
+# 이번 실행의 조회/쿼리 계측 기록 (맨 아래 디버그 패널에서 표시)
+page_trace = start_page_trace()
+
 st.markdown(
     """
     <h1 style='text-align: center;'>자주하는 질문</h1>
@@ -142,7 +158,6 @@ st.markdown("""
 
 # FAQ 데이터 가져오기
 try:
-    df = get_faq_data()
     categories = get_categories()
     
     # Streamlit 버튼 그리드 생성
@@ -166,20 +181,33 @@ try:
 
     # FAQ 데이터 필터링 및 표시
     if st.session_state.selected_category:
-        # 카테고리별 필터링
-        filtered_df = filter_faq_by_category(df, st.session_state.selected_category)
+        # top 10 카테고리인지 확인
+        is_top_10 = st.session_state.selected_category.lower() == "top 10"
+        items_per_page = 5
         
-        # 검색어 필터링
-        if search_term and search_term != "궁금한 점을 검색해 보세요.":
-            filtered_df = search_faq(filtered_df, search_term)
+        # 카테고리/검색어 조건으로 화면에 표시할 행만 가져오기
+        if is_top_10:
+            # top 10 카테고리는 페이지네이션 없이 모든 항목 표시
+            filtered_df, total_items = get_faq_page(st.session_state.selected_category, search_term, per_page=None)
+        else:
+            filtered_df, total_items = get_faq_page(
+                st.session_state.selected_category, search_term,
+                page=st.session_state.current_page, per_page=items_per_page
+            )
+            total_pages = math.ceil(total_items / items_per_page)
+            
+            # 현재 페이지가 유효한 범위인지 확인
+            if total_pages and st.session_state.current_page > total_pages:
+                st.session_state.current_page = 1
+                filtered_df, total_items = get_faq_page(
+                    st.session_state.selected_category, search_term,
+                    page=1, per_page=items_per_page
+                )
         
         # 결과 표시
         if not filtered_df.empty:
             st.markdown(f"### {st.session_state.selected_category} 카테고리 FAQ")
             
-            # top 10 카테고리인지 확인
-            is_top_10 = st.session_state.selected_category.lower() == "top 10"
-            
             if is_top_10:
                 # top 10 카테고리는 페이지네이션 없이 모든 항목 표시
                 st.markdown(f"**총 {len(filtered_df)}개의 FAQ**")
@@ -215,24 +243,15 @@ try:
                         st.markdown(f"** 답변:** {answer}")
             else:
                 # 다른 카테고리는 페이지네이션 적용
-                # 페이지네이션 설정
-                items_per_page = 5
-                total_items = len(filtered_df)
-                total_pages = math.ceil(total_items / items_per_page)
-                
-                # 현재 페이지가 유효한 범위인지 확인
-                if st.session_state.current_page > total_pages:
-                    st.session_state.current_page = 1
-                
-                # 현재 페이지의 데이터 계산
+                # 현재 페이지의 범위 계산
                 start_idx = (st.session_state.current_page - 1) * items_per_page
                 end_idx = min(start_idx + items_per_page, total_items)
                 
                 # 페이지 정보 표시
                 st.markdown(f"**총 {total_items}개의 FAQ 중 {start_idx + 1}-{end_idx}번째 항목**")
                 
-                # 현재 페이지의 FAQ 항목들 표시
-                current_page_df = filtered_df.iloc[start_idx:end_idx]
+                # 현재 페이지의 FAQ 항목들 표시 (이미 해당 페이지만 조회됨)
+                current_page_df = filtered_df
                 
                 # 아코디언 형식으로 FAQ 표시
                 for index, row in current_page_df.iterrows():
@@ -299,4 +318,7 @@ try:
 
 except Exception as e:
     st.error(f"데이터를 불러오는 중 오류가 발생했습니다: {str(e)}")
-    st.info("데이터베이스 연결을 확인해주세요.")
\ No newline at end of file
+    st.info("데이터베이스 연결을 확인해주세요.")
+
+# 디버그 패널 (CAR_DEBUG_PANEL=1 또는 ?debug=1)
+render_debug_panel(page_trace)
@@ -0,0 +1,98 @@
+"""
+utilities/cache_utility.py 공유 캐시 테스트 (데이터 버전 키, 만료 연장)
+
+    python -m pytest tests
+"""
+from collections import defaultdict
+
+import pytest
+
+import utilities.cache_utility as cache_utility
+from utilities.cache_utility import ResultCache, cached, extend_table, invalidate_table, table_version
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """빈 캐시/버전 표와 직접 움직이는 시계"""
+    now = [1000.0]
+    monkeypatch.setattr(cache_utility, '_cache', ResultCache())
+    monkeypatch.setattr(cache_utility, '_table_versions', defaultdict(int))
+    monkeypatch.setattr(cache_utility.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def _counted(tables=('t',), ttl=60, result=lambda n: n, name='load'):
+    """호출 인자를 기록하고 result(호출 횟수) 를 반환하는 캐시 조회 함수 (name 이 캐시 키의 함수명)"""
+    calls = []
+
+    def load(x):
+        calls.append(x)
+        return result(len(calls))
+    load.__name__ = name
+    return cached(ttl=ttl, tables=tables)(load), calls
+
+
+def test_invalidate_table_changes_key(clock):
+    load, calls = _counted()
+    assert load(1) == load(1) == 1
+
+    invalidate_table('t')
+    assert table_version('t') == 1
+    assert load(1) == 2
+    assert load(1) == 2
+    assert calls == [1, 1]
+
+
+def test_result_read_during_change_is_not_reused(clock):
+    # 조회 도중 테이블이 바뀌면 결과는 이전 버전 키에 저장되어 다음 호출이 다시 조회한다
+    def result(n):
+        if n == 1:
+            invalidate_table('t')
+        return n
+
+    load, _ = _counted(result=result)
+    assert load(1) == 1
+    assert load(1) == 2
+    assert load(1) == 2
+
+
+def test_other_table_change_keeps_result(clock):
+    load, calls = _counted()
+    load(1)
+    invalidate_table('other')
+    load(1)
+    assert calls == [1]
+
+
+def test_none_is_not_cached(clock):
+    load, calls = _counted(result=lambda n: None)
+    load(1)
+    load(1)
+    assert calls == [1, 1]
+
+
+def test_extend_table_delays_expiry(clock):
+    load, calls = _counted(ttl=60)
+    other, other_calls = _counted(tables=('other',), ttl=60, name='load_other')
+    load(1)
+    other(1)
+
+    clock[0] += 50
+    assert extend_table('t', ttl=60) == 1
+    clock[0] += 50
+    load(1)
+    other(1)
+
+    assert calls == [1]
+    assert other_calls == [1, 1]
+
+
+def test_extend_skips_expired_and_longer_entries():
+    cache = ResultCache()
+    cache.set('expired', 1, ttl=-1, tables=('t',))
+    cache.set('longer', 2, ttl=3600, tables=('t',))
+    cache.set('short', 3, ttl=1, tables=('t',))
+
+    assert cache.extend('t', ttl=60) == 1
+    assert cache.get('expired') == (False, None)
+    assert cache._entries['longer'][0] > cache._entries['short'][0]
@@ -0,0 +1,59 @@
+"""
+utilities/change_utility.py 변경 반영 테스트 (내장 SQLite, 트리거 -> change_log -> 요약 테이블/캐시)
+
+    python -m pytest tests
+"""
+import pytest
+
+import database.database as database
+import database.rollup as rollup
+import utilities.change_utility as change_utility
+from database.backends import SQLiteBackend
+from database.migrations import run_migrations
+from database.schema import SCHEMA, create_table_sql
+from utilities.app_utility import get_region_emission_data
+from utilities.cache_utility import table_version
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """마이그레이션까지 적용한 빈 SQLite 를 현재 백엔드로 (변경 반영은 처음 순번부터)"""
+    backend = SQLiteBackend(str(tmp_path / "car.sqlite"))
+    monkeypatch.setattr(database, '_backend', backend)
+    monkeypatch.setattr(rollup, '_ensured', False)
+    monkeypatch.setattr(change_utility, '_last_seq', None)
+    cursor = backend.connect().cursor()
+    for table in SCHEMA:
+        cursor.execute(create_table_sql(table))
+    cursor.close()
+    run_migrations(backend.connect(), backend)
+    return backend
+
+
+def _execute(backend, sql, params=None):
+    cursor = backend.connect().cursor()
+    cursor.execute(sql, params)
+    cursor.close()
+
+
+def test_greenhouse_change_refreshes_rollup(db):
+    _execute(db, "INSERT INTO greenhouse_gases (년도, 지역, 승용, 승합, 화물, 특수) VALUES (2022, '서울', 1, 2, 3, 4)")
+    change_utility.poll_changes(from_start=True)
+    assert get_region_emission_data(2022)['total_gas'].tolist() == [10]
+
+    _execute(db, "UPDATE greenhouse_gases SET 승용 = 11 WHERE 년도 = 2022")
+    summary = change_utility.poll_changes()
+
+    assert 'greenhouse_gases' in summary
+    assert get_region_emission_data(2022)['total_gas'].tolist() == [20]
+
+
+def test_environmental_vehicles_change_bumps_version(db):
+    change_utility.poll_changes(from_start=True)
+    before = table_version('environmental_vehicles')
+
+    _execute(db, "INSERT INTO environmental_vehicles (연도, 구분, 합계) VALUES (2024, '전기차', 5)")
+    summary = change_utility.poll_changes()
+
+    assert 'environmental_vehicles' in summary
+    assert table_version('environmental_vehicles') > before
@@ -0,0 +1,77 @@
+"""
+database/ingest.py 적재 테스트 (내장 SQLite)
+
+    python -m pytest tests
+"""
+import sqlite3
+
+import pytest
+
+import database.database as database
+import database.migrations as migrations
+from database.backends import SQLiteBackend
+from database.ingest import TOTAL_REGION_ID, ingest_file
+
+MONEY_CSV = """시도명,제조사,모델,국비(만원),지방비(만원),보조금(만원)
+서울특별시,현대,아이오닉5,"650","200","850"
+부산광역시,기아,EV6,"640","300","940"
+서울특별시,합계,,"1,290","500","1,790"
+전국,합계,,"1,290","500","1,790"
+,,,,,
+"""
+
+
+@pytest.fixture
+def empty_db(tmp_path, monkeypatch):
+    """테이블이 하나도 없는 SQLite 파일을 현재 백엔드로"""
+    path = tmp_path / "car.sqlite"
+    monkeypatch.setattr(database, '_backend', SQLiteBackend(str(path)))
+    monkeypatch.setattr(migrations, '_ensured', False)
+    return path
+
+
+def test_ingest_into_empty_db(empty_db, tmp_path):
+    source = tmp_path / "money.csv"
+    source.write_text(MONEY_CSV, encoding='utf-8')
+
+    result = ingest_file('money_electronic_car', str(source))
+
+    assert result['status'] == 'done'
+    assert (result['read'], result['loaded'], result['incomplete'], result['totals']) == (5, 4, 1, 0)
+    con = sqlite3.connect(empty_db)
+    rows = con.execute(
+        "SELECT 지역id, 시도, 모델명, 보조금, is_total FROM money_electronic_car ORDER BY 지역id, 보조금"
+    ).fetchall()
+    assert rows == [
+        (TOTAL_REGION_ID, '합계', '합계', 1790, 1),
+        (1, '서울', '아이오닉5', 850, 0),
+        (1, '서울', '합계', 1790, 1),
+        (2, '부산', 'EV6', 940, 0),
+    ]
+    applied = {version for (version,) in con.execute("SELECT version FROM schema_migrations")}
+    assert applied == {version for version, _, _ in migrations.MIGRATIONS}
+    con.close()
+
+    again = ingest_file('money_electronic_car', str(source))
+    assert again['status'] == 'skipped'
+    assert (again['read'], again['loaded'], again['incomplete'], again['totals']) == (5, 4, 1, 0)
+
+
+def test_resumed_ingest_keeps_skipped_counts(empty_db, tmp_path):
+    source = tmp_path / "money.csv"
+    source.write_text(MONEY_CSV, encoding='utf-8')
+    skipped = ingest_file('money_electronic_car', str(source), batch_size=1, keep_totals=False)
+    assert (skipped['loaded'], skipped['totals'], skipped['incomplete']) == (2, 2, 1)
+
+    # 세 번째 행(서울 합계)까지 읽고 멈춘 상태로 되돌린 뒤 이어서 적재
+    con = sqlite3.connect(empty_db)
+    con.execute(
+        "UPDATE ingest_state SET status = 'staging', rows_read = 3, rows_loaded = 2, "
+        "rows_incomplete = 0, rows_totals = 1"
+    )
+    con.commit()
+    con.close()
+
+    resumed = ingest_file('money_electronic_car', str(source), keep_totals=False)
+    assert resumed['resumed_from'] == 3
+    assert (resumed['read'], resumed['loaded'], resumed['totals'], resumed['incomplete']) == (5, 2, 2, 1)
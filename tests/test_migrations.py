@@ -0,0 +1,106 @@
+"""
+database/migrations.py 마이그레이션과 파생 컬럼 트리거 테스트 (내장 SQLite)
+
+    python -m pytest tests
+"""
+import pytest
+
+import database.backends as backends
+from database.backends import SQLiteBackend, seed_database
+from database.migrations import MIGRATIONS, run_migrations
+from database.queries import QUERIES
+
+# 마이그레이션 전 원본 테이블처럼 문자열 금액 컬럼만 있는 보조금 행
+SOURCE_COLUMNS = ['지역id', '시도', '제조사', '모델명', '국비(만원)', '지방비(만원)', '보조금(만원)']
+SOURCE_ROWS = [
+    (1, '서울', '현대', '아이오닉5', '650', '200', '850'),
+    (2, '부산', '기아', 'EV6', '640', '300', '940'),
+    (1, '서울', '합계', '합계', '1,290', '500', '1,790'),
+]
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    """스냅샷 대신 SOURCE_ROWS 를 적재하는 SQLite 백엔드"""
+    def sources(tables, path=None):
+        yield 'money_electronic_car', list(SOURCE_COLUMNS), {}, iter(SOURCE_ROWS)
+
+    monkeypatch.setattr(backends, '_iter_snapshot_tables', sources)
+    return SQLiteBackend(str(tmp_path / "car.sqlite"))
+
+
+def _seed_and_migrate(backend):
+    seed_database(backend.connect(), source='snapshot')
+    return run_migrations(backend.connect(), backend)
+
+
+def _query(backend, sql, params=None):
+    cursor = backend.connect().cursor()
+    cursor.execute(sql, params)
+    rows = cursor.fetchall()
+    cursor.close()
+    return rows
+
+
+def _schema_objects(backend):
+    return _query(backend, "SELECT type, name FROM sqlite_master WHERE type IN ('index', 'trigger') ORDER BY name")
+
+
+def test_migrations_are_idempotent(backend):
+    assert _seed_and_migrate(backend) == [version for version, _, _ in MIGRATIONS]
+    objects = _schema_objects(backend)
+
+    assert run_migrations(backend.connect(), backend) == []
+    assert _schema_objects(backend) == objects
+    assert _query(backend, "SELECT 보조금, 국비, is_total FROM money_electronic_car ORDER BY 보조금") == [
+        (850, 650, 0), (940, 640, 0), (1790, 1290, 1),
+    ]
+
+
+def test_reseed_reapplies_migrations(backend):
+    _seed_and_migrate(backend)
+    objects = _schema_objects(backend)
+
+    # 다시 적재하면 테이블이 원본 컬럼으로 새로 만들어지므로 모든 단계를 다시 적용해야 한다
+    assert _seed_and_migrate(backend) == [version for version, _, _ in MIGRATIONS]
+    assert _schema_objects(backend) == objects
+    assert _query(backend, "SELECT COUNT(*) FROM money_electronic_car WHERE is_total = 0 AND 보조금 > 0") == [(2,)]
+
+
+def test_total_flag_triggers(backend):
+    _seed_and_migrate(backend)
+    cursor = backend.connect().cursor()
+    cursor.execute(
+        "INSERT INTO money_electronic_car (지역id, 시도, 제조사, 모델명, \"보조금(만원)\") VALUES (2, '부산', '합계', '합계', '940')"
+    )
+    cursor.execute("UPDATE money_electronic_car SET 모델명 = '아이오닉5 합계' WHERE 모델명 = '아이오닉5'")
+    cursor.execute("UPDATE money_electronic_car SET 제조사 = '기아', 모델명 = 'EV9' WHERE 지역id = 1 AND 모델명 = '합계'")
+    cursor.close()
+
+    assert _query(backend, "SELECT 지역id, 모델명, is_total FROM money_electronic_car ORDER BY 지역id, 모델명") == [
+        (1, 'EV9', 0), (1, '아이오닉5 합계', 1), (2, 'EV6', 0), (2, '합계', 1),
+    ]
+
+
+def test_amount_triggers(backend):
+    _seed_and_migrate(backend)
+    cursor = backend.connect().cursor()
+    cursor.execute(
+        "INSERT INTO money_electronic_car (지역id, 시도, 제조사, 모델명, \"국비(만원)\", \"지방비(만원)\", \"보조금(만원)\") "
+        "VALUES (3, '대구', '기아', 'EV3', '1,000', '', '1,000')"
+    )
+    cursor.execute("UPDATE money_electronic_car SET \"보조금(만원)\" = '900' WHERE 모델명 = 'EV6'")
+    cursor.close()
+
+    assert _query(backend, "SELECT 모델명, 국비, 지방비, 보조금 FROM money_electronic_car WHERE is_total = 0 ORDER BY 지역id") == [
+        ('아이오닉5', 650, 200, 850), ('EV6', 640, 300, 900), ('EV3', 1000, 0, 1000),
+    ]
+
+
+def test_subsidy_page_reads_index_order(backend):
+    _seed_and_migrate(backend)
+    sql = QUERIES['subsidy_page'][1].format(table='money_electronic_car')
+    plan = " ".join(row[3] for row in _query(backend, "EXPLAIN QUERY PLAN " + sql, (10, 0)))
+
+    assert "idx_money_electronic_car_total_subsidy_page" in plan
+    assert "TEMP B-TREE" not in plan
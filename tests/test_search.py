@@ -0,0 +1,75 @@
+"""
+utilities/search_utility.py 검색 색인 테스트 (부분 문자열 결과, BM25 순위, 카테고리, 페이지, 증분 갱신)
+
+    python -m pytest tests
+"""
+import pandas as pd
+import pytest
+
+from benchmarks.data_layer import SCALES, generate_tables
+from utilities.search_utility import SearchIndex, build_index
+
+QUERIES = ["보조금 신청", "충전", "차", "금 안", "배터리 보증", "?", "없는검색어", "A", "a"]
+
+
+@pytest.fixture(scope="module")
+def faq():
+    df = generate_tables(**dict(SCALES['small'], faq=2000))['faq']
+    return df, build_index(df, group_col='category')
+
+
+def _reference(df, query, category=None):
+    """이전 LIKE 검색처럼 질문/답변에 검색어가 (대소문자 무시) 부분 문자열로 있는 행 id"""
+    text = (df['question'].astype(str) + "\0" + df['answer'].astype(str)).str.lower()
+    hits = text.str.contains(query.lower(), regex=False)
+    if category is not None:
+        hits &= df['category'] == category
+    return set(df.index[hits])
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_results_match_substring_scan(faq, query):
+    df, index = faq
+    ids, total = index.search_page(query)
+    assert set(ids) == _reference(df, query)
+    assert total == len(ids)
+
+
+def test_category_filter(faq):
+    df, index = faq
+    category = df['category'].iloc[0]
+    for query in QUERIES:
+        ids, total = index.search_page(query, group=category)
+        assert set(ids) == _reference(df, query, category)
+        assert total == len(ids)
+
+
+def test_pages_cover_results_in_order(faq):
+    _, index = faq
+    for query in QUERIES:
+        ranked = index.search(query)
+        pages = []
+        for offset in range(0, len(ranked) + 7, 7):
+            page, total = index.search_page(query, offset, 7)
+            assert total == len(ranked)
+            pages.extend(page)
+        assert pages == ranked
+
+
+def test_bm25_prefers_more_matches():
+    index = SearchIndex()
+    index.build([1, 2, 3], ["보증 기간", "보증 보증 보증", "충전 요금"], ["", "", "보증"])
+    # 질문에 여러 번 나온 문서 > 질문에 한 번 > 답변에 한 번 (질문 가중치), 포함하지 않는 문서는 없음
+    assert index.search("보증") == [2, 1, 3]
+    assert index.search("기간") == [1]
+
+
+def test_incremental_add_and_remove():
+    df = pd.DataFrame({'question': ["전기차 보조금", "수소차 충전"], 'answer': ["신청 방법", "충전소 위치"]})
+    index = build_index(df)
+    index.add(5, "전기차 충전", "요금 안내")
+    index.remove(0)
+    assert index.search("전기차") == [5]
+    assert set(index.search("충전")) == {1, 5}
+    index.add(1, "수소차 정비", "")
+    assert index.search("충전") == [5]
@@ -0,0 +1,71 @@
+"""
+utilities/money_utility.py 보조금 TOP-K 색인 테스트 (스트리밍 생성 결과 = 시도별 nlargest)
+
+    python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from database.frames import frame_from_rows
+from utilities.money_utility import SubsidyTopK
+
+COLUMNS = ['지역id', '시도', '제조사', '모델명', '보조금']
+REGIONS = ['서울', '부산', '대구', '인천', '광주']
+
+
+def _rows(seed, n=400):
+    """보조금 내림차순(같으면 지역id, 모델명 순, 쿼리와 같은 순서) 행, 동점과 중복 행이 많게"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for _ in range(n):
+        region_id = int(rng.integers(len(REGIONS)))
+        model = f"모델{int(rng.integers(30))}"
+        rows.append((region_id + 1, REGIONS[region_id], f"제조사{model[-1]}", model, int(rng.integers(5)) * 100))
+    rows.sort(key=lambda row: (-row[4], row[0], row[3]))
+    return rows
+
+
+def _chunks(rows, size):
+    """서버 측 커서처럼 size 행씩, chunk 마다 범주 사전이 다른 DataFrame 으로"""
+    for start in range(0, len(rows), size):
+        df = frame_from_rows(rows[start:start + size], COLUMNS)
+        df['보조금(만원)'] = df.pop('보조금')
+        yield df
+
+
+def _expected(rows, region, k):
+    df = pd.DataFrame(rows, columns=COLUMNS).rename(columns={'보조금': '보조금(만원)'}).drop_duplicates()
+    if region != "전체":
+        df = df[df['시도'] == region]
+    return df.nlargest(k, '보조금(만원)', keep='first')
+
+
+def _plain(df):
+    return [tuple(str(value) for value in row) for row in df[['시도', '모델명', '보조금(만원)']].itertuples(index=False)]
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("chunk_size", [1, 7, 1000])
+def test_from_chunks_matches_nlargest(seed, chunk_size):
+    rows = _rows(seed)
+    index = SubsidyTopK.from_chunks(_chunks(rows, chunk_size), depth=10)
+
+    assert index.regions() == sorted(REGIONS)
+    for region in ["전체"] + REGIONS:
+        for k in (1, 5, 10):
+            assert _plain(index.top(region, k)) == _plain(_expected(rows, region, k))
+
+
+def test_from_chunks_matches_full_index():
+    rows = _rows(3)
+    streamed = SubsidyTopK.from_chunks(_chunks(rows, 13), depth=5)
+    full = SubsidyTopK(next(_chunks(rows, len(rows))))
+    for region in ["전체"] + REGIONS:
+        assert _plain(streamed.top(region, 5)) == _plain(full.top(region, 5))
+
+
+def test_from_chunks_empty():
+    index = SubsidyTopK.from_chunks(iter([]))
+    assert index.top().empty
+    assert index.regions() == []
@@ -0,0 +1,42 @@
+"""
+utilities/warmup_utility.py 변경 없는 작업 건너뛰기 테스트
+
+    python -m pytest tests
+"""
+import pytest
+
+import utilities.warmup_utility as warmup
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """추적 테이블(faq) 작업과 추적하지 않는 테이블(ingest_state) 작업만 두고 변경 반영이 도는 상태로"""
+    calls = {'tracked': 0, 'untracked': 0}
+
+    def task(name):
+        calls[name] += 1
+        return 1
+
+    monkeypatch.setattr(warmup, 'WARMUP_TASKS', {
+        'tracked': (task, ('tracked',), ('faq',)),
+        'untracked': (task, ('untracked',), ('ingest_state',)),
+    })
+    monkeypatch.setattr(warmup, '_warmed_versions', {})
+    monkeypatch.setattr(warmup, 'is_change_polling', lambda: True)
+    return calls
+
+
+def test_untracked_table_task_is_refreshed(calls):
+    warmup.run_warmup()
+    report = warmup.run_warmup()
+
+    assert report['skipped'] == ['tracked']
+    assert calls == {'tracked': 1, 'untracked': 2}
+
+
+def test_force_refreshes_tracked_task(calls):
+    warmup.run_warmup()
+    report = warmup.run_warmup(force=True)
+
+    assert report['skipped'] == []
+    assert calls == {'tracked': 2, 'untracked': 2}
@@ -1,97 +1,69 @@
-import pandas as pd
 import numpy as np
-from database.database import connect_db
+from database.database import get_connection
+from database.frames import read_frame
+from database.rollup import ensure_rollups
+from database.instrumentation import instrumented, record_error
+from utilities.cache_utility import cached
 
-def get_vehicle_registration_data():
+@instrumented
+@cached(tables=('environmental_vehicles',))
+def get_vehicle_registration_data(start_year=2020, end_year=2024):
     """
     자동차 등록 현황 데이터를 가져오는 함수
+    연도 범위 전체를 한 번의 쿼리로 가져와 연도 x 구분 피벗으로 정리한다.
     """
     try:
-        conn = connect_db()
-        cursor = conn.cursor()
-        
-        # environmental_vehicles 테이블에서 데이터 가져오기
+        # environmental_vehicles 테이블에서 전체/친환경/차종별 데이터를 한 번에 가져오기
         query = """
         SELECT 
             연도 as year,
             구분 as category,
             합계 as total
         FROM environmental_vehicles 
-        WHERE 연도 BETWEEN 2020 AND 2024
+        WHERE 연도 BETWEEN %s AND %s
+          AND (구분 LIKE '%%전체 차량 등록%%'
+               OR 구분 LIKE '%%친환경 전체%%'
+               OR 구분 IN ('전기차', '수소차', '하이브리드'))
         ORDER BY 연도, 구분
         """
         
-        cursor.execute(query)
-        data = cursor.fetchall()
-        columns = ['year', 'category', 'total']
-        df = pd.DataFrame(data, columns=columns)
-        
-        cursor.close()
-        conn.close()
+        # 구분은 범주형, 연도/합계는 정수형으로 바로 읽는다
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, (start_year, end_year))
+            df = read_frame(cursor)
+            cursor.close()
         
         if df.empty:
             return None
         
-        # 데이터 재구성
-        # 전체 차량 등록과 친환경 전체 데이터 분리
-        total_vehicles = df[df['category'].str.contains('전체 차량 등록')]
-        eco_vehicles = df[df['category'].str.contains('친환경 전체')]
-        
-        # 연도별로 데이터 정리
-        result_data = []
-        for year in range(2020, 2025):
-            year_total = total_vehicles[total_vehicles['year'] == year]
-            year_eco = eco_vehicles[eco_vehicles['year'] == year]
-            
-            if not year_total.empty and not year_eco.empty:
-                # 실제 데이터베이스에서 친환경 차종별 데이터 가져오기
-                try:
-                    conn = connect_db()
-                    cursor = conn.cursor()
-                    eco_detail_query = """
-                    SELECT 
-                        연도 as year,
-                        구분 as category,
-                        합계 as total
-                    FROM environmental_vehicles 
-                    WHERE 연도 = %s AND 구분 IN ('전기차', '수소차', '하이브리드')
-                    ORDER BY 구분
-                    """
-                    cursor.execute(eco_detail_query, (year,))
-                    eco_detail_data = cursor.fetchall()
-                    eco_detail_df = pd.DataFrame(eco_detail_data, columns=['year', 'category', 'total'])
-                    cursor.close()
-                    conn.close()
-                    
-                    # 친환경 차종별 데이터 추출
-                    electric_data = eco_detail_df[eco_detail_df['category'] == '전기차']
-                    hydrogen_data = eco_detail_df[eco_detail_df['category'] == '수소차']
-                    hybrid_data = eco_detail_df[eco_detail_df['category'] == '하이브리드']
-                    
-                    electric_count = electric_data.iloc[0]['total'] if not electric_data.empty else 0
-                    hydrogen_count = hydrogen_data.iloc[0]['total'] if not hydrogen_data.empty else 0
-                    hybrid_count = hybrid_data.iloc[0]['total'] if not hybrid_data.empty else 0
-                    
-                except Exception as e:
-                    print(f"친환경 차종별 데이터 조회 실패: {e}")
-                    # 데이터베이스에서 차종별 데이터를 가져올 수 없는 경우 기본값 사용
-                    electric_count = year_eco.iloc[0]['total'] * 0.4
-                    hydrogen_count = year_eco.iloc[0]['total'] * 0.1
-                    hybrid_count = year_eco.iloc[0]['total'] * 0.5
-                
-                result_data.append({
-                    'year': year,
-                    'total_vehicles': year_total.iloc[0]['total'],
-                    'total_eco_vehicles': year_eco.iloc[0]['total'],
-                    'electric_vehicles': electric_count,
-                    'hydrogen_vehicles': hydrogen_count,
-                    'hybrid_vehicles': hybrid_count,
-                })
-        
-        if not result_data:
+        # 구분 값을 결과 컬럼명으로 매핑 (전체 차량 등록/친환경 전체는 부분 일치)
+        category = df['category'].astype(str)
+        df['column'] = np.select(
+            [
+                category.str.contains('전체 차량 등록'),
+                category.str.contains('친환경 전체'),
+                category == '전기차',
+                category == '수소차',
+                category == '하이브리드',
+            ],
+            ['total_vehicles', 'total_eco_vehicles', 'electric_vehicles', 'hydrogen_vehicles', 'hybrid_vehicles'],
+            default='',
+        )
+        # 연도 x 구분 피벗 (같은 연도/구분이 여러 행이면 첫 행 사용)
+        pivot = df[df['column'] != ''].pivot_table(
+            index='year', columns='column', values='total', aggfunc='first'
+        )
+        pivot = pivot.reindex(columns=['total_vehicles', 'total_eco_vehicles',
+                                       'electric_vehicles', 'hydrogen_vehicles', 'hybrid_vehicles'])
+        
+        # 전체 차량 등록과 친환경 전체가 모두 있는 연도만 사용
+        result_df = pivot.dropna(subset=['total_vehicles', 'total_eco_vehicles'])
+        if result_df.empty:
             return None
-            
-        result_df = pd.DataFrame(result_data)
+        
+        result_df = result_df.fillna(0).reset_index()
+        result_df.columns.name = None
         
         # 친환경 자동차 총합 계산
         result_df['total_eco_vehicles'] = result_df['electric_vehicles'] + result_df['hydrogen_vehicles'] + result_df['hybrid_vehicles']
@@ -104,104 +76,109 @@ def get_vehicle_registration_data():
         return result_df
         
     except Exception as e:
-        print(f"데이터베이스 연결 오류: {e}")
+        record_error("get_vehicle_registration_data", e)
         return None
 
-def get_environmental_impact_data():
+@instrumented
+@cached(tables=('greenhouse_gases', 'environmental_vehicles', 'rollup_greenhouse_region'))
+def get_environmental_impact_data(start_year=2019, end_year=2022):
     """
     환경 영향 분석 데이터를 가져오는 함수
+    연도별 온실가스 합계와 친환경 자동차 비율을 한 번의 쿼리로 조인해서 가져온다.
     """
     try:
-        conn = connect_db()
-        cursor = conn.cursor()
+        ensure_rollups()
         
-        # greenhouse_gases 테이블에서 실제 사용 가능한 연도 범위로 데이터 가져오기
+        # 지역별 온실가스 요약의 연도별 합계 + environmental_vehicles 연도별 전체/친환경 대수
         query = """
         SELECT 
-            년도 as year,
-            지역 as region,
-            승용 as passenger,
-            승합 as bus,
-            화물 as cargo,
-            특수 as special
-        FROM greenhouse_gases 
-        WHERE 년도 BETWEEN 2019 AND 2022
-        ORDER BY 년도, 지역
+            g.year,
+            g.passenger,
+            g.bus,
+            g.cargo,
+            g.special,
+            e.total_count,
+            e.eco_count
+        FROM (
+            SELECT 
+                year,
+                SUM(passenger) as passenger,
+                SUM(bus) as bus,
+                SUM(cargo) as cargo,
+                SUM(special) as special
+            FROM rollup_greenhouse_region 
+            WHERE year BETWEEN %s AND %s
+            GROUP BY year
+        ) g
+        LEFT JOIN (
+            SELECT 
+                연도 as year,
+                MAX(CASE WHEN 구분 = '전체 차량 등록' THEN 합계 END) as total_count,
+                MAX(CASE WHEN 구분 = '친환경 전체' THEN 합계 END) as eco_count
+            FROM environmental_vehicles 
+            WHERE 연도 BETWEEN %s AND %s AND 구분 IN ('전체 차량 등록', '친환경 전체')
+            GROUP BY 연도
+        ) e ON e.year = g.year
+        ORDER BY g.year
         """
         
-        cursor.execute(query)
-        data = cursor.fetchall()
-        columns = ['year', 'region', 'passenger', 'bus', 'cargo', 'special']
-        df = pd.DataFrame(data, columns=columns)
-        
-        cursor.close()
-        conn.close()
+        # SUM 결과(Decimal)도 읽을 때 정수형으로 바뀐다 (해당 연도 데이터가 없으면 float)
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, (start_year, end_year, start_year, end_year))
+            df = read_frame(cursor)
+            cursor.close()
         
         if df.empty:
             return None
         
-        # 지역별 온실가스 배출량 합계 계산
-        yearly_data = df.groupby('year').agg({
-            'passenger': 'sum',
-            'bus': 'sum', 
-            'cargo': 'sum',
-            'special': 'sum'
-        }).reset_index()
+        yearly_data = df[['year', 'passenger', 'bus', 'cargo', 'special']].copy()
         
         # 총 온실가스 배출량 계산
         yearly_data['greenhouse_gas'] = yearly_data['passenger'] + yearly_data['bus'] + yearly_data['cargo'] + yearly_data['special']
         
-        # 실제 데이터베이스에서 친환경 자동차 비율 데이터 가져오기
-        try:
-            conn = connect_db()
+        # 연도별 친환경 자동차 비율 계산 (해당 연도 데이터가 없으면 0)
+        safe_total = df['total_count'].replace(0, np.nan)
+        yearly_data['eco_vehicle_ratio'] = (df['eco_count'] / safe_total * 100).fillna(0)
+        
+        return yearly_data
+        
+    except Exception as e:
+        record_error("get_environmental_impact_data", e)
+        return None
+
+@instrumented
+@cached(tables=('greenhouse_gases', 'rollup_greenhouse_region'))
+def get_region_emission_data(year=2022):
+    """
+    지역별 온실가스 배출량 데이터를 가져오는 함수 (미리 집계된 요약 테이블 사용)
+    """
+    try:
+        ensure_rollups()
+        query = """
+        SELECT 
+            year,
+            region,
+            passenger,
+            bus,
+            cargo,
+            special,
+            total_gas
+        FROM rollup_greenhouse_region 
+        WHERE year = %s
+        ORDER BY region
+        """
+        with get_connection() as conn:
             cursor = conn.cursor()
-            eco_ratio_query = """
-            SELECT 
-                연도 as year,
-                구분 as category,
-                합계 as total
-            FROM environmental_vehicles 
-            WHERE 연도 BETWEEN 2019 AND 2024 AND 구분 IN ('전체 차량 등록', '친환경 전체')
-            ORDER BY 연도, 구분
-            """
-            cursor.execute(eco_ratio_query)
-            eco_ratio_data = cursor.fetchall()
-            eco_ratio_df = pd.DataFrame(eco_ratio_data, columns=['year', 'category', 'total'])
+            cursor.execute(query, (year,))
+            df = read_frame(cursor)
             cursor.close()
-            conn.close()
-            
-            if not eco_ratio_df.empty:
-                # 연도별 친환경 자동차 비율 계산
-                eco_ratios = []
-                for year in yearly_data['year']:  # yearly_data의 실제 연도 사용
-                    year_total = eco_ratio_df[(eco_ratio_df['year'] == year) & (eco_ratio_df['category'] == '전체 차량 등록')]
-                    year_eco = eco_ratio_df[(eco_ratio_df['year'] == year) & (eco_ratio_df['category'] == '친환경 전체')]
-                    
-                    if not year_total.empty and not year_eco.empty:
-                        ratio = (year_eco.iloc[0]['total'] / year_total.iloc[0]['total']) * 100
-                        eco_ratios.append(ratio)
-                    else:
-                        # 해당 연도 데이터가 없으면 0으로 설정
-                        eco_ratios.append(0)
-                
-                # 배열 길이 확인 및 조정
-                if len(eco_ratios) == len(yearly_data):
-                    yearly_data['eco_vehicle_ratio'] = eco_ratios
-                else:
-                    # 길이가 다르면 0으로 채움
-                    eco_ratios.extend([0] * (len(yearly_data) - len(eco_ratios)))
-                    yearly_data['eco_vehicle_ratio'] = eco_ratios[:len(yearly_data)]
-            else:
-                # 데이터가 없는 경우 기본값 사용
-                yearly_data['eco_vehicle_ratio'] = [0] * len(yearly_data)
-                
-        except Exception as e:
-            print(f"친환경 자동차 비율 데이터 조회 실패: {e}")
-            # 데이터베이스에서 비율 데이터를 가져올 수 없는 경우 기본값 사용
-            yearly_data['eco_vehicle_ratio'] = [0] * len(yearly_data)
         
-        return yearly_data
+        if df.empty:
+            return None
+        
+        return df
         
     except Exception as e:
-        print(f"데이터베이스 연결 오류: {e}")
+        record_error("get_region_emission_data", e)
         return None 
\ No newline at end of file
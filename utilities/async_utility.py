@@ -0,0 +1,75 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+
+from database.database import POOL_MAX_SIZE
+from utilities.app_utility import get_vehicle_registration_data, get_environmental_impact_data, get_region_emission_data
+from utilities.money_utility import (
+    get_announcement_data, get_subsidy_data, get_subsidy_count, get_subsidy_page, get_top5_models,
+    get_announcement_years, get_region_utilization_data,
+)
+from utilities.faq_utility import get_faq_data, get_categories, get_faq_page
+
+# 조회 함수는 블로킹 DB 드라이버(pymysql/sqlite3)를 쓰므로 스레드에서 실행한다.
+# 동시에 실행되는 조회 수는 연결 풀 크기를 넘지 않게 맞춘다.
+_executor = ThreadPoolExecutor(max_workers=POOL_MAX_SIZE, thread_name_prefix="car-query")
+
+
+def to_async(func):
+    """동기 조회 함수를 await 할 수 있는 코루틴 함수로 감싼다"""
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        # 페이지 실행 단위 계측 기록(trace)이 이어지도록 컨텍스트를 복사해서 실행
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(_executor, partial(context.run, func, *args, **kwargs))
+    return wrapper
+
+
+async_get_vehicle_registration_data = to_async(get_vehicle_registration_data)
+async_get_environmental_impact_data = to_async(get_environmental_impact_data)
+async_get_region_emission_data = to_async(get_region_emission_data)
+async_get_announcement_data = to_async(get_announcement_data)
+async_get_announcement_years = to_async(get_announcement_years)
+async_get_region_utilization_data = to_async(get_region_utilization_data)
+async_get_subsidy_data = to_async(get_subsidy_data)
+async_get_subsidy_count = to_async(get_subsidy_count)
+async_get_subsidy_page = to_async(get_subsidy_page)
+async_get_top5_models = to_async(get_top5_models)
+async_get_faq_data = to_async(get_faq_data)
+async_get_categories = to_async(get_categories)
+async_get_faq_page = to_async(get_faq_page)
+
+
+async def gather_queries(queries):
+    """
+    {이름: (함수, 인자...)} 형태의 조회들을 동시에 실행하고 {이름: 결과} 로 반환
+    함수는 동기 함수여도 되고 코루틴 함수여도 된다.
+    """
+    names = list(queries)
+    coroutines = []
+    for name in names:
+        func, *args = queries[name]
+        if not asyncio.iscoroutinefunction(func):
+            func = to_async(func)
+        coroutines.append(func(*args))
+    results = await asyncio.gather(*coroutines)
+    return dict(zip(names, results))
+
+
+def load_concurrently(queries):
+    """
+    페이지 스크립트(동기 코드)에서 여러 조회를 한 번에 실행
+    페이지 지연 시간이 조회 시간의 합이 아니라 가장 느린 조회 시간이 된다.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(gather_queries(queries))
+    # 이미 이벤트 루프 안이면 스레드 풀에서 직접 기다린다
+    futures = {
+        name: _executor.submit(contextvars.copy_context().run, func, *args)
+        for name, (func, *args) in queries.items()
+    }
+    return {name: future.result() for name, future in futures.items()}
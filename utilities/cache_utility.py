@@ -0,0 +1,231 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from functools import wraps
+
+import pandas as pd
+
+from database.instrumentation import register_collector
+
+DEFAULT_TTL_SECONDS = 600   # 원본 테이블은 하루 한 번 정도만 바뀐다
+DEFAULT_MAX_ENTRIES = 256
+
+
+class ResultCache:
+    """
+    프로세스 전역 조회 결과 캐시
+    (함수명, 인자) 를 키로 TTL 과 LRU 크기 제한을 적용한다.
+    캐시된 DataFrame 은 모든 세션이 공유하는 읽기 전용 데이터이므로 호출하는 쪽에서 제자리 수정하면 안 된다.
+    화면용 가공은 assign()/열 선택처럼 새 객체를 만드는 방식으로 하고(Copy-on-Write 로 버퍼 공유),
+    갱신은 새 결과를 만든 뒤 항목을 통째로 바꿔 끼우므로 이미 꺼내 간 세션은 이전 결과를 그대로 본다.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # key -> (만료 시각, 값, 관련 테이블)
+        self._lock = threading.RLock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    def get(self, key):
+        """(찾음 여부, 값) 을 반환"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return False, None
+            expires_at, value, _ = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return True, value
+
+    def set(self, key, value, ttl=DEFAULT_TTL_SECONDS, tables=()):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value, frozenset(tables))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def extend(self, table, ttl=DEFAULT_TTL_SECONDS):
+        """table 을 읽는 (아직 만료되지 않은) 결과의 만료 시각을 지금부터 ttl 초 뒤로 늘리고 늘린 수를 반환"""
+        now = time.monotonic()
+        with self._lock:
+            extended = 0
+            for key, (expires_at, value, tables) in self._entries.items():
+                if table in tables and now <= expires_at < now + ttl:
+                    self._entries[key] = (now + ttl, value, tables)
+                    extended += 1
+            return extended
+
+    def invalidate(self, func_name=None, table=None):
+        """
+        캐시 무효화
+        func_name 이 주어지면 해당 함수의 결과만, table 이 주어지면 그 테이블을 읽는 결과만,
+        둘 다 없으면 전체를 비운다.
+        """
+        with self._lock:
+            if func_name is None and table is None:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                keys = [
+                    key for key, (_, _, tables) in self._entries.items()
+                    if (func_name is None or key[0] == func_name)
+                    and (table is None or table in tables)
+                ]
+                for key in keys:
+                    del self._entries[key]
+                removed = len(keys)
+            self._stats['invalidations'] += removed
+            return removed
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = sum(_value_bytes(value) for _, value, _ in self._entries.values())
+            stats['max_entries'] = self.max_entries
+            total = stats['hits'] + stats['misses']
+            stats['hit_ratio'] = stats['hits'] / total if total else 0.0
+        return stats
+
+
+def enable_copy_on_write():
+    """
+    pandas Copy-on-Write 켜기 (pandas 3 부터는 항상 켜져 있어 아무것도 하지 않음)
+    캐시된 DataFrame 에서 열 선택/assign 으로 만든 결과가 원본 버퍼를 복사하지 않고 공유하게 된다.
+    프로세스 전역 옵션이므로 import 할 때 바꾸지 않고 앱 진입점(페이지 스크립트)에서 호출한다.
+    """
+    if int(pd.__version__.split('.')[0]) < 3:
+        pd.set_option("mode.copy_on_write", True)
+
+
+def _value_bytes(value):
+    """캐시 값이 차지하는 대략적인 메모리 (DataFrame/Series 와 그 묶음만 셈)"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True))
+    if isinstance(value, (tuple, list)):
+        return sum(_value_bytes(item) for item in value)
+    return 0
+
+
+_cache = ResultCache()
+_table_versions = defaultdict(int)   # 테이블 -> 데이터 버전 (바뀔 때마다 1 증가)
+_table_versions_lock = threading.Lock()
+
+
+def get_cache():
+    return _cache
+
+
+def table_version(table):
+    return _table_versions.get(table, 0)
+
+
+def bump_table_version(table):
+    """테이블 데이터 버전을 올린다 (이 테이블을 읽는 캐시 결과의 키가 바뀐다)"""
+    with _table_versions_lock:
+        _table_versions[table] += 1
+        return _table_versions[table]
+
+
+def get_table_versions():
+    with _table_versions_lock:
+        return dict(_table_versions)
+
+
+def _make_key(func_name, args, kwargs):
+    key = (func_name, args, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+    except TypeError:
+        key = (func_name, repr(args), repr(sorted(kwargs.items())))
+    return key
+
+
+def cached(ttl=DEFAULT_TTL_SECONDS, tables=()):
+    """
+    조회 함수 결과를 공유 캐시에 저장하는 데코레이터
+    tables 에는 함수가 읽는 테이블을 적어 두어 invalidate_table() 로 무효화할 수 있게 한다.
+    캐시 키에는 tables 의 데이터 버전이 들어가므로, 조회 도중 테이블이 바뀌면 그 결과는
+    이전 버전 키에 저장되어 바뀐 뒤의 호출에 쓰이지 않는다.
+    DB 오류 등으로 None 이 반환되면 캐시하지 않는다.
+    """
+    def decorator(func):
+        func_name = f"{func.__module__}.{func.__name__}"
+
+        def _key(args, kwargs):
+            return _make_key(func_name, args, kwargs) + (tuple(_table_versions.get(table, 0) for table in tables),)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = _key(args, kwargs)
+            found, value = _cache.get(key)
+            if found:
+                return value
+            value = func(*args, **kwargs)
+            if value is not None:
+                _cache.set(key, value, ttl=ttl, tables=tables)
+            return value
+
+        def refresh(*args, **kwargs):
+            """캐시를 거치지 않고 다시 조회해서 결과를 갱신 (만료 전 미리 채우기용)"""
+            key = _key(args, kwargs)
+            value = func(*args, **kwargs)
+            if value is not None:
+                _cache.set(key, value, ttl=ttl, tables=tables)
+            return value
+
+        def store(value, *args, **kwargs):
+            """직접 만든 결과를 현재 데이터 버전의 캐시 값으로 저장 (증분 갱신용)"""
+            _cache.set(_key(args, kwargs), value, ttl=ttl, tables=tables)
+            return value
+
+        wrapper.cache_name = func_name
+        wrapper.tables = tuple(tables)
+        wrapper.invalidate = lambda: _cache.invalidate(func_name=func_name)
+        wrapper.refresh = refresh
+        wrapper.store = store
+        wrapper.uncached = func
+        return wrapper
+    return decorator
+
+
+def invalidate_table(table):
+    """테이블 데이터가 바뀌었을 때 데이터 버전을 올리고 그 테이블을 읽는 캐시 결과를 모두 제거"""
+    bump_table_version(table)
+    return _cache.invalidate(table=table)
+
+
+def extend_table(table, ttl=DEFAULT_TTL_SECONDS):
+    """테이블 데이터가 그대로일 때 그 테이블을 읽는 캐시 결과를 다시 조회하지 않고 만료만 늦춘다 (워밍업용)"""
+    return _cache.extend(table, ttl)
+
+
+def clear_cache():
+    return _cache.invalidate()
+
+
+def get_cache_stats():
+    """캐시 적중/실패 횟수 등 지표 반환"""
+    return _cache.stats()
+
+
+def _collect_cache_metrics():
+    stats = get_cache_stats()
+    metrics = [(f"car_cache_{key}", "gauge", f"결과 캐시 {key}", [({}, value)]) for key, value in stats.items()]
+    versions = get_table_versions()
+    if versions:
+        metrics.append(("car_table_version", "gauge", "테이블 데이터 버전",
+                        [({'table': table}, version) for table, version in sorted(versions.items())]))
+    return metrics
+
+
+register_collector(_collect_cache_metrics)
@@ -0,0 +1,149 @@
+"""
+변경 데이터 증분 반영
+
+database/changes.py 의 change_log 를 주기적으로 읽어서 바뀐 부분만 반영한다 (전체 재조회 없음).
+
+    electronic_car / hydrogen_car   바뀐 연도만 요약 테이블을 다시 집계 → 공고 현황 큐브와 파생 결과 재계산
+    greenhouse_gases                바뀐 연도만 지역별 배출량 요약 테이블을 다시 집계 → 메인페이지 배출량 결과 재계산
+    environmental_vehicles          테이블 데이터 버전을 올려 메인페이지 등록 현황/환경 영향 결과를 다음 조회 때 다시 만듦
+    money_*                         테이블 데이터 버전을 올려 행 수/페이지/TOP-K 색인을 다음 조회 때 다시 만듦 (is_total 은 트리거가 맞춤)
+    faq                             바뀐 id 의 행만 읽어 공유 FAQ 데이터와 검색 색인에 반영
+
+반영할 때마다 테이블 데이터 버전(cache_utility.table_version)이 올라가고 결과 캐시 키가 그 버전을 포함한다.
+
+    python -m utilities.change_utility   # change_log 에 남아 있는 변경을 처음부터 한 번 반영
+"""
+import os
+import sys
+import threading
+import time
+
+from database.changes import latest_seq, read_changes, prune_change_log
+from database.instrumentation import log_event, record_error
+from database.migrations import MONEY_TABLES
+from database.rollup import ANNOUNCEMENT_SOURCES, GREENHOUSE_SOURCE, ensure_rollups, refresh_rollup_years
+from utilities.cache_utility import invalidate_table
+from utilities.faq_utility import apply_faq_changes
+
+CHANGE_POLL_ENABLED = os.environ.get("CAR_CHANGE_POLL", "1") != "0"
+CHANGE_POLL_INTERVAL_SECONDS = float(os.environ.get("CAR_CHANGE_POLL_INTERVAL", "30"))
+
+_last_seq = None
+_apply_lock = threading.Lock()
+_thread = None
+_thread_lock = threading.Lock()
+_stop = threading.Event()
+_poll_ok = False   # 마지막 변경 반영이 성공했는지
+
+
+def apply_changes(changes):
+    """
+    {테이블: 바뀐 행 키 집합} 을 캐시/요약 테이블/검색 색인에 반영
+    반환값: {테이블: 반영 내용 설명}
+    """
+    summary = {}
+    sources = {
+        table: keys for table, keys in changes.items()
+        if table in ANNOUNCEMENT_SOURCES or table == GREENHOUSE_SOURCE
+    }
+    if sources:
+        ensure_rollups()
+        refreshed = refresh_rollup_years(sources)
+        for table in sources:
+            invalidate_table(table)
+            summary[table] = f"{len(refreshed.get(table, []))}개 연도 재집계"
+
+    if 'environmental_vehicles' in changes:
+        invalidate_table('environmental_vehicles')
+        summary['environmental_vehicles'] = f"{len(changes['environmental_vehicles'])}개 연도 변경, 버전 증가"
+
+    for table in MONEY_TABLES:
+        if table in changes:
+            invalidate_table(table)
+            summary[table] = f"지역 {len(changes[table])}곳 변경, 버전 증가"
+
+    if 'faq' in changes:
+        updated, removed = apply_faq_changes(changes['faq'])
+        summary['faq'] = f"{updated}행 갱신/추가, {removed}행 삭제"
+    return summary
+
+
+def poll_changes(from_start=False):
+    """
+    마지막으로 읽은 이후의 변경을 모두 읽어 반영하고 {테이블: 반영 내용} 을 반환
+    처음 호출하면 현재 위치만 기록한다 (그 전에 읽은 데이터는 이미 최신이므로).
+    from_start 가 True 면 change_log 의 처음부터 반영한다.
+    """
+    global _last_seq
+    with _apply_lock:
+        if _last_seq is None:
+            if not from_start:
+                _last_seq = latest_seq()
+                return {}
+            _last_seq = 0
+
+        summary = {}
+        while True:
+            last_seq, changes = read_changes(_last_seq)
+            if not changes:
+                break
+            summary.update(apply_changes(changes))
+            _last_seq = last_seq
+        return summary
+
+
+def get_last_seq():
+    return _last_seq
+
+
+def is_change_polling():
+    """변경 반영 스레드가 돌고 있고 마지막 반영이 성공했는지 (그렇다면 테이블 데이터 버전이 원본 변경을 따라간다)"""
+    return _poll_ok and _thread is not None and _thread.is_alive()
+
+
+def _poll_loop(interval):
+    global _poll_ok
+    while not _stop.wait(interval):
+        try:
+            summary = poll_changes()
+        except Exception as e:
+            _poll_ok = False
+            record_error("poll_changes", e)
+            continue
+        _poll_ok = True
+        if summary:
+            log_event('changes_applied', last_seq=_last_seq, tables=summary)
+
+
+def start_change_polling(interval=CHANGE_POLL_INTERVAL_SECONDS):
+    """
+    현재 변경 위치를 기록하고 interval 초마다 변경을 반영하는 스레드를 시작 (프로세스당 한 번)
+    페이지가 데이터를 읽기 전에 호출해야 그 사이의 변경을 놓치지 않는다. CAR_CHANGE_POLL=0 이면 실행하지 않는다.
+    """
+    global _thread, _poll_ok
+    if not CHANGE_POLL_ENABLED:
+        return None
+    with _thread_lock:
+        if _thread is None:
+            try:
+                poll_changes()
+                _poll_ok = True
+            except Exception as e:
+                record_error("start_change_polling", e)
+            _thread = threading.Thread(target=_poll_loop, args=(interval,), name="car-changes", daemon=True)
+            _thread.start()
+    return _thread
+
+
+def stop_change_polling():
+    _stop.set()
+
+
+if __name__ == "__main__":
+    started = time.perf_counter()
+    result = poll_changes(from_start=True)
+    for table, description in result.items():
+        print(f"  {table}: {description}")
+    print(f"변경 반영 완료: 순번 {get_last_seq()}까지 ({time.perf_counter() - started:.2f}초)")
+    if "--prune" in sys.argv[1:]:
+        print(f"change_log {prune_change_log(get_last_seq())}행 삭제")
@@ -0,0 +1,59 @@
+"""
+페이지 디버그 패널
+
+페이지 맨 앞에서 start_page_trace() 로 이번 실행의 계측 기록을 시작하고,
+맨 끝에서 render_debug_panel() 로 가장 느린 함수 호출과 쿼리를 보여준다.
+CAR_DEBUG_PANEL=1 이거나 주소에 ?debug=1 을 붙였을 때만 표시한다.
+"""
+import os
+
+import pandas as pd
+
+from database.instrumentation import start_trace, start_metrics_server
+
+DEBUG_PANEL = os.environ.get("CAR_DEBUG_PANEL", "0") == "1"
+SLOWEST_LIMIT = 10
+
+
+def start_page_trace():
+    """이번 페이지 실행의 기록 시작 (CAR_METRICS_PORT 가 있으면 /metrics 엔드포인트도 한 번 띄움)"""
+    start_metrics_server()
+    return start_trace()
+
+
+def slowest(records, kind, limit=SLOWEST_LIMIT):
+    """기록 중 kind('call'/'query') 인 것을 느린 순으로 limit 개"""
+    rows = [record for record in records if record.get('kind') == kind]
+    if not rows:
+        return pd.DataFrame()
+    df = pd.DataFrame(rows).drop(columns=['kind'])
+    return df.sort_values('seconds', ascending=False).head(limit).reset_index(drop=True)
+
+
+def render_debug_panel(records):
+    import streamlit as st
+
+    if not (DEBUG_PANEL or st.query_params.get("debug") == "1"):
+        return
+
+    with st.expander("🛠 디버그: 이번 실행에서 느린 호출", expanded=False):
+        calls = slowest(records, 'call')
+        queries = slowest(records, 'query')
+        acquire = [record['seconds'] for record in records if record.get('kind') == 'acquire']
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("함수 호출", f"{sum(1 for r in records if r.get('kind') == 'call')}회")
+        col2.metric("쿼리", f"{sum(1 for r in records if r.get('kind') == 'query')}회")
+        col3.metric("연결 대여", f"{len(acquire)}회 / {sum(acquire) * 1000:.1f}ms")
+
+        st.markdown("**느린 함수 호출** (pandas = 전체 - DB - 연결 대여)")
+        if calls.empty:
+            st.caption("기록 없음")
+        else:
+            st.dataframe(calls, use_container_width=True)
+
+        st.markdown("**느린 쿼리**")
+        if queries.empty:
+            st.caption("이번 실행에서 실행된 쿼리 없음")
+        else:
+            st.dataframe(queries, use_container_width=True)
@@ -1,43 +1,58 @@
-from database.database import connect_db
+import threading
+from database.database import get_connection
+from database.frames import read_frame
+from database.instrumentation import instrumented, record_error
+from utilities.cache_utility import cached, invalidate_table
+from utilities.search_utility import build_index
 import pandas as pd
 
-def get_con():
-    con = connect_db()
-    cursor = con.cursor()
-    cursor.execute("SELECT * FROM faq")
-    categories = cursor.fetchall()
-    return categories
+SEARCH_PLACEHOLDER = "궁금한 점을 검색해 보세요."
 
+@instrumented
+@cached(tables=('faq',))
 def get_faq_data():
-    """FAQ 데이터를 가져와서 DataFrame으로 반환"""
-    con = connect_db()
-    cursor = con.cursor()
-    cursor.execute("SELECT * FROM faq")
-    data = cursor.fetchall()
-    
-    # 컬럼명 가져오기
-    columns = [desc[0] for desc in cursor.description]
-    
-    # DataFrame 생성
-    df = pd.DataFrame(data, columns=columns)
-    cursor.close()
-    con.close()
+    """FAQ 데이터를 가져와서 DataFrame으로 반환 (id 순)"""
+    with get_connection() as con:
+        cursor = con.cursor()
+        cursor.execute("SELECT * FROM faq ORDER BY id")
+        
+        # DataFrame 생성 (category 는 범주형, id 는 정수형)
+        df = read_frame(cursor)
+        cursor.close()
     
     return df
 
+@instrumented
+@cached(tables=('faq',))
+def get_faq_count(category="전체"):
+    """카테고리의 FAQ 건수 (페이지 수 계산용, faq 데이터 버전마다 한 번 조회)"""
+    where, params = _category_filter(category)
+    with get_connection() as con:
+        cursor = con.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM faq{where}", params)
+        total = cursor.fetchone()[0]
+        cursor.close()
+    return total
+
+def _category_filter(category):
+    if category == "전체":
+        return "", []
+    return " WHERE category = %s", [category]
+
+@instrumented
+@cached(tables=('faq',))
 def get_categories():
     """데이터베이스에서 실제 카테고리 목록을 가져와서 반환"""
     try:
-        con = connect_db()
-        cursor = con.cursor()
-        
-        # 실제 카테고리 가져오기
-        cursor.execute("SELECT DISTINCT category FROM faq WHERE category IS NOT NULL AND category != ''")
-        categories = cursor.fetchall()
-        category_list = [cat[0] for cat in categories if cat[0]]
-        
-        cursor.close()
-        con.close()
+        with get_connection() as con:
+            cursor = con.cursor()
+            
+            # 실제 카테고리 가져오기
+            cursor.execute("SELECT DISTINCT category FROM faq WHERE category IS NOT NULL AND category != ''")
+            categories = cursor.fetchall()
+            category_list = [cat[0] for cat in categories if cat[0]]
+            
+            cursor.close()
         
         # "전체" 카테고리를 맨 앞에 추가
         if "전체" not in category_list:
@@ -46,7 +61,7 @@ def get_categories():
         return category_list
         
     except Exception as e:
-        print(f"카테고리 조회 실패: {e}")
+        record_error("get_categories", e)
         # 오류 시 기본 카테고리 반환
         return ["전체", "차량 구매", "차량 정비", "기아멤버스", "홈페이지", "PBV", "기타"]
 
@@ -62,24 +77,116 @@ def filter_faq_by_category(df, category):
             # 카테고리 컬럼이 없으면 전체 반환
             return df
 
-def search_faq(df, search_term):
-    """검색어로 FAQ 필터링"""
-    if not search_term or search_term == "궁금한 점을 검색해 보세요.":
-        return df
+_faq_index = None
+_faq_index_source = None
+_faq_index_lock = threading.Lock()
+@instrumented
+def get_faq_search_index():
+    """
+    FAQ 검색 색인을 반환
+    get_faq_data() 결과가 바뀌었을 때만(캐시 만료/무효화) 다시 만든다.
+    """
+    global _faq_index, _faq_index_source
+    df = get_faq_data()
+    if _faq_index is None or _faq_index_source is not df:
+        with _faq_index_lock:
+            if _faq_index is None or _faq_index_source is not df:
+                _faq_index = build_index(df, group_col='category')
+                _faq_index_source = df
+    return _faq_index
+
+@instrumented
+def apply_faq_changes(ids, question_col="question", answer_col="answer"):
+    """
+    바뀐 FAQ id 의 행만 다시 읽어 공유 FAQ 데이터와 검색 색인에 반영
+    기존 행은 인덱스(= 검색 색인 문서 id)를 그대로 쓰고 새 행은 뒤에 붙이며,
+    다시 읽었을 때 없는 id 는 삭제된 것으로 본다. 새 DataFrame 을 만들어 캐시 값을 통째로 바꾼다.
+    반환값: (갱신/추가된 행 수, 삭제된 행 수)
+    """
+    global _faq_index_source
+    ids = [faq_id for faq_id in ids if faq_id is not None]
+    if not ids:
+        return 0, 0
     
-    # question과 answer 컬럼에서 검색
-    search_columns = []
-    for col in df.columns:
-        if col in ['question', 'answer']:
-            search_columns.append(col)
+    df = get_faq_data()
+    with get_connection() as con:
+        cursor = con.cursor()
+        cursor.execute(f"SELECT * FROM faq WHERE id IN ({', '.join(['%s'] * len(ids))})", ids)
+        changed = read_frame(cursor)
+        cursor.close()
     
-    if search_columns:
-        mask = df[search_columns].astype(str).apply(lambda x: x.str.contains(search_term, case=False, na=False)).any(axis=1)
-        return df[mask]
-    else:
-        # 모든 컬럼에서 검색
-        mask = df.astype(str).apply(lambda x: x.str.contains(search_term, case=False, na=False)).any(axis=1)
-        return df[mask]
-
+    # 바뀐 id 의 기존 인덱스를 다시 쓰고, 처음 보는 id 는 새 인덱스를 받는다
+    touched = df['id'].isin(ids).to_numpy()
+    free_labels = {}
+    for faq_id, label in zip(df['id'][touched], df.index[touched]):
+        free_labels.setdefault(faq_id, []).append(label)
+    next_label = int(df.index.max()) + 1 if len(df) else 0
+    labels = []
+    for faq_id in changed['id']:
+        if free_labels.get(faq_id):
+            labels.append(free_labels[faq_id].pop(0))
+        else:
+            labels.append(next_label)
+            next_label += 1
+    changed.index = pd.Index(labels, dtype=df.index.dtype)
+    removed = [label for remaining in free_labels.values() for label in remaining]
+    
+    updated = pd.concat([df[~touched], changed]).sort_values('id', kind='stable')
+    for column in df.select_dtypes('category').columns:
+        updated[column] = updated[column].astype('category')
+    
+    with _faq_index_lock:
+        if _faq_index is not None and _faq_index_source is df:
+            for label in removed:
+                _faq_index.remove(label)
+            questions = changed[question_col] if question_col in changed.columns else [""] * len(changed)
+            answers = changed[answer_col] if answer_col in changed.columns else [""] * len(changed)
+            categories = changed['category'].tolist() if 'category' in changed.columns else [None] * len(changed)
+            for label, question, answer, category in zip(changed.index, questions, answers, categories):
+                _faq_index.add(label, "" if question is None else question, "" if answer is None else answer, category)
+            _faq_index_source = updated
+        # faq 데이터 버전을 올려 카테고리/페이지 캐시를 버리고, 새 데이터를 현재 버전으로 저장
+        invalidate_table('faq')
+        get_faq_data.store(updated)
+    return len(changed), len(removed)
 
+@instrumented
+def search_faq(df, search_term):
+    """검색어로 FAQ 필터링 (색인 검색, 관련도 순으로 정렬)"""
+    if not search_term or search_term == SEARCH_PLACEHOLDER:
+        return df
+    
+    # df 는 get_faq_data() 결과(또는 그 부분집합)이므로 인덱스가 색인의 문서 id 와 같다
+    ranked_ids = get_faq_search_index().search(search_term)
+    ranked_ids = [doc_id for doc_id in ranked_ids if doc_id in df.index]
+    return df.loc[ranked_ids]
 
+@instrumented
+def get_faq_page(category="전체", search_term=None, page=1, per_page=5):
+    """
+    한 페이지 분량의 FAQ 와 조건에 맞는 전체 건수를 (DataFrame, total) 로 반환
+    검색어가 없으면 DB 에서 id 순으로 해당 페이지 행만 LIMIT/OFFSET 으로 가져오고 (건수는 get_faq_count 캐시),
+    검색어가 있으면 공유 검색 색인에서 카테고리로 거른 관련도 순 결과의 해당 페이지만 받는다.
+    페이지 결과는 캐시하지 않는다. per_page 가 None 이면 조건에 맞는 전체를 반환한다.
+    """
+    offset = (max(page, 1) - 1) * per_page if per_page else 0
+    
+    if search_term and search_term != SEARCH_PLACEHOLDER:
+        # 색인이 카테고리 필터와 페이지 자르기까지 하고, 공유 FAQ 데이터에서는 그 페이지의 행만 꺼낸다
+        df = get_faq_data()
+        group = None if category == "전체" else category
+        ids, total = get_faq_search_index().search_page(search_term, offset, per_page or None, group)
+        return df.loc[ids], total
+    
+    # (category, id) 인덱스 순서로 읽으므로 표시할 행만 읽는다
+    where, params = _category_filter(category)
+    query = f"SELECT * FROM faq{where} ORDER BY id"
+    if per_page:
+        query += " LIMIT %s OFFSET %s"
+        params = params + [per_page, offset]
+    with get_connection() as con:
+        cursor = con.cursor()
+        cursor.execute(query, params)
+        df = read_frame(cursor)
+        cursor.close()
+    return df, get_faq_count(category)
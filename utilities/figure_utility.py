@@ -0,0 +1,327 @@
+"""
+Plotly 그래프 생성 + 메모이제이션
+
+그래프는 (그래프 이름, 데이터 버전, 옵션) 을 키로 한 번만 만들어 보관한다.
+데이터 버전은 DataFrame 내용의 해시라서 캐시가 같은 내용으로 다시 채워져도(워밍업 갱신 등)
+그래프는 그대로 재사용되고, 내용이 바뀌면 자동으로 새로 만든다.
+같은 화면을 다시 그릴 때는 pandas 가공과 trace/레이아웃 생성(Figure 검증 포함)을 건너뛴다.
+JSON 직렬화는 st.plotly_chart 가 실행마다 하므로 여기서 줄이지 않는다.
+캐시된 Figure 는 모든 세션이 공유하므로 호출하는 쪽에서 수정하면 안 된다.
+"""
+import hashlib
+import threading
+import weakref
+from functools import wraps
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from utilities.cache_utility import ResultCache
+
+FIGURE_CACHE_ENTRIES = 128
+FIGURE_TTL_SECONDS = 24 * 60 * 60   # 키에 데이터 버전이 들어가므로 오래 둬도 낡은 그래프가 나오지 않는다
+
+_figures = ResultCache(max_entries=FIGURE_CACHE_ENTRIES)
+_versions = {}   # id(df) -> (weakref, 버전)
+_versions_lock = threading.Lock()
+
+
+def data_version(df):
+    """
+    DataFrame 내용 해시 (같은 객체는 한 번만 계산)
+    해시할 수 없는 값이 있으면 None 을 반환하고, 그 경우 그래프를 캐시하지 않는다.
+    """
+    key = id(df)
+    entry = _versions.get(key)
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+    try:
+        hashed = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    except TypeError:
+        return None
+    digest = hashlib.blake2b(hashed.tobytes(), digest_size=16)
+    digest.update(repr(list(df.columns)).encode("utf-8"))
+    version = digest.hexdigest()
+    with _versions_lock:
+        _versions[key] = (weakref.ref(df, lambda _, key=key: _versions.pop(key, None)), version)
+    return version
+
+
+def figure_builder(func):
+    """
+    func(df, *options) -> go.Figure 를 메모이즈하는 데코레이터
+    wrapper(df, *options) 는 캐시된 Figure 를 반환한다.
+    """
+    name = func.__name__
+
+    @wraps(func)
+    def wrapper(df, *options):
+        version = data_version(df)
+        if version is None:
+            return func(df, *options)
+        key = (name, version, options)
+        found, figure = _figures.get(key)
+        if not found:
+            figure = func(df, *options)
+            _figures.set(key, figure, ttl=FIGURE_TTL_SECONDS)
+        return figure
+
+    return wrapper
+
+
+def get_figure_cache_stats():
+    return _figures.stats()
+
+
+# ------------------------- 메인페이지 ---------------------------------------------------
+
+HIGHLIGHT_COLUMNS = {
+    "전기차": ('electric_vehicles', 'electric_ratio'),
+    "수소차": ('hydrogen_vehicles', 'hydrogen_ratio'),
+    "하이브리드": ('hybrid_vehicles', 'hybrid_ratio'),
+}
+HIGHLIGHT_COLORS = {
+    "전기차": "#0096c7",
+    "수소차": "#00b4d8",
+    "하이브리드": "#ade8f4",
+}
+# 차종별 Y축 범위
+HIGHLIGHT_Y_MAX = {
+    "전기차": 40,
+    "수소차": 5,
+    "하이브리드": 100,
+}
+
+
+@figure_builder
+def registration_overview_figure(vehicle_data):
+    """연도별 자동차 등록 현황 - 전체 (이중 축: 전체 등록대수 선 + 친환경차 스택 막대)"""
+    fig = make_subplots(
+        specs=[[{"secondary_y": True}]]
+    )
+
+    # 첫 번째 그래프: 전체 자동차 등록대수 (선그래프)
+    fig.add_trace(
+        go.Scatter(
+            x=vehicle_data['year'],
+            y=vehicle_data['total_vehicles'],
+            name="전체 자동차 등록대수",
+            line=dict(color="#ffafcc", width=3),
+            mode='lines+markers'
+        ),
+        secondary_y=False
+    )
+
+    # 두 번째 그래프: 친환경 자동차 등록대수 (스택형 막대그래프)
+    for label, (count_col, ratio_col) in HIGHLIGHT_COLUMNS.items():
+        fig.add_trace(
+            go.Bar(
+                x=vehicle_data['year'],
+                y=vehicle_data[count_col],
+                name=label,
+                marker_color=HIGHLIGHT_COLORS[label],
+                marker_opacity=1.0,
+                hovertemplate=f'{label}: %{{y:,.0f}}대<br>비율: %{{customdata:.1f}}%<extra></extra>',
+                customdata=vehicle_data[ratio_col]
+            ),
+            secondary_y=True
+        )
+
+    fig.update_layout(
+        title="연도별 자동차 등록 현황 - 전체",
+        xaxis_title="연도",
+        barmode='stack',
+        height=600
+    )
+
+    # Y축 눈금 개수를 동일하게 설정 (5개 간격)
+    fig.update_yaxes(
+        title_text="전체 자동차 등록대수",
+        secondary_y=False,
+        range=[20000000, 27000000],
+        dtick=1750000  # (27000000-20000000)/4 = 1750000
+    )
+    fig.update_yaxes(
+        title_text="친환경 자동차 등록대수",
+        secondary_y=True,
+        range=[0, 4000000],
+        dtick=1000000  # (4000000-0)/4 = 1000000
+    )
+    return fig
+
+
+@figure_builder
+def registration_detail_figure(vehicle_data, highlight_option):
+    """선택된 차종의 연도별 비율 변화 막대그래프"""
+    _, ratio_col = HIGHLIGHT_COLUMNS[highlight_option]
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=vehicle_data['year'],
+        y=vehicle_data[ratio_col],  # 등록대수 대신 비율 사용
+        name=highlight_option,
+        marker_color=HIGHLIGHT_COLORS.get(highlight_option),
+        hovertemplate=f'{highlight_option} 비율: %{{y:.1f}}%<extra></extra>'
+    ))
+
+    fig.update_layout(
+        title=f"{highlight_option} 연도별 비율 변화",
+        xaxis_title="연도",
+        yaxis_title=f"{highlight_option} 비율 (%)",
+        height=400,
+        yaxis=dict(range=[0, HIGHLIGHT_Y_MAX[highlight_option]])  # 차종별로 다른 Y축 범위 설정
+    )
+    return fig
+
+
+@figure_builder
+def environment_figure(env_data):
+    """연도별 환경 영향 분석 (이중 축: 온실가스 배출량 선 + 친환경차 비율 막대)"""
+    fig = make_subplots(
+        specs=[[{"secondary_y": True}]]
+    )
+
+    # 첫 번째 그래프: 온실가스 배출량 (선그래프)
+    fig.add_trace(
+        go.Scatter(
+            x=env_data['year'],
+            y=env_data['greenhouse_gas'],
+            name="온실가스 배출량",
+            line=dict(color='#8a9a5b', width=3),
+            mode='lines+markers'
+        ),
+        secondary_y=True
+    )
+
+    # 두 번째 그래프: 친환경 자동차 비율 (막대그래프)
+    fig.add_trace(
+        go.Bar(
+            x=env_data['year'],
+            y=env_data['eco_vehicle_ratio'],
+            name="친환경 자동차 비율",
+            marker_color='#a4de02',
+            hovertemplate='친환경차 비율: %{y:.1f}%<extra></extra>'
+        ),
+        secondary_y=False
+    )
+
+    fig.update_layout(
+        title="연도별 환경 영향 분석",
+        xaxis_title="연도",
+        height=500
+    )
+
+    # x축을 1년 단위로 설정
+    fig.update_xaxes(
+        dtick=1,  # 1년 단위로 눈금 표시
+        tickmode='linear'
+    )
+
+    fig.update_yaxes(
+        title_text="친환경 자동차 비율 (%)",
+        secondary_y=False,
+        range=[0, 20],
+        dtick=5  # (20-0)/4 = 5
+    )
+    fig.update_yaxes(
+        title_text="온실가스 배출량",
+        secondary_y=True,
+        range=[70000, 90000],
+        dtick=5000  # (90000-70000)/4 = 5000
+    )
+    return fig
+
+
+@figure_builder
+def region_emission_figure(region_gas_data, year):
+    """지역별 총 온실가스 배출량 막대그래프"""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=region_gas_data['region'],
+        y=region_gas_data['total_gas'],
+        name='총 온실가스 배출량',
+        marker_color='#8a9a5b',
+        hovertemplate='지역: %{x}<br>배출량: %{y:,}<extra></extra>'
+    ))
+
+    fig.update_layout(
+        title=f"{year}년 지역별 온실가스 배출량",
+        xaxis_title="지역",
+        yaxis_title="온실가스 배출량",
+        height=400
+    )
+    return fig
+
+
+# ------------------------- 보조금 정보 페이지 ---------------------------------------------------
+
+@figure_builder
+def announcement_figure(announcement_data):
+    """연도별 민간공고 현황 스택형 막대그래프 (출고대수 + 출고잔여대수)"""
+    fig = go.Figure()
+
+    # 출고대수 (실제 출고된 수량)
+    fig.add_trace(go.Bar(
+        x=announcement_data['year'],
+        y=announcement_data['released_count'],
+        name='출고대수',
+        marker_color='#add8e6',
+        hovertemplate='출고대수: %{y:,}대<br>비율: %{customdata:.1f}%<extra></extra>',
+        customdata=announcement_data['released_ratio']
+    ))
+
+    # 출고잔여대수 (출고되지 않은 잔여 수량)
+    fig.add_trace(go.Bar(
+        x=announcement_data['year'],
+        y=announcement_data['remaining_count'],
+        name='출고잔여대수',
+        marker_color='#f9c5d1',
+        hovertemplate='잔여대수: %{y:,}대<br>비율: %{customdata:.1f}%<extra></extra>',
+        customdata=announcement_data['remaining_ratio']
+    ))
+
+    fig.update_layout(
+        title="연도별 민간공고 현황",
+        xaxis_title="연도",
+        yaxis_title="대수",
+        barmode='stack',
+        height=500
+    )
+    return fig
+
+
+@figure_builder
+def utilization_map_figure(region_summary, geo_map):
+    """
+    지역별 정책활용도(%) choropleth
+    region_summary 에는 geo_map.match() 로 붙인 '지도매칭명' 컬럼이 있어야 한다.
+    geo_map 은 프로세스당 하나라서 옵션 키로 써도 캐시가 늘어나지 않는다.
+    """
+    fig = px.choropleth(
+        region_summary,
+        geojson=geo_map.geojson,
+        locations="지도매칭명",
+        color="정책활용도(%)",
+        hover_data={
+            "region": True,
+            "announced_count": ":,",
+            "remaining_count": ":,",
+            "정책활용도(%)": ":.1f",
+            "지도매칭명": False
+        },
+        labels={
+            "region": "지역",
+            "announced_count": "민간공고대수",
+            "remaining_count": "출고잔여대수",
+            "정책활용도(%)": "정책활용도(%)"
+        }
+    )
+    fig.update_coloraxes(cmin=0, cmax=100)
+    fig.update_geos(fitbounds="locations", visible=False)
+    fig.update_layout(
+        height=1000,
+        margin=dict(l=0, r=0, t=10, b=0),
+        coloraxis_colorbar=dict(title="정책활용도(%)")
+    )
+    return fig
@@ -0,0 +1,201 @@
+"""
+지역별 정책 활용 현황 지도용 GeoJSON 서비스
+
+시도 경계 GeoJSON 은 크고 바뀌지 않으므로 프로세스당 한 번만 읽어서
+좌표를 격자에 맞춰 반올림(양자화)하고 Douglas-Peucker 로 단순화한 뒤 메모리에 둔다.
+지역명 키 감지와 '지역명 -> 지도 feature id' 색인도 그때 한 번만 만들고,
+페이지에서는 match() 로 매칭 컬럼만 붙여서 바로 그린다.
+"""
+import json
+import os
+import threading
+
+import numpy as np
+
+GEOJSON_PATH = os.environ.get("CAR_GEOJSON_PATH", "./skorea-provinces-geo.json")
+NAME_KEYS = ["CTP_KOR_NM", "CTP_ENG_NM", "NAME_1", "name", "name_eng"]
+SIMPLIFY_TOLERANCE = 0.002   # 도 단위 (약 200m), 시도 단위 지도에서는 차이가 보이지 않는다
+QUANTIZE_DIGITS = 3          # 소수점 셋째 자리 (약 100m 격자)
+
+# --- 지역명 매핑 테이블 ---
+KOR_TO_ENG = {
+    "서울": "Seoul", "부산": "Busan", "대구": "Daegu", "인천": "Incheon",
+    "광주": "Gwangju", "대전": "Daejeon", "울산": "Ulsan", "세종": "Sejong",
+    "경기": "Gyeonggi-do", "강원": "Gangwon-do",
+    "충북": "Chungcheongbuk-do", "충남": "Chungcheongnam-do",
+    "전북": "Jeollabuk-do", "전남": "Jeollanam-do",
+    "경북": "Gyeongsangbuk-do", "경남": "Gyeongsangnam-do",
+    "제주": "Jeju",
+}
+ENG_TO_KOR = {eng.lower(): kor for kor, eng in KOR_TO_ENG.items()}
+
+_geo_map = None
+_geo_map_lock = threading.Lock()
+
+
+def detect_featureid_key(geo):
+    """GeoJSON 의 지역명 속성 키 자동 감지 (예: 'properties.CTP_KOR_NM')"""
+    if not geo or "features" not in geo or not geo["features"]:
+        return None
+    props = geo["features"][0].get("properties", {})
+    for k in NAME_KEYS:
+        if k in props:
+            return f"properties.{k}"
+    return f"properties.{list(props.keys())[0]}" if props else None
+
+
+def short_region_name(name):
+    """'서울특별시' -> '서울', '충청북도' -> '충북', 'Gyeonggi-do' -> '경기' (DB 의 지역 표기로 맞춤)"""
+    name = str(name).strip()
+    if name.lower() in ENG_TO_KOR:
+        return ENG_TO_KOR[name.lower()]
+    if len(name) == 4 and name.endswith("도"):
+        return name[0] + name[2]
+    return name[:2]
+
+
+def _douglas_peucker(points, tolerance):
+    """꺾은선 단순화 (양 끝점은 유지)"""
+    n = len(points)
+    if n < 3:
+        return points
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end <= start + 1:
+            continue
+        segment = points[end] - points[start]
+        relative = points[start + 1:end] - points[start]
+        length = np.hypot(segment[0], segment[1])
+        if length == 0:
+            distance = np.hypot(relative[:, 0], relative[:, 1])
+        else:
+            distance = np.abs(segment[0] * relative[:, 1] - segment[1] * relative[:, 0]) / length
+        i = int(np.argmax(distance))
+        if distance[i] > tolerance:
+            middle = start + 1 + i
+            keep[middle] = True
+            stack.append((start, middle))
+            stack.append((middle, end))
+    return points[keep]
+
+
+def _simplify_ring(ring, tolerance, digits):
+    """닫힌 고리 하나를 양자화 + 단순화 (꼭짓점이 4개 미만으로 줄면 None)"""
+    points = np.round(np.asarray(ring, dtype=float)[:, :2], digits)
+    # 양자화로 같은 격자에 떨어진 연속 좌표 제거
+    changed = np.ones(len(points), dtype=bool)
+    changed[1:] = np.any(points[1:] != points[:-1], axis=1)
+    points = _douglas_peucker(points[changed], tolerance)
+    if len(points) < 4:
+        return None
+    return points.tolist()
+
+
+def _simplify_polygon(rings, tolerance, digits):
+    exterior = _simplify_ring(rings[0], tolerance, digits)
+    if exterior is None:
+        return None
+    holes = [hole for hole in (_simplify_ring(r, tolerance, digits) for r in rings[1:]) if hole is not None]
+    return [exterior] + holes
+
+
+def simplify_geometry(geometry, tolerance=SIMPLIFY_TOLERANCE, digits=QUANTIZE_DIGITS):
+    """Polygon/MultiPolygon 단순화 (작은 섬은 사라질 수 있지만 지역마다 폴리곤 하나는 남긴다)"""
+    kind = geometry.get("type")
+    if kind == "Polygon":
+        polygons = [geometry["coordinates"]]
+    elif kind == "MultiPolygon":
+        polygons = geometry["coordinates"]
+    else:
+        return geometry
+
+    simplified = [p for p in (_simplify_polygon(rings, tolerance, digits) for rings in polygons) if p is not None]
+    if not simplified:
+        # 전부 사라질 만큼 작은 지역은 가장 큰 폴리곤을 양자화만 해서 남긴다
+        largest = max(polygons, key=lambda rings: len(rings[0]))
+        simplified = [[np.round(np.asarray(largest[0], dtype=float)[:, :2], digits).tolist()]]
+
+    if len(simplified) == 1:
+        return {"type": "Polygon", "coordinates": simplified[0]}
+    return {"type": "MultiPolygon", "coordinates": simplified}
+
+
+def _count_points(coordinates):
+    if not coordinates:
+        return 0
+    if isinstance(coordinates[0], (int, float)):
+        return 1
+    return sum(_count_points(c) for c in coordinates)
+
+
+class GeoMap:
+    """
+    단순화한 시도 경계와 지역명 색인
+    feature 마다 id 를 붙여 두므로 choropleth 에서 featureidkey 없이 locations 로 바로 매칭된다.
+    """
+
+    def __init__(self, geo, tolerance=SIMPLIFY_TOLERANCE, digits=QUANTIZE_DIGITS):
+        self.featureidkey = detect_featureid_key(geo)
+        name_key = self.featureidkey.split(".")[-1] if self.featureidkey else None
+
+        features = []
+        self.region_index = {}
+        original_points = simplified_points = 0
+        for i, feature in enumerate(geo.get("features", [])):
+            props = feature.get("properties") or {}
+            geometry = simplify_geometry(feature["geometry"], tolerance, digits)
+            original_points += _count_points(feature["geometry"]["coordinates"])
+            simplified_points += _count_points(geometry["coordinates"])
+
+            feature_id = str(props.get(name_key, i)) if name_key else str(i)
+            features.append({
+                "type": "Feature",
+                "id": feature_id,
+                "properties": {name_key: props[name_key]} if name_key in props else {},
+                "geometry": geometry,
+            })
+            # 한글/영문 전체 이름과 DB 의 짧은 지역 표기를 모두 같은 feature 로 연결
+            for key in NAME_KEYS:
+                if props.get(key):
+                    self.region_index.setdefault(str(props[key]), feature_id)
+                    self.region_index.setdefault(short_region_name(props[key]), feature_id)
+
+        self.geojson = {"type": "FeatureCollection", "features": features}
+        self.stats = {
+            'features': len(features),
+            'original_points': original_points,
+            'simplified_points': simplified_points,
+            'payload_bytes': len(json.dumps(self.geojson, separators=(",", ":")).encode("utf-8")),
+        }
+
+    def feature_id(self, region):
+        """DB 지역명 -> 지도 feature id (없으면 None)"""
+        region = str(region).strip()
+        return self.region_index.get(region) or self.region_index.get(short_region_name(region))
+
+    def match(self, df, region_col="region", column="지도매칭명"):
+        """지도 매칭 컬럼을 붙인 복사본 반환 (캐시된 원본 DataFrame 은 건드리지 않음)"""
+        regions = df[region_col].drop_duplicates()
+        mapping = dict(zip(regions, regions.map(self.feature_id)))
+        return df.assign(**{column: df[region_col].map(mapping)})
+
+
+def load_geo_map(path=GEOJSON_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        return GeoMap(json.load(f))
+
+
+def get_geo_map():
+    """프로세스 전역 GeoMap (처음 호출할 때 한 번만 읽고 단순화, 파일이 없으면 None)"""
+    global _geo_map
+    if _geo_map is None:
+        with _geo_map_lock:
+            if _geo_map is None:
+                try:
+                    _geo_map = load_geo_map()
+                except FileNotFoundError:
+                    return None
+    return _geo_map
@@ -1,186 +1,306 @@
 import pandas as pd
 import numpy as np
-from database.database import connect_db
+from database.queries import run_query, query_frame, stream_query, STREAM_CHUNK_SIZE
+from database.frames import frame_from_rows, downcast_int
+from database.rollup import ensure_rollups
+from database.instrumentation import instrumented, record_error
+from utilities.cache_utility import cached
 
-def get_announcement_data(vehicle_type="electric"):
-    try:
-        conn = connect_db()
-        cursor = conn.cursor()
+ANNOUNCEMENT_YEARS = (2020, 2024)   # 공고 현황 분석 탭에 보여줄 연도 범위
+
+class AnnouncementCube:
+    """
+    차종 하나의 공고 현황 큐브 (연도 x 지역 x [민간공고대수, 출고대수, 출고잔여대수])
+    요약 테이블을 한 번만 읽어 numpy 배열로 들고 있고, 연도별 비율(탭 1)과
+    연도 목록/지역별 정책활용도(탭 3)를 모두 이 배열에서 계산한다.
+    """
+    MEASURES = ('announced_count', 'released_count', 'remaining_count')
+
+    def __init__(self, rows):
+        years = sorted({int(row[0]) for row in rows})
+        regions = sorted({row[1] for row in rows})
+        self.year_labels = np.array(years, dtype=np.int64)
+        self.region_labels = np.array(regions, dtype=object)
+        year_pos = {year: i for i, year in enumerate(years)}
+        region_pos = {region: i for i, region in enumerate(regions)}
+
+        self.values = np.zeros((len(years), len(regions), len(self.MEASURES)), dtype=np.int64)
+        self.present = np.zeros((len(years), len(regions)), dtype=bool)   # 연도별로 실제 데이터가 있는 지역
+        for year, region, *measures in rows:
+            i, j = year_pos[int(year)], region_pos[region]
+            self.values[i, j] = [int(v or 0) for v in measures]
+            self.present[i, j] = True
+
+    def years(self):
+        return self.year_labels.tolist()
+
+    def yearly(self, start=None, end=None):
+        """연도별 합계와 출고/잔여 비율 (start~end 연도, 데이터가 없으면 빈 DataFrame)"""
+        mask = np.ones(len(self.year_labels), dtype=bool)
+        if start is not None:
+            mask &= self.year_labels >= start
+        if end is not None:
+            mask &= self.year_labels <= end
+        totals = self.values[mask].sum(axis=1)
+        yearly_data = pd.DataFrame(totals, columns=list(self.MEASURES))
+        yearly_data.insert(0, 'year', self.year_labels[mask])
 
-        table_name = "electronic_car" if vehicle_type == "electric" else "hydrogen_car"
-        
-        # electronic_car 테이블에서 공고 현황 데이터 가져오기
-        query = f"""
-        SELECT 
-            년도 as year,
-            지역 as region,
-            차종 as vehicle_type,
-            민간공고대수 as announced_count,
-            출고대수 as released_count,
-            출고잔여대수 as remaining_count
-        FROM {table_name}
-        WHERE 년도 BETWEEN 2020 AND 2024
-        ORDER BY 년도, 지역
-        """
-        
-        cursor.execute(query)
-        data = cursor.fetchall()
-        columns = ['year', 'region', 'vehicle_type', 'announced_count', 'released_count', 'remaining_count']
-        df = pd.DataFrame(data, columns=columns)
-        
-        cursor.close()
-        conn.close()
-        
-        if df.empty:
-            return None
-        
-        # 연도별로 데이터 집계
-        yearly_data = df.groupby('year').agg({
-            'announced_count': 'sum',
-            'released_count': 'sum',
-            'remaining_count': 'sum'
-        }).reset_index()
-        
         # 비율 계산
         yearly_data['released_ratio'] = (yearly_data['released_count'] / yearly_data['announced_count']) * 100
         yearly_data['remaining_ratio'] = (yearly_data['remaining_count'] / yearly_data['announced_count']) * 100
-        
         return yearly_data
+
+    def by_region(self, year):
+        """한 해의 지역별 민간공고대수, 출고잔여대수, 정책활용도(%) (데이터가 없으면 빈 DataFrame)"""
+        matches = np.flatnonzero(self.year_labels == int(year))
+        if not len(matches):
+            return pd.DataFrame(columns=['region', 'announced_count', 'remaining_count', 'released_count', '정책활용도(%)'])
+        i = matches[0]
+        regions = self.present[i]
+        announced = self.values[i, regions, 0]
+        remaining = self.values[i, regions, 2]
+
+        region_summary = pd.DataFrame({
+            'region': self.region_labels[regions],
+            'announced_count': announced,
+            'remaining_count': remaining,
+        })
+        region_summary["released_count"] = np.clip(announced - remaining, 0, None)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            utilization = np.where(announced > 0, region_summary["released_count"] / announced * 100, 0)
+        region_summary["정책활용도(%)"] = np.round(utilization, 1)
+        return region_summary
+
+@instrumented
+@cached(tables=('electronic_car', 'hydrogen_car', 'rollup_announcement_region'))
+def get_announcement_cube(vehicle_type="electric"):
+    """
+    차종별 공고 현황 큐브 (공유 캐시, 요약 테이블이 바뀌면 무효화)
+    """
+    try:
+        ensure_rollups()
+        data, _ = run_query('announcement_cube', (vehicle_type,))
+        return AnnouncementCube(data)
         
     except Exception as e:
-        print(f"데이터베이스 연결 오류: {e}")
+        record_error("get_announcement_cube", e)
+        return None
+
+@instrumented
+@cached(tables=('electronic_car', 'hydrogen_car', 'rollup_announcement_region'))
+def get_announcement_data(vehicle_type="electric"):
+    """
+    연도별 공고 현황 (민간공고대수, 출고대수, 출고잔여대수와 비율) - 공고 현황 큐브에서 계산
+    """
+    cube = get_announcement_cube(vehicle_type)
+    if cube is None:
+        return None
+    
+    yearly_data = cube.yearly(*ANNOUNCEMENT_YEARS)
+    if yearly_data.empty:
         return None
+    
+    return yearly_data
 
+@instrumented
+@cached(tables=('electronic_car', 'hydrogen_car', 'rollup_announcement_region'))
+def get_announcement_years(vehicle_type="electric"):
+    """
+    공고 현황 데이터가 있는 연도 목록 - 공고 현황 큐브에서 계산
+    """
+    cube = get_announcement_cube(vehicle_type)
+    if cube is None:
+        return None
+    return cube.years()
+
+@instrumented
+@cached(tables=('electronic_car', 'hydrogen_car', 'rollup_announcement_region'))
+def get_region_utilization_data(vehicle_type, year):
+    """
+    지역별 정책 활용 현황 (민간공고대수, 출고잔여대수, 정책활용도(%)) - 공고 현황 큐브에서 계산
+    """
+    cube = get_announcement_cube(vehicle_type)
+    if cube is None:
+        return None
+    
+    region_summary = cube.by_region(year)
+    if region_summary.empty:
+        return None
+    
+    return region_summary
+
+@instrumented
+@cached(tables=('money_electronic_car', 'money_hydrogen_car'))
 def get_subsidy_data(vehicle_type):
     """
     보조금 정보를 가져오는 함수
     """
     try:
-        conn = connect_db()
-        cursor = conn.cursor()
+        # 전기차: money_electronic_car, 수소차: money_hydrogen_car (허용 목록에 없으면 ValueError)
+        # 보조금은 적재 시 정수 컬럼으로 정규화되어 있다
+        df = query_frame('subsidy_ranked', vehicle_type=vehicle_type)
         
-        if vehicle_type == "electric":
-            # 전기차 보조금 정보 (money_electronic_car 테이블 사용)
-            query = """
-            SELECT 
-                시도 as region,
-                모델명 as vehicle_type,
-                CAST(REPLACE(보조금(만원), ',', '') AS SIGNED) as total_subsidy
-            FROM money_electronic_car 
-            WHERE 시도 NOT LIKE '%합계%' AND 모델명 NOT LIKE '%합계%'
-            ORDER BY total_subsidy DESC
-            """
-            
-            cursor.execute(query)
-            data = cursor.fetchall()
-            columns = ['region', 'vehicle_type', 'total_subsidy']
-            df = pd.DataFrame(data, columns=columns)
-            
-            if df.empty:
-                return None
-            
-            # 컬럼명 변경
-            df = df.rename(columns={
-                'region': '시도',
-                'vehicle_type': '모델명',
-                'total_subsidy': '보조금(만원)'
-            })
-            
-        elif vehicle_type == "hydrogen":
-            # 수소차 보조금 정보 (money_hydrogen_car 테이블 사용)
-            query = """
-            SELECT 
-                시도 as region,
-                모델명 as vehicle_type,
-                CAST(REPLACE(보조금(만원), ',', '') AS SIGNED) as total_subsidy
-            FROM money_hydrogen_car 
-            WHERE 시도 NOT LIKE '%합계%' AND 모델명 NOT LIKE '%합계%'
-            ORDER BY total_subsidy DESC
-            """
-            
-            cursor.execute(query)
-            data = cursor.fetchall()
-            columns = ['region', 'vehicle_type', 'total_subsidy']
-            df = pd.DataFrame(data, columns=columns)
-            
-            if df.empty:
-                return None
-            
-            # 컬럼명 변경
-            df = df.rename(columns={
-                'region': '시도',
-                'vehicle_type': '모델명',
-                'total_subsidy': '보조금(만원)'
-            })
+        if df.empty:
+            return None
+        
+        # 컬럼명 변경
+        df = df.rename(columns={
+            'region': '시도',
+            'vehicle_type': '모델명',
+            'total_subsidy': '보조금(만원)'
+        })
         
-        cursor.close()
-        conn.close()
         return df
         
     except Exception as e:
-        print(f"데이터베이스 연결 오류: {e}")
+        record_error("get_subsidy_data", e)
         return None
 
-def get_top5_models(region, vehicle_type="electric"):
+SUBSIDY_PAGE_SIZE = 100   # 전체 데이터 보기에서 한 번에 그리는 행 수
+TOPK_DEPTH = 10           # 지역별로 남겨 두는 상위 모델 수
+
+@instrumented
+@cached(tables=('money_electronic_car', 'money_hydrogen_car'))
+def get_subsidy_count(vehicle_type):
+    """합계 행을 제외한 보조금 테이블 행 수"""
+    try:
+        data, _ = run_query('subsidy_count', vehicle_type=vehicle_type)
+        return data[0][0]
+        
+    except Exception as e:
+        record_error("get_subsidy_count", e)
+        return None
+
+@instrumented
+@cached(tables=('money_electronic_car', 'money_hydrogen_car'))
+def get_subsidy_page(vehicle_type, page=1, per_page=SUBSIDY_PAGE_SIZE):
     """
-    지역별 TOP5 모델 정보를 가져오는 함수
+    보조금 내림차순 전체 데이터 중 한 페이지 (인덱스는 1부터 시작하는 순위)
+    정렬과 구간 자르기는 DB 가 하므로 테이블 크기와 무관하게 per_page 행만 가져온다.
     """
     try:
-        conn = connect_db()
-        cursor = conn.cursor()
-        
-        # 테이블 선택
-        table_name = "money_electronic_car" if vehicle_type == "electric" else "money_hydrogen_car"
+        offset = (max(page, 1) - 1) * per_page
+        df = query_frame('subsidy_page', (per_page, offset), vehicle_type=vehicle_type)
+        df['보조금(만원)'] = downcast_int(df.pop('보조금').fillna(0))
+        df.index = pd.RangeIndex(offset + 1, offset + 1 + len(df), name='순위')
+        return df
         
+    except Exception as e:
+        record_error("get_subsidy_page", e)
+        return None
+
+def iter_subsidy_chunks(vehicle_type, chunk_size=STREAM_CHUNK_SIZE):
+    """보조금 내림차순 전체 데이터를 서버 측 커서로 chunk_size 행씩 DataFrame 으로 돌려준다"""
+    for rows, columns in stream_query('subsidy_stream', vehicle_type=vehicle_type, chunk_size=chunk_size):
+        df = frame_from_rows(rows, columns)
+        df['보조금(만원)'] = downcast_int(df.pop('보조금').fillna(0))
+        yield df
+
+class SubsidyTopK:
+    """
+    시도별/전체 보조금 상위 모델 색인
+    보조금 내림차순으로 정렬된 테이블에서 시도별 행 위치를 한 번만 나눠 두므로
+    지역을 바꿀 때는 앞에서 K개만 잘라서 O(K) 로 답한다 (중복 행은 제외).
+    """
+
+    def __init__(self, df, region_col='시도', value_col='보조금(만원)'):
+        df = df.sort_values(value_col, ascending=False, kind='stable')
+        self.df = df.reset_index(drop=True)
+        unique_positions = np.flatnonzero(~self.df.duplicated().to_numpy())
+        self.global_positions = unique_positions
+        regions = self.df[region_col].to_numpy()[unique_positions]
+        self.region_positions = {
+            region: unique_positions[positions]
+            for region, positions in pd.Series(regions).groupby(regions).indices.items()
+        }
+
+    @classmethod
+    def from_chunks(cls, chunks, depth=TOPK_DEPTH, region_col='시도'):
+        """
+        보조금 내림차순으로 들어오는 chunk 들에서 전체/시도별 상위 depth 개(중복 행 제외)만 남겨서 생성
+        chunk 하나와 남긴 행만 메모리에 있으므로 테이블이 커도 메모리가 늘지 않는다.
+        """
+        kept = []
+        seen = set()
+        taken = {}   # '전체'/시도 -> 지금까지 남긴 행 수
+        for df in chunks:
+            keep = np.zeros(len(df), dtype=bool)
+            rows = None
+            groups = [("전체", range(len(df)))] + list(df.groupby(region_col, sort=False).indices.items())
+            for region, positions in groups:
+                count = taken.get(region, 0)
+                if count >= depth:
+                    continue
+                if rows is None:
+                    rows = list(df.itertuples(index=False, name=None))
+                for position in positions:
+                    row = rows[position]
+                    if not keep[position]:
+                        if row in seen:
+                            continue
+                        seen.add(row)
+                        keep[position] = True
+                    count += 1
+                    if count >= depth:
+                        break
+                taken[region] = count
+            if keep.any():
+                kept.append(df[keep])
+        if not kept:
+            return cls(pd.DataFrame(columns=[region_col, '보조금(만원)']))
+        df = pd.concat(kept, ignore_index=True)
+        # 남긴 행에 쓰이지 않는 범주(chunk 의 전체 모델명 사전 등)는 버린다
+        for column in df.select_dtypes('category').columns:
+            df[column] = df[column].cat.remove_unused_categories()
+        return cls(df)
+
+    def regions(self):
+        return sorted(self.region_positions)
+
+    def top(self, region="전체", k=5):
+        """상위 k개 행 (region 이 '전체' 면 전 지역 대상)"""
         if region == "전체":
-            # 전체 지역 TOP5 - 보조금 기준으로 정렬
-            query = f"""
-            SELECT 
-                시도 as region,
-                모델명 as vehicle_type,
-                CAST(REPLACE(보조금(만원), ',', '') AS SIGNED) as total_subsidy
-            FROM {table_name}
-            WHERE 시도 NOT LIKE '%합계%' AND 모델명 NOT LIKE '%합계%'
-            ORDER BY total_subsidy DESC
-            LIMIT 5
-            """
+            positions = self.global_positions[:k]
         else:
-            # 특정 지역 TOP5 - 보조금 기준으로 정렬
-            query = f"""
-            SELECT 
-                시도 as region,
-                모델명 as vehicle_type,
-                CAST(REPLACE(보조금(만원), ',', '') AS SIGNED) as total_subsidy
-            FROM {table_name}
-            WHERE 시도 = '{region}' AND 시도 NOT LIKE '%합계%' AND 모델명 NOT LIKE '%합계%'
-            ORDER BY total_subsidy DESC
-            LIMIT 5
-            """
-        
-        cursor.execute(query)
-        data = cursor.fetchall()
-        columns = ['region', 'vehicle_type', 'total_subsidy']
-        df = pd.DataFrame(data, columns=columns)
+            positions = self.region_positions.get(region, self.global_positions[:0])[:k]
+        return self.df.iloc[positions]
+
+@instrumented
+@cached(tables=('money_electronic_car', 'money_hydrogen_car'))
+def get_topk_index(vehicle_type="electric"):
+    """
+    차종별 보조금 TOP-K 색인을 반환 (공유 캐시, 테이블이 바뀌면 무효화)
+    전체 테이블을 올려 두지 않고 서버 측 커서로 흘려 보내며 상위 행만 남긴다.
+    """
+    try:
+        return SubsidyTopK.from_chunks(iter_subsidy_chunks(vehicle_type))
         
-        cursor.close()
-        conn.close()
+    except Exception as e:
+        record_error("get_topk_index", e)
+        return None
+
+@instrumented
+def get_top5_models(region, vehicle_type="electric"):
+    """
+    지역별 TOP5 모델 정보를 가져오는 함수 (TOP-K 색인 사용, DB 조회 없음)
+    """
+    try:
+        index = get_topk_index(vehicle_type)
+        if index is None:
+            return None
         
-        if df.empty:
+        top = index.top(region, 5)
+        if top.empty:
             return None
         
-        # 순위 추가 (보조금 기준으로 이미 정렬되어 있음)
-        df['rank'] = range(1, len(df) + 1)
+        df = top[['시도', '모델명', '보조금(만원)']].reset_index(drop=True)
         
-        # 컬럼명 변경
-        df = df.rename(columns={
-            'rank': '순위',
-            'region': '시도',
-            'vehicle_type': '모델명',
-            'total_subsidy': '보조금(만원)'
-        })
+        # 순위 추가 (보조금 기준으로 이미 정렬되어 있음)
+        df['순위'] = range(1, len(df) + 1)
         
         return df
         
     except Exception as e:
-        print(f"데이터베이스 연결 오류: {e}")
-        return None 
\ No newline at end of file
+        record_error("get_top5_models", e)
+        return None
\ No newline at end of file
@@ -0,0 +1,335 @@
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+NGRAM_SIZE = 2          # 한글은 형태소 분석 없이도 2글자 단위가 검색 품질이 좋다
+QUESTION_WEIGHT = 2     # 질문에 나온 단어는 답변보다 가중치를 높게
+BM25_K1 = 1.2
+BM25_B = 0.75
+RESULT_CACHE_SIZE = 128  # 같은 검색어로 페이지만 바꿀 때 다시 계산하지 않도록 남겨 두는 결과 수
+COMPACT_RATIO = 0.25     # 삭제된 문서가 이 비율을 넘으면 색인을 다시 만든다
+WORD_CACHE_SIZE = 1 << 16
+
+_TOKEN_RE = re.compile(r"\w+")
+_SEPARATOR = "\0"       # 질문과 답변을 이어 붙여 한 번에 확인 (검색어에 들어갈 수 없는 글자)
+_EMPTY = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64))
+
+
+def _normalize(text):
+    """소문자로 바꾸고 구분 글자를 지운 텍스트 (None 은 빈 문자열)"""
+    return "" if text is None else str(text).lower().replace(_SEPARATOR, "")
+
+
+def _word_grams(words, n=NGRAM_SIZE):
+    grams = []
+    for word in words:
+        if len(word) <= n:
+            grams.append(word)
+        else:
+            grams.extend(word[i:i + n] for i in range(len(word) - n + 1))
+    return grams
+
+
+def tokenize(text, n=NGRAM_SIZE):
+    """
+    텍스트를 글자 n-gram 으로 분해 (순위 계산에 쓰는 단위)
+    공백/문장부호로 나눈 단어마다 n-gram 을 만들고, n 보다 짧은 단어는 그대로 사용한다.
+    """
+    return _word_grams(_TOKEN_RE.findall(str(text).lower()), n)
+
+
+def _boundary_grams(words):
+    """이웃한 두 단어의 경계 3-gram ('보조금 신청' -> '금 신'), 여러 단어 검색어의 후보를 줄인다"""
+    return [f"{left[-1]} {right[0]}" for left, right in zip(words, words[1:])]
+
+
+@lru_cache(maxsize=WORD_CACHE_SIZE)
+def _word_units(word, n=NGRAM_SIZE):
+    """단어 하나의 n-gram (같은 단어가 반복되므로 기억해 둔다)"""
+    return tuple(_word_grams((word,), n))
+
+
+def _doc_terms(question, answer):
+    """
+    문서 하나의 색인 단위별 빈도 (질문은 QUESTION_WEIGHT 배)
+    순위용 n-gram + 단어 경계 3-gram. 한 글자는 따로 넣지 않고 검색할 때 n-gram posting 을 합쳐 만든다.
+    """
+    units = []
+    for text, weight in ((answer, 1), (question, QUESTION_WEIGHT)):
+        words = _TOKEN_RE.findall(text)
+        text_units = _boundary_grams(words)
+        text_units.extend(chain.from_iterable(map(_word_units, words)))
+        units.extend(text_units * weight)
+    return Counter(units)
+
+
+class SearchIndex:
+    """
+    글자 n-gram 역색인 + BM25 순위
+
+    검색 결과는 검색어를 질문이나 답변에 (대소문자 무시) 부분 문자열로 포함하는 문서이고,
+    순위만 BM25 로 매긴다. 색인은 후보를 줄이는 데만 쓰고 후보는 원문으로 다시 확인한다.
+    검색어 단위(n-gram, 단어 경계 3-gram)의 posting 을 작은 것부터 교집합하고,
+    한두 글자 한 단어 검색어는 posting 자체가 정확한 결과라서 원문 확인을 건너뛴다.
+    문장부호만 있는 검색어는 색인 단위가 없으므로 모든 문서를 원문으로 확인한다 (이전 LIKE 검색과 같은 결과).
+    한 글자 posting 은 그 글자를 포함하는 n-gram 의 posting 을 합쳐 처음 쓸 때 만들어 둔다.
+
+    posting 은 gram 마다 (정렬된 슬롯 배열, 빈도 배열) 이다. 처음 만들 때는 build 로 한 번에 만들고,
+    이후 추가는 새 슬롯을 배열 끝에 붙이고 삭제는 슬롯을 죽은 것으로만 표시한다.
+    죽은 슬롯이 COMPACT_RATIO 를 넘으면 살아 있는 문서로 다시 만든다.
+    """
+
+    def __init__(self):
+        self._postings = {}                     # gram -> (정렬된 슬롯 배열, 빈도 배열)
+        self._grams_by_char = {}                # 글자 -> 그 글자를 포함하는 단어 n-gram 목록
+        self._char_postings = {}                # 글자 -> 합친 posting (문서가 추가되면 비운다)
+        self._slot_of = {}                      # 문서 id -> 슬롯
+        self._doc_ids = []                      # 슬롯 -> 문서 id (삭제된 슬롯은 None)
+        self._texts = []                        # 슬롯 -> 소문자 "질문\0답변" (결과 확인용)
+        self._group_names = []                  # 그룹 코드 -> 그룹(카테고리)
+        self._group_codes = {}                  # 그룹 -> 코드
+        self._groups = np.zeros(0, dtype=np.int32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._doc_len = np.zeros(0, dtype=np.float64)
+        self._total_len = 0.0
+        self._results = OrderedDict()           # (검색어, 그룹) -> (슬롯 배열, 점수 배열)
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    def _group_code(self, group):
+        if group is None:
+            return -1
+        code = self._group_codes.get(group)
+        if code is None:
+            code = self._group_codes[group] = len(self._group_names)
+            self._group_names.append(group)
+        return code
+
+    def _grow(self, size):
+        if size > len(self._alive):
+            extra = max(size - len(self._alive), len(self._alive), 64)
+            self._groups = np.concatenate([self._groups, np.full(extra, -1, dtype=np.int32)])
+            self._alive = np.concatenate([self._alive, np.zeros(extra, dtype=bool)])
+            self._doc_len = np.concatenate([self._doc_len, np.zeros(extra)])
+
+    def build(self, doc_ids, questions, answers, groups=None):
+        """
+        비어 있는 색인에 문서를 한 번에 넣는다
+        문서별 빈도를 모아 gram 을 한 번에 코드로 바꾸고(pd.factorize) 정렬한 뒤 gram 별 배열로 나누므로
+        add 를 반복하는 것보다 빠르다.
+        """
+        with self._lock:
+            if self._doc_ids:
+                raise ValueError("build 는 비어 있는 색인에만 쓸 수 있습니다")
+            groups = [None] * len(doc_ids) if groups is None else groups
+            grams, tfs, counts = [], [], []
+            for doc_id, question, answer, group in zip(doc_ids, questions, answers, groups):
+                question, answer = _normalize(question), _normalize(answer)
+                terms = _doc_terms(question, answer)
+                grams.extend(terms)
+                tfs.extend(terms.values())
+                counts.append(len(terms))
+                slot = len(self._doc_ids)
+                self._doc_ids.append(doc_id)
+                self._slot_of[doc_id] = slot
+                self._texts.append(f"{question}{_SEPARATOR}{answer}")
+                self._grow(slot + 1)
+                self._groups[slot] = self._group_code(group)
+                self._alive[slot] = True
+                self._doc_len[slot] = sum(terms.values())
+
+            codes, uniques = pd.factorize(np.asarray(grams, dtype=object))
+            tfs = np.asarray(tfs, dtype=np.float64)
+            slots = np.repeat(np.arange(len(counts), dtype=np.int64), counts)
+            order = np.argsort(codes, kind="stable")   # 같은 gram 안에서는 슬롯 순서 유지
+            bounds = np.cumsum(np.bincount(codes, minlength=len(uniques)))[:-1]
+            for gram, gram_slots, gram_tfs in zip(uniques, np.split(slots[order], bounds), np.split(tfs[order], bounds)):
+                self._postings[gram] = (gram_slots, gram_tfs)
+                self._index_chars(gram)
+            self._total_len = float(self._doc_len.sum())
+            self._results.clear()
+
+    def _index_chars(self, gram):
+        if " " in gram:     # 단어 경계 gram 의 글자는 단어 n-gram 에 이미 있다
+            return
+        for char in set(gram):
+            self._grams_by_char.setdefault(char, []).append(gram)
+
+    def _posting(self, gram):
+        """gram 의 posting, 한 글자는 그 글자를 포함하는 n-gram posting 의 합집합 (빈도는 합)"""
+        if len(gram) > 1:
+            return self._postings.get(gram)
+        posting = self._char_postings.get(gram)
+        if posting is None:
+            grams = self._grams_by_char.get(gram)
+            if not grams:
+                return None
+            slots = np.concatenate([self._postings[g][0] for g in grams])
+            tfs = np.concatenate([self._postings[g][1] for g in grams])
+            slots, inverse = np.unique(slots, return_inverse=True)
+            posting = self._char_postings[gram] = (slots, np.bincount(inverse, weights=tfs))
+        return posting
+
+    def add(self, doc_id, question, answer="", group=None):
+        """문서 추가 (같은 id 가 있으면 교체), group 은 search 에서 거를 때 쓰는 값 (FAQ 카테고리)"""
+        question, answer = _normalize(question), _normalize(answer)
+        terms = _doc_terms(question, answer)
+
+        with self._lock:
+            self._remove(doc_id)
+            slot = len(self._doc_ids)
+            self._doc_ids.append(doc_id)
+            self._slot_of[doc_id] = slot
+            self._texts.append(f"{question}{_SEPARATOR}{answer}")
+            self._grow(slot + 1)
+            # 새 슬롯이 항상 가장 크므로 배열 끝에 붙여도 정렬이 유지된다
+            for gram, tf in terms.items():
+                slots, tfs = self._postings.get(gram, _EMPTY)
+                if not len(slots):
+                    self._index_chars(gram)
+                self._postings[gram] = (np.append(slots, slot), np.append(tfs, float(tf)))
+            self._char_postings.clear()
+            self._groups[slot] = self._group_code(group)
+            self._alive[slot] = True
+            length = sum(terms.values())
+            self._doc_len[slot] = length
+            self._total_len += length
+            self._results.clear()
+
+    def _remove(self, doc_id):
+        slot = self._slot_of.pop(doc_id, None)
+        if slot is None:
+            return
+        self._total_len -= self._doc_len[slot]
+        self._doc_len[slot] = 0
+        self._alive[slot] = False
+        self._doc_ids[slot] = None
+        self._texts[slot] = ""
+        self._results.clear()
+
+    def remove(self, doc_id):
+        """문서 삭제 (없으면 무시)"""
+        with self._lock:
+            self._remove(doc_id)
+            if len(self._doc_ids) > 64 and len(self._slot_of) < (1 - COMPACT_RATIO) * len(self._doc_ids):
+                self._compact()
+
+    def _compact(self):
+        # 살아 있는 문서만 새 슬롯으로 다시 만든다 (원문은 이미 소문자)
+        live = [slot for slot, doc_id in enumerate(self._doc_ids) if doc_id is not None]
+        doc_ids = [self._doc_ids[slot] for slot in live]
+        questions, answers = zip(*(self._texts[slot].split(_SEPARATOR, 1) for slot in live)) if live else ((), ())
+        groups = [self._group_names[code] if code >= 0 else None for code in self._groups[live].tolist()]
+        self.__init__()
+        self.build(doc_ids, questions, answers, groups)
+
+    def _match(self, query, group):
+        """검색어를 포함하는 슬롯과 BM25 점수 (색인 후보 -> 원문 확인)"""
+        key = (query, group)
+        cached = self._results.get(key)
+        if cached is not None:
+            self._results.move_to_end(key)
+            return cached
+
+        if not query or not self._slot_of:
+            return _EMPTY
+        words = _TOKEN_RE.findall(query)
+        scoring = list(dict.fromkeys(_word_grams(words)))
+        if words:
+            required = list(dict.fromkeys(scoring + _boundary_grams(words)))
+            postings = [self._posting(gram) for gram in required]
+            if any(posting is None for posting in postings):
+                return _EMPTY
+
+            # posting 이 작은 것부터 교집합 (다음 posting 을 전체 슬롯 크기의 표시 배열로 펼쳐 후보를 거른다)
+            postings.sort(key=lambda posting: len(posting[0]))
+            candidates = postings[0][0]
+            for slots, _ in postings[1:]:
+                if len(candidates) == 0:
+                    break
+                mask = np.zeros(len(self._alive), dtype=bool)
+                mask[slots] = True
+                candidates = candidates[mask[candidates]]
+        else:
+            # 문장부호만 있는 검색어는 색인 단위가 없으므로 모든 문서를 원문으로 확인한다
+            candidates = np.arange(len(self._doc_ids), dtype=np.int64)
+
+        candidates = candidates[self._alive[candidates]]
+        if group is not None:
+            code = self._group_codes.get(group)
+            if code is None:
+                return _EMPTY
+            candidates = candidates[self._groups[candidates] == code]
+
+        # 한두 글자 한 단어 검색어는 posting 이 곧 부분 문자열 결과다. 그 외에는 원문으로 확인
+        if not (len(words) == 1 and words[0] == query and len(query) <= NGRAM_SIZE):
+            texts = self._texts
+            candidates = np.fromiter(
+                (slot for slot in candidates.tolist() if query in texts[slot]),
+                dtype=np.int64,
+            )
+
+        scores = np.zeros(len(candidates), dtype=np.float64)
+        if len(candidates):
+            n_docs = len(self._slot_of)
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_len[candidates] * n_docs / self._total_len)
+            # gram 빈도를 슬롯 크기 배열에 펼쳐 후보 위치를 바로 읽는다 (posting 마다 이분 탐색하지 않음)
+            dense = np.zeros(len(self._alive), dtype=np.float64)
+            for gram in scoring:
+                slots, tf_all = self._posting(gram)
+                dense[slots] = tf_all
+                tf = dense[candidates]
+                dense[slots] = 0
+                idf = math.log(1 + (n_docs - len(slots) + 0.5) / (len(slots) + 0.5))
+                scores += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        result = (candidates, scores)
+        self._results[key] = result
+        if len(self._results) > RESULT_CACHE_SIZE:
+            self._results.popitem(last=False)
+        return result
+
+    def search_page(self, query, offset=0, limit=None, group=None):
+        """
+        BM25 점수 순으로 offset 부터 limit 개의 문서 id 와 전체 결과 수를 (ids, total) 로 반환
+        점수가 같으면 먼저 넣은 문서가 앞이라서 페이지를 나눠 읽어도 겹치거나 빠지는 문서가 없다.
+        """
+        query = _normalize(query)
+        with self._lock:
+            slots, scores = self._match(query, group)
+            total = len(slots)
+            end = total if limit is None else min(offset + limit, total)
+            if offset >= end:
+                return [], total
+            if not scores.any():
+                # 점수가 모두 0(문장부호만 있는 검색어)이면 슬롯 순서 그대로
+                return [self._doc_ids[slot] for slot in slots[offset:end].tolist()], total
+            if end < total:
+                # 상위 end 개만 정렬: end 번째 점수 이상만 남긴다 (경계의 동점도 모두 포함)
+                threshold = -np.partition(-scores, end - 1)[end - 1]
+                keep = np.flatnonzero(scores >= threshold)
+                slots, scores = slots[keep], scores[keep]
+            order = np.lexsort((slots, -scores))[offset:end]
+            return [self._doc_ids[slot] for slot in slots[order].tolist()], total
+
+    def search(self, query, limit=None, group=None):
+        """BM25 점수 순으로 문서 id 목록을 반환"""
+        return self.search_page(query, 0, limit, group)[0]
+
+
+def build_index(df, question_col="question", answer_col="answer", group_col=None):
+    """DataFrame 의 인덱스를 문서 id 로 사용해 검색 색인을 만든다 (group_col 값으로 검색 결과를 거를 수 있음)"""
+    index = SearchIndex()
+    questions = df[question_col] if question_col in df.columns else [""] * len(df)
+    answers = df[answer_col] if answer_col in df.columns else [""] * len(df)
+    groups = df[group_col].tolist() if group_col in df.columns else None
+    index.build(list(df.index), list(questions), list(answers), groups)
+    return index
@@ -0,0 +1,203 @@
+"""
+캐시 워밍업
+
+프로세스가 시작되면 세 페이지가 처음 요청하는 조회 결과를 공유 캐시에 미리 채워 두고,
+캐시 TTL 보다 조금 짧은 주기로 다시 확인한다. 변경 반영 스레드(change_utility)가 돌고 있으면
+작업이 읽는 테이블의 데이터 버전이 지난번 워밍업과 같은 작업은 다시 조회하지 않고 캐시 만료만 늦춘다.
+읽는 테이블 중 하나라도 변경 추적(database/changes.py)에 없으면 버전이 올라가지 않으므로 매번 다시 조회한다.
+페이지가 호출하는 것과 같은 인자로 호출해야 같은 캐시 키가 채워진다.
+
+    python -m utilities.warmup_utility   # 한 번 실행하고 소요 시간 출력
+"""
+import os
+import threading
+import time
+
+from database.changes import is_tracked
+from database.instrumentation import log_event, record_error
+from utilities.cache_utility import DEFAULT_TTL_SECONDS, extend_table, table_version
+from utilities.async_utility import load_concurrently
+from utilities.app_utility import get_vehicle_registration_data, get_environmental_impact_data, get_region_emission_data
+from utilities.money_utility import (
+    get_announcement_cube, get_announcement_data, get_announcement_years, get_region_utilization_data,
+    get_subsidy_count, get_subsidy_page, get_topk_index,
+)
+from utilities.geo_utility import get_geo_map
+from utilities.faq_utility import get_faq_data, get_categories, get_faq_count, get_faq_search_index
+from utilities.change_utility import is_change_polling
+
+WARMUP_ENABLED = os.environ.get("CAR_WARMUP", "1") != "0"
+WARMUP_INTERVAL_SECONDS = int(os.environ.get("CAR_WARMUP_INTERVAL", DEFAULT_TTL_SECONDS - 60))
+
+_thread = None
+_thread_lock = threading.Lock()
+_stop = threading.Event()
+_last_report = None
+_warmed_versions = {}   # 작업 -> 마지막으로 성공했을 때의 {테이블: 데이터 버전}
+
+
+def _warm_main_page():
+    """메인페이지: 자동차 등록 현황, 환경 영향, 지역별 배출량"""
+    get_vehicle_registration_data.refresh()
+    get_environmental_impact_data.refresh()
+    get_region_emission_data.refresh(2022)
+    return 3
+
+
+def _warm_vehicle_type(vehicle_type):
+    """보조금 페이지: 차종 하나의 공고 현황, 연도별 지역 요약, 보조금 표, TOP-K 색인"""
+    # 공고 현황 큐브를 먼저 다시 읽고, 탭 1/탭 3 결과를 큐브에서 다시 계산한다
+    warmed = 0
+    if get_announcement_cube.refresh(vehicle_type) is not None:
+        warmed += 1
+    if get_announcement_data.refresh(vehicle_type) is not None:
+        warmed += 1
+    years = get_announcement_years.refresh(vehicle_type) or []
+    warmed += 1
+    for year in years:
+        get_region_utilization_data.refresh(vehicle_type, year)
+        warmed += 1
+
+    # 전체 데이터 첫 페이지와 행 수
+    get_subsidy_count.refresh(vehicle_type)
+    get_subsidy_page.refresh(vehicle_type, 1)
+    warmed += 2
+
+    # TOP-K 색인을 스트리밍으로 다시 만든다 (지역별 TOP5 는 캐시하지 않고 색인에서 바로 꺼낸다)
+    if get_topk_index.refresh(vehicle_type) is not None:
+        warmed += 1
+    return warmed
+
+
+def _warm_faq_page():
+    """FAQ 페이지: 검색용 전체 FAQ 와 검색 색인, 카테고리, 카테고리별 건수 (페이지 행은 화면마다 DB 에서 읽는다)"""
+    get_faq_data.refresh()
+    get_faq_search_index()
+    categories = get_categories.refresh()
+    warmed = 3
+    for category in categories:
+        get_faq_count.refresh(category)
+        warmed += 1
+    return warmed
+
+
+def _warm_geo_map():
+    """보조금 페이지 지도: GeoJSON 읽기 + 단순화 + 지역명 색인 (프로세스당 한 번)"""
+    return 0 if get_geo_map() is None else 1
+
+
+def _tables(*functions):
+    return tuple(sorted({table for function in functions for table in function.tables}))
+
+
+# 작업 -> (함수, 인자, 결과가 읽는 테이블)
+WARMUP_TASKS = {
+    'main': (_warm_main_page, (), _tables(
+        get_vehicle_registration_data, get_environmental_impact_data, get_region_emission_data)),
+    'electric': (_warm_vehicle_type, ("electric",), _tables(
+        get_announcement_cube, get_subsidy_page, get_topk_index)),
+    'hydrogen': (_warm_vehicle_type, ("hydrogen",), _tables(
+        get_announcement_cube, get_subsidy_page, get_topk_index)),
+    'faq': (_warm_faq_page, (), _tables(get_faq_data, get_categories, get_faq_count)),
+    'geo': (_warm_geo_map, (), ()),
+}
+
+
+def _timed(task, *args):
+    started = time.perf_counter()
+    try:
+        return {'entries': task(*args), 'seconds': time.perf_counter() - started, 'error': None}
+    except Exception as e:
+        record_error(f"warmup:{task.__name__}", e)
+        return {'entries': 0, 'seconds': time.perf_counter() - started, 'error': str(e)}
+
+
+def run_warmup(force=False):
+    """
+    워밍업 작업을 동시에 실행하고 결과 보고서를 반환
+    변경 반영 스레드가 돌고 있고 force 가 아니면, 읽는 테이블이 모두 변경 추적 대상이고 그 데이터 버전이
+    지난번 성공 때와 같은 작업은 건너뛰고 그 테이블을 읽는 캐시 결과의 만료만 늦춘다.
+    보고서: {'started_at', 'seconds', 'entries', 'skipped', 'tasks': {이름: {'entries', 'seconds', 'error', 'skipped'}}}
+    """
+    global _last_report
+    started_at = time.time()
+    started = time.perf_counter()
+    skip_unchanged = not force and is_change_polling()
+
+    versions, pending, skipped = {}, {}, {}
+    for name, (task, args, tables) in WARMUP_TASKS.items():
+        # 실행 전에 버전을 읽어 두어야 실행 중에 바뀐 테이블을 다음 번에 다시 워밍업한다
+        versions[name] = {table: table_version(table) for table in tables}
+        unchanged = _warmed_versions.get(name) == versions[name] and all(map(is_tracked, tables))
+        if skip_unchanged and unchanged:
+            for table in tables:
+                extend_table(table)
+            skipped[name] = {'entries': 0, 'seconds': 0.0, 'error': None, 'skipped': True}
+        else:
+            pending[name] = (_timed, task, *args)
+
+    results = load_concurrently(pending) if pending else {}
+    tasks = {}
+    for name in WARMUP_TASKS:
+        if name in skipped:
+            tasks[name] = skipped[name]
+            continue
+        tasks[name] = dict(results[name], skipped=False)
+        if not tasks[name]['error']:
+            _warmed_versions[name] = versions[name]
+
+    report = {
+        'started_at': started_at,
+        'seconds': time.perf_counter() - started,
+        'entries': sum(task['entries'] for task in tasks.values()),
+        'skipped': sorted(skipped),
+        'tasks': tasks,
+    }
+    _last_report = report
+
+    log_event('warmup', entries=report['entries'], seconds=report['seconds'], skipped=report['skipped'],
+              failed=[name for name, task in tasks.items() if task['error']])
+    return report
+
+
+def get_warmup_report():
+    """마지막 워밍업 보고서 (아직 실행 전이면 None)"""
+    return _last_report
+
+
+def _warmup_loop(interval):
+    while not _stop.is_set():
+        run_warmup()
+        if interval <= 0:
+            return
+        _stop.wait(interval)
+
+
+def start_warmup(interval=WARMUP_INTERVAL_SECONDS):
+    """
+    백그라운드 워밍업 스레드를 시작 (프로세스당 한 번, 이후 호출은 무시)
+    CAR_WARMUP=0 이면 실행하지 않고, interval 이 0 이하면 시작할 때 한 번만 실행한다.
+    """
+    global _thread
+    if not WARMUP_ENABLED:
+        return None
+    with _thread_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_warmup_loop, args=(interval,), name="car-warmup", daemon=True)
+            _thread.start()
+    return _thread
+
+
+def stop_warmup():
+    _stop.set()
+
+
+if __name__ == "__main__":
+    result = run_warmup()
+    print(f"캐시 워밍업 완료: {result['entries']}개 ({result['seconds']:.2f}초)")
+    for name, task in result['tasks'].items():
+        if task['skipped']:
+            status = "변경 없음"
+        else:
+            status = f"실패 - {task['error']}" if task['error'] else f"{task['entries']}개"
+        print(f"  {name}: {status} ({task['seconds']:.2f}초)")